@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+from __future__ import print_function;
+
+import sys;
+import timeit;
+
+from pymfony.component.system import Object;
+
+"""Helpers of the benchmarks.
+
+The benchmarks are not part of the test suite, their timings depend on the
+machine. Run them by hand from the root of the repository, e.g.:
+
+    PYTHONPATH=src python benchmark/container.py
+
+"""
+
+class Benchmark(Object):
+    """Runs the bench*() methods of a benchmark and prints their timings.
+    """
+
+    REPEAT = 3;
+
+    def run(self):
+        """Runs all the bench*() methods, in alphabetical order.
+        """
+        for name in sorted(dir(self)):
+            if name.startswith('bench') and callable(getattr(self, name)):
+                getattr(self, name)();
+
+    def measure(self, label, callback, number = 1, setup = None):
+        """Prints and returns the best time of a call.
+
+        @param label: string The label of the timing
+        @param callback: callable The measured code
+        @param number: int The number of calls per run
+        @param setup: callable|None Called before each run, not measured,
+                                    its result is given to the callback
+
+        @return: float The time of a call, in seconds
+        """
+        times = list();
+        for i in range(self.REPEAT):
+            args = () if setup is None else (setup(),);
+
+            start = timeit.default_timer();
+            for j in range(number):
+                callback(*args);
+            times.append(timeit.default_timer() - start);
+
+        elapsed = min(times) / number;
+        self.__report(label, elapsed);
+
+        return elapsed;
+
+    def __report(self, label, elapsed):
+
+        if elapsed >= 0.001:
+            timing = '{0:>10.1f} ms'.format(elapsed * 1000);
+        else:
+            timing = '{0:>10.3f} us'.format(elapsed * 1000000);
+
+        print('{0:<30}{1}/call'.format(label, timing), file=sys.stderr);
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency import Scope;
+from pymfony.component.dependency.interface import ContainerInterface;
+from pymfony.component.dependency.definition import Reference;
+
+from bench import Benchmark;
+
+"""Benchmark of ContainerBuilder.compile() on a synthetic graph of 5000
+services.
+
+Each public controller references two shared hubs, that are kept, and a
+chain of private services, that is inlined. The remaining services are
+unused chains whose scopes alternate: they can not be inlined, so the
+repeated pass removes one level of them per round. The compile time
+should not grow with the number of rounds.
+"""
+
+class CompilerBenchmark(Benchmark):
+
+    CONTROLLERS = 500;
+
+    LINKS = 4;
+
+    SERVICES = 5000;
+
+    def benchCompileWithManyRounds(self):
+
+        self.measure('compile() 20 rounds', lambda c: c.compile(), setup=lambda: self.__createContainer(20));
+
+    def benchCompileWithFewRounds(self):
+
+        self.measure('compile() 2 rounds', lambda c: c.compile(), setup=lambda: self.__createContainer(2));
+
+    def __createContainer(self, depth):
+
+        container = ContainerBuilder();
+        container.addScope(Scope('request'));
+
+        for i in range(self.CONTROLLERS):
+            container.register('hub.{0}'.format(i), 'Hub').setPublic(False);
+
+            controller = container.register('controller.{0}'.format(i), 'Controller');
+            controller.addArgument(Reference('hub.{0}'.format(i)));
+            controller.addArgument(Reference('hub.{0}'.format((i + 1) % self.CONTROLLERS)));
+            controller.addArgument(Reference('link.{0}.0'.format(i)));
+
+            for k in range(self.LINKS):
+                link = container.register('link.{0}.{1}'.format(i, k), 'Link').setPublic(False);
+                if k + 1 < self.LINKS :
+                    link.addArgument(Reference('link.{0}.{1}'.format(i, k + 1)));
+                else :
+                    link.addArgument(Reference('hub.{0}'.format(i)));
+
+        unused = self.SERVICES - len(container.getDefinitions());
+        for c in range(unused // depth):
+            for k in range(depth):
+                service = container.register('unused.{0}.{1}'.format(c, k), 'Unused');
+                service.setPublic(False);
+                if k % 2 :
+                    service.setScope('request');
+                if k + 1 < depth :
+                    service.addArgument(Reference('unused.{0}.{1}'.format(c, k + 1), ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE, False));
+
+        return container;
+
+
+if __name__ == '__main__':
+    CompilerBenchmark().run();
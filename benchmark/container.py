@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+from pymfony.component.system import Object;
+
+from pymfony.component.dependency import Container;
+
+from bench import Benchmark;
+
+"""Benchmark of Container.get().
+"""
+
+class ContainerBenchmark(Benchmark):
+
+    ITERATIONS = 20000;
+
+    def benchGetHotId(self):
+
+        container = BenchmarkServiceContainer();
+        container.get('foo.bar_baz');
+
+        self.measure('get() hot id', lambda: container.get('foo.bar_baz'), self.ITERATIONS);
+
+    def benchGetColdId(self):
+
+        container = BenchmarkServiceContainer();
+
+        self.measure('get() cold id', lambda: container.get('foo.prototype_service'), self.ITERATIONS);
+
+    def benchHasAndInitialized(self):
+
+        container = BenchmarkServiceContainer();
+
+        self.measure('has()', lambda: container.has('foo.prototype_service'), self.ITERATIONS);
+        self.measure('initialized()', lambda: container.initialized('foo.bar_baz'), self.ITERATIONS);
+
+
+class BenchmarkServiceContainer(Container):
+
+    def getFoo_BarBazService(self):
+
+        self._services['foo.bar_baz'] = instance = Object();
+
+        return instance;
+
+    def getFoo_PrototypeServiceService(self):
+
+        return Object();
+
+
+if __name__ == '__main__':
+    ContainerBenchmark().run();
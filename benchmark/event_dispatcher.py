@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+from pymfony.component.event_dispatcher import Event;
+from pymfony.component.event_dispatcher import EventDispatcher;
+
+from bench import Benchmark;
+
+"""Benchmark of EventDispatcher.dispatch().
+"""
+
+class EventDispatcherBenchmark(Benchmark):
+
+    ITERATIONS = 2000;
+
+    def benchDispatch(self):
+
+        for count in [1, 10, 100]:
+            dispatcher = self.__createDispatcher(count);
+            event = Event();
+
+            self.measure(
+                '{0} listener(s)'.format(count),
+                lambda: dispatcher.dispatch('kernel.request', event),
+                self.ITERATIONS
+            );
+
+    def benchDispatchWithoutListeners(self):
+
+        dispatcher = self.__createDispatcher(10);
+
+        self.measure('no listener', lambda: dispatcher.dispatch('kernel.terminate'), self.ITERATIONS);
+
+    def benchDispatchAfterListenerChange(self):
+
+        dispatcher = self.__createDispatcher(10);
+        listener = BenchmarkListener();
+
+        def change():
+            dispatcher.addListener('kernel.request', [listener, 'onKernelRequest']);
+            dispatcher.dispatch('kernel.request');
+            dispatcher.removeListener('kernel.request', [listener, 'onKernelRequest']);
+
+        self.measure('add/dispatch/remove', change, self.ITERATIONS);
+
+    def __createDispatcher(self, count):
+
+        dispatcher = EventDispatcher();
+        for i in range(count):
+            dispatcher.addListener(
+                'kernel.request',
+                [BenchmarkListener(), 'onKernelRequest'],
+                i % 5
+            );
+
+        return dispatcher;
+
+
+class BenchmarkListener(object):
+
+    def onKernelRequest(self, event):
+
+        pass;
+
+
+if __name__ == '__main__':
+    EventDispatcherBenchmark().run();
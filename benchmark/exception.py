@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+from pymfony.component.system.exception import StandardException;
+from pymfony.component.system.exception import InvalidArgumentException;
+
+from bench import Benchmark;
+
+"""Benchmark of raising and catching exceptions in a tight loop.
+"""
+
+class ExceptionBenchmark(Benchmark):
+
+    ITERATIONS = 5000;
+
+    def benchRaiseAndCatch(self):
+
+        self.measure('Exception', self.__raiseBuiltin, self.ITERATIONS);
+
+        StandardException.setTraceEnabled(True);
+        self.measure('trace enabled', self.__raiseStandard, self.ITERATIONS);
+
+        StandardException.setTraceEnabled(False);
+        try:
+            self.measure('trace disabled', self.__raiseStandard, self.ITERATIONS);
+        finally:
+            StandardException.setTraceEnabled(True);
+
+    def benchRaiseCatchAndFormat(self):
+
+        self.measure('trace formatted', lambda: str(self.__raiseStandard()), self.ITERATIONS);
+
+    def __raiseBuiltin(self):
+
+        try:
+            raise KeyError('foo');
+        except KeyError as e:
+            return e;
+
+    def __raiseStandard(self):
+
+        try:
+            raise InvalidArgumentException('foo');
+        except InvalidArgumentException as e:
+            return e;
+
+
+if __name__ == '__main__':
+    ExceptionBenchmark().run();
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import sys;
+import os.path;
+import subprocess;
+import types;
+
+from pymfony.component.yaml import Parser;
+
+from bench import Benchmark;
+
+"""Benchmark of Parser.parse() on a generated services.yml file.
+
+Give a git revision to compare with the parser of this revision, e.g.:
+
+    PYTHONPATH=src python benchmark/parser.py HEAD~10
+
+"""
+
+class ParserBenchmark(Benchmark):
+
+    SERVICES = 1000;
+
+    def __init__(self, revision = None):
+        """Constructor.
+
+        @param revision: string|None The git revision to compare with
+
+        """
+        self.__parsers = [('', Parser)];
+        if None is not revision:
+            self.__parsers.append((
+                ' at {0}'.format(revision), self.__loadParser(revision)
+            ));
+
+    def benchParseNestedServices(self):
+
+        yaml = self.__createServices(self.SERVICES);
+
+        for suffix, parser in self.__parsers:
+            self.measure(
+                'parse() {0} lines{1}'.format(yaml.count("\n"), suffix),
+                lambda: parser().parse(yaml)
+            );
+
+    def benchParseDeeplyNestedMappings(self):
+
+        yaml = self.__createNestedMappings(200, 25);
+
+        for suffix, parser in self.__parsers:
+            self.measure(
+                'parse() {0} levels{1}'.format(25, suffix),
+                lambda: parser().parse(yaml)
+            );
+
+    def __loadParser(self, revision):
+        """Loads the parser of a git revision.
+
+        @param revision: string The git revision
+
+        @return: type The Parser class of the revision
+
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)));
+        source = subprocess.check_output(
+            ['git', 'show', revision+':src/pymfony/component/yaml/__init__.py'],
+            cwd=root
+        );
+
+        module = types.ModuleType('yaml_'+revision);
+        # Python 2 clears the globals of a module once it is released
+        sys.modules[module.__name__] = module;
+        exec(compile(source, module.__name__, 'exec'), module.__dict__);
+
+        return module.Parser;
+
+    def __createNestedMappings(self, count, depth):
+
+        lines = list();
+        for i in range(count):
+            lines.append("root{0}:".format(i));
+            for level in range(depth):
+                lines.append("  " * (level + 1) + "level{0}:".format(level));
+            lines.append("  " * (depth + 1) + "value: {0}".format(i));
+
+        return "\n".join(lines)+"\n";
+
+    def __createServices(self, count):
+
+        lines = ["services:"];
+        for i in range(count):
+            lines.extend([
+                "    acme.service_{0}:".format(i),
+                "        class: Acme\\Service{0}".format(i),
+                "        arguments:",
+                "            - '@service_container'",
+                "            - '%kernel.debug%'",
+                "        calls:",
+                "            - [setLogger, ['@logger']]",
+                "        tags:",
+                "            - { name: kernel.event_listener, event: kernel.request, priority: 0 }",
+                "        options:",
+                "            level1:",
+                "                level2:",
+                "                    level3:",
+                "                        enabled: true",
+                "                        name: service{0}".format(i),
+            ]);
+
+        return "\n".join(lines)+"\n";
+
+
+if __name__ == '__main__':
+    ParserBenchmark(*sys.argv[1:2]).run();
@@ -103,3 +103,10 @@ class Configuration(ConfigurationInterface):
         node =  node.end();
 
         return treeBuilder;
+
+    def getConfigTreeCacheKey(self):
+        """The tree does not depend on the instance, it is shared.
+
+        @return: None
+        """
+        return None;
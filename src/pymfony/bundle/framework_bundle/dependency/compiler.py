@@ -10,6 +10,7 @@ from __future__ import absolute_import;
 from pymfony.component.system import ClassLoader;
 from pymfony.component.system.exception import InvalidArgumentException;
 from pymfony.component.system.types import OrderedDict;
+from pymfony.component.system.types import String;
 
 from pymfony.component.dependency import ContainerBuilder;
 from pymfony.component.dependency.compilerpass import CompilerPassInterface;
@@ -33,6 +34,8 @@ class RegisterKernelListenersPass(CompilerPassInterface):
 
         listeners = container.findTaggedServiceIds('kernel.event_listener');
         for identifier, events in listeners.items():
+            scope = container.getDefinition(identifier).getScope();
+
             for event in events:
                 if 'priority' in event:
                     priority = event['priority'];
@@ -53,14 +56,17 @@ class RegisterKernelListenersPass(CompilerPassInterface):
                     event['method'] = 'on'+method;
 
                 definition.addMethodCall('addListenerService', [
-                    event['event'], [identifier, event['method']], priority
+                    event['event'], [identifier, event['method']], priority, scope
                 ]);
 
         subscribers = container.findTaggedServiceIds('kernel.event_subscriber');
         for identifier, events in subscribers.items():
             # We must assume that the class value has been correctly filled,
             # even if the service is created by a factory
-            qualClassName = container.getDefinition(identifier).getClass();
+            qualClassName = container.getParameterBag().resolveValue(
+                container.getDefinition(identifier).getClass()
+            );
+            scope = container.getDefinition(identifier).getScope();
 
             classType = ClassLoader.load(qualClassName);
 
@@ -70,9 +76,10 @@ class RegisterKernelListenersPass(CompilerPassInterface):
                     ''.format(identifier, repr(EventSubscriberInterface))
                 );
 
+            # the dispatcher reads the subscribed events from the class, the
+            # subscriber is only created when one of them is dispatched
             definition.addMethodCall('addSubscriberService', [
-                identifier,
-                qualClassName
+                identifier, qualClassName, scope
             ]);
 
 
@@ -127,6 +134,13 @@ class AddCacheClearerPass(CompilerPassInterface):
 class AddCacheWarmerPass(CompilerPassInterface):
     """Registers the cache warmers.
 
+    Besides the priority, a kernel.cache_warmer tag can have the attributes:
+
+      * parallel: whether the warmer can run at the same time as other
+        warmers;
+      * depends_on: the comma separated identifiers of the warmers that must
+        end before this one starts.
+
     @author Fabien Potencier <fabien@symfony.com>
 
     """
@@ -140,24 +154,43 @@ class AddCacheWarmerPass(CompilerPassInterface):
 
         warmers = dict();
         for identifier, attributes in container.findTaggedServiceIds('kernel.cache_warmer').items() :
-            priority = attributes[0]['priority'] if attributes and 'priority' in attributes[0] else '0';
+            attributes = attributes[0] if attributes else dict();
+            priority = int(attributes['priority']) if 'priority' in attributes else 0;
             if priority not in warmers:
                 warmers[priority] = list();
-            warmers[priority].append(Reference(identifier));
+            warmers[priority].append((identifier, attributes));
 
 
         if not warmers :
             return;
 
 
-        # sort by priority and flatten
+        # the warmers are added by priority, they run in that order
+        definition = container.getDefinition('cache_warmer');
         krsortWarmers = self.__krsort(warmers);
-        warmers = list();
         for warmerList in krsortWarmers.values():
-            for warmer in warmerList:
-                warmers.append(warmer);
+            for identifier, attributes in warmerList:
+                dependencies = None;
+                if 'depends_on' in attributes:
+                    dependencies = [
+                        dependency.strip()
+                        for dependency in str(attributes['depends_on']).split(',')
+                        if dependency.strip()
+                    ];
+
+                parallel = None;
+                if 'parallel' in attributes:
+                    parallel = self.__toBoolean(attributes['parallel']);
+
+                definition.addMethodCall('add', [
+                    Reference(identifier), identifier, dependencies, parallel
+                ]);
+
+    def __toBoolean(self, value):
+        if isinstance(value, String):
+            return value.lower() in ['1', 'true', 'yes', 'on'];
 
-        container.getDefinition('cache_warmer').replaceArgument(0, warmers);
+        return bool(value);
 
     def __krsort(self, d):
         assert isinstance(d, dict);
@@ -7,22 +7,43 @@
 # file that was distributed with this source code.
 from __future__ import absolute_import;
 
+import os;
 import os.path;
 import sys;
+import json;
+import tempfile;
+import threading;
 if sys.version_info[0] >= 3:
     from urllib.parse import urlparse;
 else:
     from urlparse import urlparse;
+try:
+    from os import scandir;
+except ImportError:
+    scandir = None;
+try:
+    from os import replace;
+except ImportError:
+    replace = None;
+try:
+    memoryview = memoryview;
+except NameError:
+    # Python 2.6
+    memoryview = None;
 
 from pymfony.component.system import Object;
 from pymfony.component.system.oop import interface;
 from pymfony.component.system.types import String;
 from pymfony.component.system.types import Array;
+from pymfony.component.system.types import OrderedDict;
 from pymfony.component.system.exception import InvalidArgumentException;
 from pymfony.component.system.exception import RuntimeException;
 from pymfony.component.system.serializer import unserialize;
 from pymfony.component.system.serializer import serialize;
 
+from pymfony.component.config.resource import FileResource;
+from pymfony.component.config.resource import DirectoryResource;
+
 """
 """
 
@@ -132,6 +153,165 @@ class FileLocator(FileLocatorInterface):
         return False;
 
 
+class CacheFileWriter(Object):
+    """Writes cache files atomically.
+
+    The content is written to a temporary file of the target directory,
+    which then replaces the target file. A reader, even in another process,
+    sees the previous file or the new one, never a partly written one. The
+    files are not synced to the disk: a cache file lost in a crash is built
+    again.
+
+    Several files can be added to a batch and committed together, none of
+    them is published when writing one of them fails.
+
+    The directories of the files must exist.
+
+    """
+
+    # the umask of the process, read once as reading it changes it
+    __umask = None;
+    __umaskLock = threading.Lock();
+
+    def __init__(self):
+        # {filename: temporary filename}
+        self.__batch = OrderedDict();
+
+    def write(self, filename, content):
+        """Writes a cache file.
+
+        @param filename: string The path of the file
+        @param content: bytes|bytearray|memoryview|string The content, a text
+                        is encoded in UTF-8
+
+        @raise RuntimeException: When the file cannot be written
+        """
+        tmpFile = self.__writeTemporaryFile(filename, content);
+        self.__publish(tmpFile, filename);
+
+    def add(self, filename, content):
+        """Adds a file to the batch, it is published on commit().
+
+        @param filename: string The path of the file
+        @param content: bytes|bytearray|memoryview|string The content
+
+        @raise RuntimeException: When the file cannot be written, the batch
+                                 is then rolled back
+        """
+        filename = str(filename);
+        try:
+            tmpFile = self.__writeTemporaryFile(filename, content);
+        except RuntimeException:
+            self.rollback();
+            raise;
+
+        previous = self.__batch.pop(filename, None);
+        if previous is not None:
+            self.__remove(previous);
+        self.__batch[filename] = tmpFile;
+
+    def commit(self):
+        """Publishes the files of the batch, in the order they were added.
+
+        @raise RuntimeException: When a file cannot be published, the files
+                                 that are not published yet are dropped
+        """
+        batch = self.__batch;
+        self.__batch = OrderedDict();
+
+        try:
+            while batch:
+                filename, tmpFile = batch.popitem(False);
+                self.__publish(tmpFile, filename);
+        finally:
+            for tmpFile in batch.values():
+                self.__remove(tmpFile);
+
+    def rollback(self):
+        """Drops the files of the batch.
+        """
+        batch = self.__batch;
+        self.__batch = OrderedDict();
+
+        for tmpFile in batch.values():
+            self.__remove(tmpFile);
+
+    def __writeTemporaryFile(self, filename, content):
+        """Writes the content to a new temporary file next to the target.
+
+        @return: string The path of the temporary file
+        """
+        if isinstance(content, String) and not isinstance(content, bytes):
+            content = content.encode('utf-8');
+
+        dirname, basename = os.path.split(str(filename));
+        try:
+            fd, tmpFile = tempfile.mkstemp('.tmp', basename+'.', dirname or '.');
+        except Exception:
+            raise RuntimeException('Failed to write cache file "{0}".'.format(filename));
+
+        try:
+            try:
+                if memoryview is None:
+                    # the writes then copy the rest of the content
+                    view = bytes(content);
+                else:
+                    view = memoryview(content);
+                    if view.itemsize != 1 or view.ndim != 1:
+                        if hasattr(view, 'cast'):
+                            view = view.cast('B');
+                        else:
+                            view = view.tobytes();
+                while len(view):
+                    view = view[os.write(fd, view):];
+
+                # the temporary file is only readable by its owner
+                mode = 0o666 & ~self.__getUmask();
+                if hasattr(os, 'fchmod'):
+                    os.fchmod(fd, mode);
+                else:
+                    os.chmod(tmpFile, mode);
+            finally:
+                os.close(fd);
+        except Exception:
+            self.__remove(tmpFile);
+            raise RuntimeException('Failed to write cache file "{0}".'.format(filename));
+
+        return tmpFile;
+
+    def __publish(self, tmpFile, filename):
+        try:
+            if replace is not None:
+                replace(tmpFile, filename);
+            else:
+                if os.name == 'nt' and os.path.exists(filename):
+                    os.remove(filename);
+                os.rename(tmpFile, filename);
+        except Exception:
+            self.__remove(tmpFile);
+            raise RuntimeException('Failed to write cache file "{0}".'.format(filename));
+
+    def __remove(self, tmpFile):
+        try:
+            os.remove(tmpFile);
+        except OSError:
+            pass;
+
+    @classmethod
+    def __getUmask(cls):
+        if cls.__umask is None:
+            cls.__umaskLock.acquire();
+            try:
+                if cls.__umask is None:
+                    umask = os.umask(0o22);
+                    os.umask(umask);
+                    cls.__umask = umask;
+            finally:
+                cls.__umaskLock.release();
+
+        return cls.__umask;
+
+
 class ConfigCache(Object):
     """ConfigCache manages PHP cache files.
 
@@ -187,19 +367,116 @@ class ConfigCache(Object):
         if not os.path.isfile(metadata) :
             return False;
 
+        try:
+            f = open(metadata);
+            try:
+                meta = json.loads(f.read());
+            finally:
+                f.close();
+            directories = meta['directories'];
+            resources = meta['resources'];
+        except Exception:
+            return False;
+
+        for directory, entries in directories.items():
+            if not self.__isDirectoryFresh(directory, entries):
+                return False;
+
+        if resources:
+            time = os.path.getmtime(self.__file);
+            for resource in unserialize(resources) :
+                if not resource.isFresh(time) :
+                    return False;
+
+        return True;
+
 
-        time = os.path.getmtime(self.__file);
-        f = open(metadata);
-        content = f.read();
-        f.close();
-        meta = unserialize(content);
-        for resource in meta :
-            if not resource.isFresh(time) :
+    def __isDirectoryFresh(self, directory, entries):
+        """Checks that the watched entries of a directory did not change
+        since the metadata was written.
+
+        The directory is listed once instead of stating each entry apart.
+
+        @param directory: string The directory path
+        @param entries: list of lists like [name, mtime, size], mtime and
+                        size are None for entries that did not exist
+
+        @return Boolean
+        """
+        if len(entries) == 1 or scandir is None:
+            for name, mtime, size in entries:
+                try:
+                    stat = os.stat(os.path.join(directory, name));
+                except OSError:
+                    if mtime is not None:
+                        return False;
+                    continue;
+                if stat.st_mtime != mtime or stat.st_size != size:
+                    return False;
+            return True;
+
+        try:
+            listing = dict();
+            for entry in scandir(directory):
+                listing[entry.name] = entry;
+        except OSError:
+            listing = dict();
+
+        for name, mtime, size in entries:
+            if name not in listing:
+                if mtime is not None:
+                    return False;
+                continue;
+            try:
+                stat = listing[name].stat();
+            except OSError:
+                return False;
+            if stat.st_mtime != mtime or stat.st_size != size:
                 return False;
 
         return True;
 
 
+    def __dumpMetadata(self, metadata):
+        """Dumps the metadata to a compact format.
+
+        The paths watched by file and directory resources are stored
+        with their modification time and size, grouped by directory. Other
+        resources are serialized.
+
+        @param metadata: ResourceInterface[] An array of ResourceInterface
+                         instances
+
+        @return: string
+        """
+        directories = dict();
+        resources = list();
+        for resource in metadata:
+            if not isinstance(resource, (FileResource, DirectoryResource)):
+                resources.append(resource);
+                continue;
+
+            for path in resource.getWatchedPaths():
+                directory, name = os.path.split(path);
+                try:
+                    stat = os.stat(path);
+                    entry = [name, stat.st_mtime, stat.st_size];
+                except OSError:
+                    entry = [name, None, None];
+
+                if directory not in directories:
+                    directories[directory] = dict();
+                directories[directory][name] = entry;
+
+        for directory in directories.keys():
+            directories[directory] = list(directories[directory].values());
+
+        return json.dumps({
+            'directories': directories,
+            'resources': serialize(resources) if resources else None,
+        });
+
+
     def write(self, content, metadata = None):
         """Writes cache.
 
@@ -216,74 +493,20 @@ class ConfigCache(Object):
             try:
                 os.makedirs(dirname, 0o777);
             except os.error:
-                raise RuntimeException('Unable to create the {0} directory'.format(dirname));
+                # another process may have created it
+                if not os.path.isdir(dirname):
+                    raise RuntimeException('Unable to create the {0} directory'.format(dirname));
 
         elif not os.access(dirname, os.W_OK) :
             raise RuntimeException('Unable to write in the {0} directory'.format(dirname));
 
-        try:
-            suffix = 0;
-            while os.path.exists(self.__file+str(suffix)):
-                suffix += 1;
-            tmpFile = self.__file+str(suffix);
-            f = open(tmpFile, 'w');
-            f.write(content);
-            f.close();
-            if os.path.exists(self.__file):
-                os.remove(self.__file);
-            os.rename(tmpFile, self.__file);
-            if hasattr(os, 'chmod'):
-                umask = os.umask(0o220);
-                os.umask(umask);
-                os.chmod(self.__file, 0o666 & ~umask);
-        except Exception:
-            raise RuntimeException('Failed to write cache file "{0}".'.format(self.__file));
-        else:
-            try:
-                if hasattr(os, 'chmod'):
-                    umask = os.umask(0o220);
-                    os.umask(umask);
-                    os.chmod(self.__file, 0o666 & ~umask);
-            except Exception:
-                pass;
-        finally:
-            try:
-                f.close();
-            except Exception:
-                pass;
-            if os.path.exists(tmpFile):
-                os.remove(tmpFile);
-
+        # both files are written before any of them is published, the
+        # metadata is published after the content so a new metadata never
+        # comes with the previous content
+        writer = CacheFileWriter();
+        writer.add(self.__file, content);
 
         if None is not metadata and True is self.__debug :
-            filename = self.__file+'.meta';
-            content = serialize(metadata);
+            writer.add(self.__file+'.meta', self.__dumpMetadata(metadata));
 
-            try:
-                suffix = 0;
-                while os.path.exists(filename+str(suffix)):
-                    suffix += 1;
-                tmpFile = filename+str(suffix);
-                f = open(tmpFile, 'w');
-                f.write(content);
-                f.close();
-                if os.path.exists(filename):
-                    os.remove(filename);
-                os.rename(tmpFile, filename);
-            except Exception:
-                pass;
-            else:
-                try:
-                    if hasattr(os, 'chmod'):
-                        umask = os.umask(0o220);
-                        os.umask(umask);
-                        os.chmod(filename, 0o666 & ~umask);
-                except Exception:
-                    pass;
-            finally:
-                try:
-                    f.close();
-                except Exception:
-                    pass;
-                if os.path.exists(tmpFile):
-                    os.remove(tmpFile);
+        writer.commit();
@@ -110,6 +110,13 @@ class NodeInterface(Object):
 class ConfigurationInterface(Object):
     """Configuration interface
 
+    The node tree of a configuration is built again each time it is
+    processed. A configuration can define a getConfigTreeCacheKey() method
+    to let the Processor build and compile its tree once and share it: the
+    method returns a hashable value identifying the tree among the instances
+    of the configuration class, e.g. None when the tree does not depend on
+    the instance or a tuple of the constructor arguments that change it.
+
     @author Victor Berchet <victor@suumit.com>
 
     """
@@ -175,10 +182,90 @@ class Processor(Object):
         assert isinstance(configuration, ConfigurationInterface);
         assert isinstance(configs, list);
 
-        return self.process(
-            configuration.getConfigTreeBuilder().buildTree(),
-            configs
-        );
+        if not hasattr(configuration, 'getConfigTreeCacheKey'):
+            # compiling a tree used once is slower than processing it
+            return self.process(self.buildConfigTree(configuration), configs);
+
+        return self.compileConfiguration(configuration).process(configs);
+
+    @classmethod
+    def buildConfigTree(cls, configuration):
+        """Builds the node tree of a configuration.
+
+        When the configuration defines a getConfigTreeCacheKey() method, the
+        tree is built once per configuration class and key, then shared: it
+        must not be modified. Otherwise a new tree is built.
+
+        @param configuration: ConfigurationInterface The configuration class
+
+        @return: NodeInterface The root node of the tree
+        """
+        assert isinstance(configuration, ConfigurationInterface);
+
+        trees, key = cls.__getTreeCache(configuration, '_configTrees');
+        if trees is None:
+            return configuration.getConfigTreeBuilder().buildTree();
+
+        try:
+            return trees[key];
+        except KeyError:
+            pass;
+
+        tree = configuration.getConfigTreeBuilder().buildTree();
+        trees[key] = tree;
+
+        return tree;
+
+    @classmethod
+    def compileConfiguration(cls, configuration):
+        """Compiles the node tree of a configuration.
+
+        The compiled tree is cached like the tree itself.
+
+        @param configuration: ConfigurationInterface The configuration class
+
+        @return: CompiledTree The compiled tree
+
+        @see: buildConfigTree()
+        """
+        assert isinstance(configuration, ConfigurationInterface);
+
+        trees, key = cls.__getTreeCache(configuration, '_compiledConfigTrees');
+        if trees is None:
+            return TreeCompiler().compile(cls.buildConfigTree(configuration));
+
+        try:
+            return trees[key];
+        except KeyError:
+            pass;
+
+        tree = TreeCompiler().compile(cls.buildConfigTree(configuration));
+        trees[key] = tree;
+
+        return tree;
+
+    @classmethod
+    def __getTreeCache(cls, configuration, name):
+        """Gets a cache of trees of a configuration class.
+
+        @param configuration: ConfigurationInterface The configuration class
+        @param name: string The class attribute holding the cache
+
+        @return: tuple (dict, mixed) The cache and the key of the
+                 configuration in it, (None, None) when the trees of the
+                 configuration are not cached
+        """
+        if not hasattr(configuration, 'getConfigTreeCacheKey'):
+            return None, None;
+
+        configurationClass = type(configuration);
+        # the subclasses do not share the cache of their parent class
+        trees = configurationClass.__dict__.get(name);
+        if trees is None:
+            trees = dict();
+            setattr(configurationClass, name, trees);
+
+        return trees, configuration.getConfigTreeCacheKey();
 
     @classmethod
     def normalizeConfig(cls, config, key, plural=None):
@@ -248,6 +335,7 @@ class BaseNode(NodeInterface):
 
         self._name = name;
         self._parent = parent;
+        self._path = None;
         self._normalizationClosures = list();
         self._finalValidationClosures = list();
         self._allowOverwrite = True;
@@ -364,14 +452,31 @@ class BaseNode(NodeInterface):
     def getPath(self):
         """Retrieves the path of this node.
 
+        The path is computed once, renaming the node resets it.
+
         @return string The Node's path
 
         """
-        path = self._name;
-        if not self._parent is None:
-            path = ".".join([self._parent.getPath(), self._name]);
+        if self._path is not None:
+            return self._path;
+
+        parent = self._parent;
+        if parent is None:
+            self._path = str(self._name);
+            return self._path;
+
+        path = ".".join([parent.getPath(), str(self._name)]);
+        # the path of a node with a foreign parent cannot be reset
+        if isinstance(parent, BaseNode) and parent._path is not None:
+            self._path = path;
+
         return path;
 
+    def _resetPath(self):
+        """Resets the computed path of this node and of its descendants.
+        """
+        self._path = None;
+
     @final
     def merge(self, leftSide, rightSide):
         """Merges two values together.
@@ -541,6 +646,7 @@ class VariableNode(BaseNode, PrototypeNodeInterface):
 
     def setName(self, name):
         self._name = name;
+        self._resetPath();
 
     def _validateType(self, value):
         pass;
@@ -644,15 +750,19 @@ class ArrayNode(BaseNode, PrototypeNodeInterface):
         if not self._normalizeKeys or not isinstance(value, dict):
             return value;
 
+        # the given value is copied before the first replaced key
+        normalized = value;
         for k, v in value.items():
             if '-' in str(k):
                 if not '_' in str(k):
                     normalizedKey = str(k).replace('-', '_');
-                    if not normalizedKey in value:
-                        value[normalizedKey] = v;
-                        value.pop(k);
+                    if not normalizedKey in normalized:
+                        if normalized is value:
+                            normalized = value.copy();
+                        normalized[normalizedKey] = v;
+                        normalized.pop(k);
 
-        return value;
+        return normalized;
 
     def getChildren(self):
         """Retrieves the children of this node.
@@ -711,6 +821,7 @@ class ArrayNode(BaseNode, PrototypeNodeInterface):
         @param name: string The node's name
         """
         self._name = str(name);
+        self._resetPath();
 
     def hasDefaultValue(self):
         """Checks if the node has a default value.
@@ -764,7 +875,18 @@ class ArrayNode(BaseNode, PrototypeNodeInterface):
             );
 
         self._children[name] = node;
+        if isinstance(node, BaseNode):
+            node._resetPath();
 
+    def _resetPath(self):
+        if self._path is None:
+            # the paths of the descendants are not computed either
+            return;
+
+        BaseNode._resetPath(self);
+        for child in self._children.values():
+            if isinstance(child, BaseNode):
+                child._resetPath();
 
     def _finalizeValue(self, value):
         """Finalizes the value of this node.
@@ -844,16 +966,13 @@ class ArrayNode(BaseNode, PrototypeNodeInterface):
         value = self._remapXml(value);
         normalized = dict();
 
-        valueCopy = value.copy();
-
         for name, child in self._children.items():
             assert isinstance(child, NodeInterface)
-            if name in valueCopy:
+            if name in value:
                 normalized[name] = child.normalize(value[name]);
-                valueCopy.pop(name);
 
         # if extra fields are present, throw exception
-        if valueCopy and not self._ignoreExtraKeys:
+        if len(normalized) != len(value) and not self._ignoreExtraKeys:
             ex = InvalidConfigurationException(
                 'Unrecognized options "{0}" under "{1}"'
                 ''.format(", ".join(value.keys()), self.getPath())
@@ -872,14 +991,18 @@ class ArrayNode(BaseNode, PrototypeNodeInterface):
         """
         assert isinstance(value, dict);
 
+        # the given value is copied before the first remapping
+        remapped = value;
         for singular, plural in self._xmlRemappings:
-            if not singular in value:
+            if not singular in remapped:
                 continue;
 
-            value[plural] = Processor.normalizeConfig(value, singular, plural);
-            value.pop(singular);
+            if remapped is value:
+                remapped = value.copy();
+            remapped[plural] = Processor.normalizeConfig(remapped, singular, plural);
+            remapped.pop(singular);
 
-        return value;
+        return remapped;
 
 
     def _mergeValues(self, leftSide, rightSide):
@@ -1078,6 +1201,8 @@ class PrototypedArrayNode(ArrayNode):
         """
         assert isinstance(node, PrototypeNodeInterface);
         self._prototype = node;
+        if isinstance(node, BaseNode):
+            node._resetPath();
 
     def getPrototype(self):
         """Retrieves the prototype
@@ -1099,6 +1224,14 @@ class PrototypedArrayNode(ArrayNode):
             'A prototyped array node can not have concrete children.'
         );
 
+    def _resetPath(self):
+        if self._path is None:
+            return;
+
+        ArrayNode._resetPath(self);
+        if isinstance(self._prototype, BaseNode):
+            self._prototype._resetPath();
+
     def _finalizeValue(self, value):
         """Finalizes the value of this node.
 
@@ -1113,7 +1246,7 @@ class PrototypedArrayNode(ArrayNode):
         """
         if value is False:
             raise UnsetKeyException(
-                'Unsetting key for path "%s", value: %s'
+                'Unsetting key for path "{0}", value: {1}'
                 ''.format(self.getPath(), json.dumps(value))
             )
 
@@ -1182,6 +1315,7 @@ class PrototypedArrayNode(ArrayNode):
 
                     # remove the key attribute when required
                     if self._removeKeyAttribute:
+                        v = v.copy();
                         del v[self._keyAttribute];
 
                     # if only "value" is left
@@ -1424,7 +1558,7 @@ class ReferenceDumper(Object):
     def dump(self, configuration):
         assert isinstance(configuration, ConfigurationInterface);
 
-        return self.dumpNode(configuration.getConfigTreeBuilder().buildTree());
+        return self.dumpNode(Processor.buildConfigTree(configuration));
 
 
     def dumpNode(self, node):
@@ -1617,3 +1751,831 @@ class ReferenceDumper(Object):
 
             if isinstance(value, (list, dict)) :
                 self.__writeArray(value, depth + 1);
+
+
+class CompiledTree(Object):
+    """The processing functions of a compiled node tree.
+
+    @see: TreeCompiler
+
+    """
+
+    def __init__(self, node, normalize, mergeAll, finalize):
+        """Constructor.
+
+        @param node: NodeInterface The root node of the tree
+        @param normalize: callable Takes a value and the path of the node
+        @param mergeAll: callable Takes a list of values and the path of the
+                                  node
+        @param finalize: callable Takes a value and the path of the node
+        """
+        assert isinstance(node, NodeInterface);
+
+        self.__node = node;
+        self.__path = node.getPath();
+        self.__normalize = normalize;
+        self.__mergeAll = mergeAll;
+        self.__finalize = finalize;
+
+    def getNode(self):
+        """Returns the root node of the tree.
+
+        @return: NodeInterface
+        """
+        return self.__node;
+
+    def normalize(self, value):
+        return self.__normalize(value, self.__path);
+
+    def merge(self, leftSide, rightSide):
+        return self.__mergeAll([leftSide, rightSide], self.__path);
+
+    def mergeAll(self, values):
+        """Merges several values together, as merging each of them in turn
+        into the result of the previous merges would do.
+
+        @param values: list The values to merge
+
+        @return: mixed The merged value
+        """
+        assert isinstance(values, list);
+
+        return self.__mergeAll(values, self.__path);
+
+    def finalize(self, value):
+        return self.__finalize(value, self.__path);
+
+    def process(self, configs):
+        """Processes an array of configurations.
+
+        The configurations are not modified, the processed configuration
+        may share their values.
+
+        @param configs: list An array of configuration items to process
+
+        @return dict The processed configuration
+        """
+        assert isinstance(configs, list);
+
+        path = self.__path;
+        normalize = self.__normalize;
+        mergeAll = self.__mergeAll;
+
+        try:
+            values = [dict()];
+            for config in configs:
+                values.append(normalize(config, path));
+
+            merged = mergeAll(values, path);
+        except Exception as e:
+            # all the configurations are normalized before being merged at
+            # once, the node tree normalizes and merges each of them in turn:
+            # the configurations are processed again that way to throw the
+            # first exception the node tree would throw
+            merged = dict();
+            for config in configs:
+                merged = mergeAll([merged, normalize(config, path)], path);
+
+            raise e;
+
+        return self.__finalize(merged, path);
+
+
+class TreeCompiler(Object):
+    """Compiles a node tree into processing functions.
+
+    Each node gets closures specialised for its settings: the checks of the
+    options it does not use are left out and its children are bound to the
+    closures of its parent. The path of a node is given to its closures
+    instead of being computed from its parents, so the prototype nodes are
+    not renamed for each entry. The compiled tree throws the same
+    exceptions with the same paths as the node tree.
+
+    The compiled tree does not modify the values it is given: a value is
+    only copied along the paths where it changes, the other values are
+    shared with the result. The values of several configurations are merged
+    at once, each node merges the values that all the configurations give
+    to it, instead of merging each configuration into the previous result.
+
+    The nodes of a class that is not known by the compiler, including the
+    subclasses of the known classes, process their values themselves.
+
+    """
+
+    # the classes of the nodes holding a scalar value
+    __scalarNodeClasses = (
+        VariableNode, ScalarNode, BooleanNode, EnumNode, NumericNode,
+        IntegerNode, FloatNode
+    );
+
+    def compile(self, node):
+        """Compiles a node tree.
+
+        @param node: NodeInterface The root node of the tree
+
+        @return: CompiledTree
+        """
+        assert isinstance(node, NodeInterface);
+
+        normalize, mergeAll, finalize, native = self.__compileNode(node);
+
+        return CompiledTree(node, normalize, mergeAll, finalize);
+
+    def __compileNode(self, node):
+        """Compiles a node.
+
+        @param node: NodeInterface
+
+        @return: tuple (normalize, mergeAll, finalize, native) where native
+                 is whether the whole subtree is compiled
+        """
+        nodeClass = type(node);
+        if nodeClass in (ArrayNode, PrototypedArrayNode):
+            validate = self.__compileArrayValidation(node);
+            if nodeClass is ArrayNode:
+                normalizeValue, mergeValues, finalizeValue, native = \
+                    self.__compileArrayNode(node);
+            else:
+                normalizeValue, mergeValues, finalizeValue, native = \
+                    self.__compilePrototypedArrayNode(node);
+            preNormalize = None;
+            if node._normalizeKeys:
+                preNormalize = node._preNormalize;
+        elif nodeClass in self.__scalarNodeClasses:
+            validate = self.__compileScalarValidation(node);
+            normalizeValue = None;
+            mergeValues = self.__mergeVariables;
+            finalizeValue = self.__compileScalarFinalization(node);
+            native = True;
+            preNormalize = None;
+        else:
+            return self.__compileForeignNode(node);
+
+        return (
+            self.__compileNormalize(node, preNormalize, validate, normalizeValue),
+            self.__compileMerge(node, validate, mergeValues),
+            self.__compileFinalize(node, validate, finalizeValue),
+            native
+        );
+
+    def __compileForeignNode(self, node):
+
+        def normalize(value, path):
+            return node.normalize(value);
+
+        def mergeAll(values, path):
+            merged = values[0];
+            for value in values[1:]:
+                merged = node.merge(merged, value);
+
+            return merged;
+
+        def finalize(value, path):
+            return node.finalize(value);
+
+        return normalize, mergeAll, finalize, False;
+
+    def __compileNormalize(self, node, preNormalize, validate, normalizeValue):
+        """@see: BaseNode.normalize()
+        """
+        closures = tuple(node._normalizationClosures);
+        equivalents = tuple(tuple(data) for data in node._equivalentValues);
+        # a string, a dict or a list only equals a value of the same kind
+        equivalentsByType = dict();
+        for valueType in (str, dict, list):
+            equivalentsByType[valueType] = tuple(
+                data for data in equivalents if isinstance(data[0], valueType)
+            );
+
+        if None is preNormalize and not closures and not equivalents:
+            if None is normalizeValue:
+                def normalize(value, path):
+                    validate(value, path);
+
+                    return value;
+            else:
+                def normalize(value, path):
+                    validate(value, path);
+
+                    return normalizeValue(value, path);
+
+            return normalize;
+
+        def normalize(value, path):
+            if None is not preNormalize:
+                value = preNormalize(value);
+
+            for closure in closures:
+                value = closure(value);
+
+            for original, equivalent in equivalentsByType.get(type(value), equivalents):
+                if original == value:
+                    value = equivalent;
+
+            validate(value, path);
+
+            if None is normalizeValue:
+                return value;
+
+            return normalizeValue(value, path);
+
+        return normalize;
+
+    def __compileMerge(self, node, validate, mergeValues):
+        """@see: BaseNode.merge()
+
+        The returned function merges a list of values. A node given a
+        single value returns it, as a node that is not merged.
+        """
+        allowOverwrite = node._allowOverwrite;
+
+        def mergeAll(values, path):
+            if 1 == len(values):
+                return values[0];
+
+            if not allowOverwrite:
+                raise ForbiddenOverwriteException(
+                    'Configuration path "{0}" cannot be overwritten. You have '
+                    'to define all options for this path, and any of its '
+                    'sub-paths in one configuration section.'.format(path)
+                );
+
+            for value in values:
+                validate(value, path);
+
+            return mergeValues(values, path);
+
+        return mergeAll;
+
+    def __compileFinalize(self, node, validate, finalizeValue):
+        """@see: BaseNode.finalize()
+        """
+        closures = tuple(node._finalValidationClosures);
+
+        def finalize(value, path):
+            validate(value, path);
+            if None is not finalizeValue:
+                value = finalizeValue(value, path);
+
+            for closure in closures:
+                try:
+                    value = closure(value);
+                except DefinitionException as correctEx:
+                    raise correctEx;
+                except Exception as invalid:
+                    raise InvalidConfigurationException(
+                        'Invalid configuration for path "{0}": {1}'
+                        ''.format(path, str(invalid)),
+                        previous=invalid
+                    );
+
+            return value;
+
+        return finalize;
+
+    def __mergeVariables(self, values, path):
+        return values[-1];
+
+    def __getMergedValues(self, values, performDeepMerging):
+        """Gets the values that are merged key by key: the values before the
+        last one that replaces the merged value are lost.
+
+        @param values: list The values of a node
+        @param performDeepMerging: Boolean
+
+        @return: list The values whose keys are merged into the first one
+        """
+        start = 0;
+        empty = not values[0];
+        for i in range(1, len(values)):
+            value = values[i];
+            if value is False or empty or not performDeepMerging:
+                start = i;
+                empty = not value;
+
+        # an empty value does not change the merged value
+        merged = [values[start]];
+        for value in values[start + 1:]:
+            if value:
+                merged.append(value);
+
+        return merged;
+
+    def __compileScalarValidation(self, node):
+        """@see: VariableNode._validateType() and its subclasses
+        """
+        nodeClass = type(node);
+
+        if nodeClass is VariableNode:
+            def validate(value, path):
+                pass;
+        elif nodeClass is BooleanNode:
+            def validate(value, path):
+                if not isinstance(value, bool):
+                    ex = InvalidTypeException(
+                        'Invalid type for path "{0}". Expected boolean, but '
+                        'got {1}.'.format(path, type(value).__name__)
+                    );
+                    ex.setPath(path);
+                    raise ex;
+        elif nodeClass is IntegerNode:
+            def validate(value, path):
+                if not isinstance(value, int) or value is False or value is True:
+                    ex = InvalidTypeException(
+                        'Invalid type for path "{0}". Expected int, but got '
+                        '{1}.'.format(path, type(value))
+                    );
+                    ex.setPath(path);
+                    raise ex;
+        elif nodeClass is FloatNode:
+            def validate(value, path):
+                if isinstance(value, int) and value is not True and value is not False:
+                    return;
+
+                if not isinstance(value, float):
+                    ex = InvalidTypeException(
+                        'Invalid type for path "{0}". Expected float, but got '
+                        '{1}.'.format(path, type(value))
+                    );
+                    ex.setPath(path);
+                    raise ex;
+        else:
+            scalarTypes = (type(None), String, int, float, bool);
+            # String is an abstract class, the builtin types are checked first
+            builtinTypes = frozenset([type(None), str, int, float, bool]);
+            def validate(value, path):
+                if type(value) not in builtinTypes and not isinstance(value, scalarTypes):
+                    ex = InvalidTypeException(
+                        'Invalid type for path "{0}". Expected scalar, but got '
+                        '{1}.'.format(path, type(value).__name__)
+                    );
+                    ex.setPath(path);
+                    raise ex;
+
+        return validate;
+
+    def __compileScalarFinalization(self, node):
+        """@see: VariableNode._finalizeValue() and its subclasses
+        """
+        allowEmptyValue = node._allowEmptyValue;
+        values = None;
+        if isinstance(node, EnumNode):
+            values = node.getValues();
+        minValue = None;
+        maxValue = None;
+        if isinstance(node, NumericNode):
+            minValue = node._min;
+            maxValue = node._max;
+
+        if allowEmptyValue and None is values and not minValue and not maxValue:
+            return None;
+
+        def finalizeValue(value, path):
+            if not allowEmptyValue and not value:
+                ex = InvalidConfigurationException(
+                    'The path "{0}" cannot contain an empty value, but got {1}.'
+                    ''.format(path, json.dumps(value))
+                );
+                ex.setPath(path);
+                raise ex;
+
+            if None is not values and value not in values:
+                ex = InvalidConfigurationException(
+                    'The value {0} is not allowed for path "{1}". Permissible '
+                    'values: {2}'.format(
+                    json.dumps(value),
+                    path,
+                    ', '.join(map(json.dumps, values))));
+                ex.setPath(path);
+                raise ex;
+
+            errorMsg = None;
+            if minValue and value < minValue:
+                errorMsg = (
+                    'The value {0} is too small for path "{1}". Should be '
+                    'greater than: {2}'.format(value, path, minValue)
+                );
+
+            if maxValue and value > maxValue:
+                errorMsg = (
+                    'The value {0} is too big for path "{1}". Should be less '
+                    'than: {2}'.format(value, path, maxValue)
+                );
+
+            if errorMsg:
+                ex = InvalidConfigurationException(errorMsg);
+                ex.setPath(path);
+                raise ex;
+
+            return value;
+
+        return finalizeValue;
+
+    def __compileArrayValidation(self, node):
+        """@see: ArrayNode._validateType()
+        """
+        allowFalse = node._allowFalse;
+
+        def validate(value, path):
+            if not isinstance(value, (dict, list)):
+                if not allowFalse or value:
+                    ex = InvalidTypeException(
+                        'Invalid type for path "{0}". Expected array, but got '
+                        '{1}'.format(path, type(value).__name__)
+                    );
+                    ex.setPath(path);
+                    raise ex;
+
+        return validate;
+
+    def __compileRemapXml(self, node):
+        """@see: ArrayNode._remapXml()
+        """
+        remappings = tuple(tuple(remapping) for remapping in node._xmlRemappings);
+        if not remappings:
+            return None;
+
+        def remapXml(value):
+            remapped = value;
+            for singular, plural in remappings:
+                if not singular in remapped:
+                    continue;
+
+                if remapped is value:
+                    remapped = value.copy();
+                remapped[plural] = Processor.normalizeConfig(remapped, singular, plural);
+                remapped.pop(singular);
+
+            return remapped;
+
+        return remapXml;
+
+    def __compileArrayNode(self, node):
+        """@see: ArrayNode._normalizeValue(), ArrayNode._mergeValues() and
+        ArrayNode._finalizeValue()
+        """
+        remapXml = self.__compileRemapXml(node);
+        ignoreExtraKeys = node._ignoreExtraKeys;
+        allowNewKeys = node._allowNewKeys;
+        performDeepMerging = node._performDeepMerging;
+
+        native = True;
+        normalizers = list();
+        mergers = dict();
+        finalizers = list();
+        for name, child in node.getChildren().items():
+            normalize, mergeAll, finalize, childNative = self.__compileNode(child);
+            native = native and childNative;
+            suffix = '.' + name;
+            normalizers.append((name, suffix, normalize));
+            mergers[name] = (suffix, mergeAll);
+            finalizers.append((
+                name, suffix, finalize, child.isRequired(),
+                self.__compileDefaultValue(child)
+            ));
+        normalizers = tuple(normalizers);
+        finalizers = tuple(finalizers);
+        names = tuple(name for name, suffix, normalize in normalizers);
+        getMergedValues = self.__getMergedValues;
+
+        def normalizeValue(value, path):
+            if value is False:
+                return value;
+
+            if isinstance(value, list):
+                value = Array.toDict(value);
+
+            assert isinstance(value, dict);
+
+            if None is not remapXml:
+                value = remapXml(value);
+
+            # the value is copied from the first child that changes
+            normalized = None;
+            count = 0;
+            for index, (name, suffix, normalize) in enumerate(normalizers):
+                if name not in value:
+                    continue;
+
+                count += 1;
+                childValue = value[name];
+                normalizedValue = normalize(childValue, path + suffix);
+                if None is normalized:
+                    if normalizedValue is childValue:
+                        continue;
+
+                    normalized = dict();
+                    for previous in names[:index]:
+                        if previous in value:
+                            normalized[previous] = value[previous];
+
+                normalized[name] = normalizedValue;
+
+            if count != len(value):
+                # if extra fields are present, throw exception
+                if not ignoreExtraKeys:
+                    ex = InvalidConfigurationException(
+                        'Unrecognized options "{0}" under "{1}"'
+                        ''.format(", ".join(value.keys()), path)
+                    );
+                    ex.setPath(path);
+                    raise ex;
+
+                if None is normalized:
+                    normalized = dict();
+                    for name in names:
+                        if name in value:
+                            normalized[name] = value[name];
+
+            if None is normalized:
+                return value;
+
+            return normalized;
+
+        def mergeValues(values, path):
+            values = getMergedValues(values, performDeepMerging);
+            if 1 == len(values):
+                return values[0];
+
+            merged = values[0];
+            if isinstance(merged, list):
+                merged = Array.toDict(merged);
+            else:
+                merged = merged.copy();
+
+            # the values of the keys that several values define
+            conflicts = OrderedDict();
+            for value in values[1:]:
+                if isinstance(value, list):
+                    value = Array.toDict(value);
+
+                for k, v in value.items():
+                    # no conflict
+                    if k not in merged:
+                        if not allowNewKeys:
+                            self.__raiseNewKeys(path);
+
+                        merged[k] = v;
+                        continue;
+
+                    if k not in mergers:
+                        raise RuntimeException(
+                            'merge() expects a normalized config array.'
+                        );
+
+                    if k in conflicts:
+                        conflicts[k].append(v);
+                    else:
+                        conflicts[k] = [merged[k], v];
+
+            for k, kValues in conflicts.items():
+                suffix, mergeAll = mergers[k];
+                merged[k] = mergeAll(kValues, path + suffix);
+
+            return merged;
+
+        def finalizeValue(value, path):
+            if value is False:
+                raise UnsetKeyException(
+                    'Unsetting key for path "{0}", value: {1}'
+                    ''.format(path, json.dumps(value))
+                );
+
+            # the value is copied once a child changes
+            finalized = value;
+            for name, suffix, finalize, required, getDefaultValue in finalizers:
+                if not name in value:
+                    if required:
+                        ex = InvalidConfigurationException(
+                            'The child node "{0}" at path "{1}" must be '
+                            'configured.'.format(name, path)
+                        );
+                        ex.setPath(path);
+                        raise ex;
+
+                    if None is not getDefaultValue:
+                        if finalized is value:
+                            finalized = value.copy();
+                        finalized[name] = getDefaultValue();
+
+                    continue;
+
+                childValue = value[name];
+                try:
+                    finalizedValue = finalize(childValue, path + suffix);
+                except UnsetKeyException:
+                    if finalized is value:
+                        finalized = value.copy();
+                    finalized.pop(name);
+                    continue;
+
+                if finalizedValue is not childValue:
+                    if finalized is value:
+                        finalized = value.copy();
+                    finalized[name] = finalizedValue;
+
+            return finalized;
+
+        return normalizeValue, mergeValues, finalizeValue, native;
+
+    def __compileDefaultValue(self, node):
+        """@see: NodeInterface.getDefaultValue()
+
+        @return: callable|None None when the node has no default value
+        """
+        if not node.hasDefaultValue():
+            return None;
+
+        if type(node) in self.__scalarNodeClasses \
+            and not hasattr(node._defaultValue, '__call__'):
+            # the node always returns the same value
+            defaultValue = node.getDefaultValue();
+
+            return lambda: defaultValue;
+
+        return node.getDefaultValue;
+
+    def __compilePrototypedArrayNode(self, node):
+        """@see: PrototypedArrayNode._normalizeValue(),
+        PrototypedArrayNode._mergeValues() and
+        PrototypedArrayNode._finalizeValue()
+        """
+        remapXml = self.__compileRemapXml(node);
+        allowNewKeys = node._allowNewKeys;
+        performDeepMerging = node._performDeepMerging;
+        keyAttribute = node.getKeyAttribute();
+        removeKeyAttribute = node._removeKeyAttribute;
+        minNumberOfElements = node._minNumberOfElements;
+
+        prototype = node.getPrototype();
+        normalize, mergeAll, finalize, native = self.__compileNode(prototype);
+        # the nodes that are not compiled read the path from their parents
+        setName = None;
+        if not native:
+            setName = prototype.setName;
+        getMergedValues = self.__getMergedValues;
+
+        def normalizeValue(value, path):
+            if value is False:
+                return value;
+
+            if isinstance(value, list):
+                value = Array.toDict(value);
+
+            assert isinstance(value, dict);
+
+            if None is not remapXml:
+                value = remapXml(value);
+
+            isAssoc = list(value.keys()) != list(range(len(value)));
+            normalized = dict();
+
+            i = -1;
+            for k, v in value.items():
+                i += 1;
+
+                if keyAttribute is not None and isinstance(v, (dict, list)):
+                    if isinstance(v, list):
+                        v = Array.toDict(v);
+
+                    if keyAttribute not in v \
+                        and isinstance(k, int) \
+                        and not isAssoc:
+                        ex = InvalidConfigurationException(
+                            'The attribute "{0}" must be set for path "{1}".'
+                            ''.format(keyAttribute, path)
+                        );
+                        ex.setPath(path);
+                        raise ex;
+                    elif keyAttribute in v:
+                        k = v[keyAttribute];
+
+                        # remove the key attribute when required
+                        if removeKeyAttribute:
+                            v = v.copy();
+                            del v[keyAttribute];
+
+                        # if only "value" is left
+                        if 1 == len(v) and 'value' in v:
+                            v = v['value'];
+
+                    if k in normalized:
+                        ex = DuplicateKeyException(
+                            'Duplicate key "{0}" for path "{1}".'
+                            ''.format(k, path)
+                        );
+                        ex.setPath(path);
+                        raise ex;
+
+                if None is not setName:
+                    setName(k);
+                if keyAttribute is not None or isAssoc:
+                    normalized[k] = normalize(v, path + '.' + str(k));
+                else:
+                    normalized[i] = normalize(v, path + '.' + str(k));
+
+            return normalized;
+
+        def mergeValues(values, path):
+            values = getMergedValues(values, performDeepMerging);
+            if 1 == len(values):
+                return values[0];
+
+            merged = values[0];
+            if isinstance(merged, list):
+                merged = Array.toDict(merged);
+            else:
+                merged = merged.copy();
+
+            # prototype, and key is irrelevant, so simply append the elements
+            if keyAttribute is None:
+                # the keys are only added, the next free index is never
+                # lower than the previous one
+                index = 0;
+                for value in values[1:]:
+                    if isinstance(value, list):
+                        value = Array.toDict(value);
+
+                    for v in value.values():
+                        while index in merged:
+                            index += 1;
+                        merged[index] = v;
+
+                return merged;
+
+            # the values of the keys that several values define
+            conflicts = OrderedDict();
+            for value in values[1:]:
+                if isinstance(value, list):
+                    value = Array.toDict(value);
+
+                for k, v in value.items():
+                    # no conflict
+                    if k not in merged:
+                        if not allowNewKeys:
+                            self.__raiseNewKeys(path);
+
+                        merged[k] = v;
+                        continue;
+
+                    if k in conflicts:
+                        conflicts[k].append(v);
+                    else:
+                        conflicts[k] = [merged[k], v];
+
+            for k, kValues in conflicts.items():
+                if None is not setName:
+                    setName(k);
+                merged[k] = mergeAll(kValues, path + '.' + str(k));
+
+            return merged;
+
+        def finalizeValue(value, path):
+            if value is False:
+                raise UnsetKeyException(
+                    'Unsetting key for path "{0}", value: {1}'
+                    ''.format(path, json.dumps(value))
+                );
+
+            assert isinstance(value, dict);
+
+            # the value is copied once an element changes
+            finalized = value;
+            for k, v in value.items():
+                if None is not setName:
+                    setName(k);
+                try:
+                    finalizedValue = finalize(v, path + '.' + str(k));
+                except UnsetKeyException:
+                    if finalized is value:
+                        finalized = value.copy();
+                    finalized.pop(k);
+                    continue;
+
+                if finalizedValue is not v:
+                    if finalized is value:
+                        finalized = value.copy();
+                    finalized[k] = finalizedValue;
+            value = finalized;
+
+            if len(value) < minNumberOfElements:
+                ex = InvalidConfigurationException(
+                    'The path "{0}" should have at least {1} element(s) '
+                    'defined.'.format(path, minNumberOfElements)
+                );
+                ex.setPath(path);
+                raise ex;
+
+            return value;
+
+        return normalizeValue, mergeValues, finalizeValue, native;
+
+    def __raiseNewKeys(self, path):
+        ex = InvalidConfigurationException(
+            'You are not allowed to define new elements for path "{0}". '
+            'Please define all elements for this path in one config file. If '
+            'you are trying to overwrite an element, make sure you redefine '
+            'it with the same name.'.format(path)
+        );
+        ex.setPath(path);
+        raise ex;
@@ -7,11 +7,18 @@
 # file that was distributed with this source code.
 from __future__ import absolute_import;
 
+import os;
+import copy;
+import pickle;
+
 from pymfony.component.system import Object;
 from pymfony.component.system.oop import interface;
 from pymfony.component.system.oop import abstract;
+from pymfony.component.system.types import OrderedDict;
+from pymfony.component.system.serializer import PICKLE_PROTOCOL;
 
 from pymfony.component.config import FileLocatorInterface;
+from pymfony.component.config import CacheFileWriter;
 from pymfony.component.config.exception import FileLoaderImportCircularReferenceException;
 from pymfony.component.config.exception import FileLoaderLoadException;
 
@@ -298,3 +305,164 @@ class FileLoader(Loader):
                 if isinstance(e, FileLoaderLoadException):
                     raise e;
                 raise FileLoaderLoadException(resource, sourceResource, 0, e);
+
+
+class ParsedFileCache(Object):
+    """ParsedFileCache keeps the parsed content of files, so that a file
+    loaded again by another loader or another container build is only
+    parsed when it changed.
+
+    Entries are keyed by the real path of the file and checked against its
+    modification time and size. The least recently used entries are dropped
+    once the cache holds more than its maximum size.
+
+    """
+
+    DEFAULT_MAX_SIZE = 512;
+
+    __instance = None;
+
+    def __init__(self, maxSize = DEFAULT_MAX_SIZE):
+        """Constructor.
+
+        @param maxSize: int The maximum number of files to keep
+
+        """
+        self.__maxSize = int(maxSize);
+        self.__entries = OrderedDict();
+        self.__changed = False;
+
+    @classmethod
+    def getInstance(cls):
+        """Gets the cache shared by the loaders of the process.
+
+        @return: ParsedFileCache
+
+        """
+        if cls.__instance is None:
+            cls.__instance = cls();
+
+        return cls.__instance;
+
+    def get(self, filename, parser):
+        """Gets the parsed content of a file.
+
+        The content is a copy, loaders are free to modify it.
+
+        @param filename: string The path of the file
+        @param parser:   callable Parses the file when it is not in the cache,
+                         it takes the path of the file
+
+        @return: mixed The parsed content
+
+        """
+        path = os.path.realpath(filename);
+        stat = os.stat(path);
+        version = (stat.st_mtime, stat.st_size);
+
+        entry = self.__entries.pop(path, None);
+        if entry is None or entry[0] != version:
+            entry = (version, parser(filename));
+            self.__changed = True;
+
+        self.__entries[path] = entry;
+        while len(self.__entries) > self.__maxSize:
+            self.__entries.popitem(False);
+
+        return copy.deepcopy(entry[1]);
+
+    def has(self, filename):
+        """Checks if the parsed content of a file is up to date.
+
+        @param filename: string The path of the file
+
+        @return: Boolean
+
+        """
+        path = os.path.realpath(filename);
+        if path not in self.__entries:
+            return False;
+
+        try:
+            stat = os.stat(path);
+        except OSError:
+            return False;
+
+        return self.__entries[path][0] == (stat.st_mtime, stat.st_size);
+
+    def clear(self):
+        """Removes all entries.
+
+        """
+        self.__entries.clear();
+        self.__changed = True;
+
+    def load(self, filename):
+        """Adds the entries dumped to a file, the ones already in the cache
+        are kept.
+
+        A missing or unreadable file is ignored.
+
+        @param filename: string
+
+        """
+        try:
+            f = open(filename, 'rb');
+            try:
+                entries = pickle.load(f);
+            finally:
+                f.close();
+        except Exception:
+            return;
+
+        if not isinstance(entries, list):
+            return;
+
+        # the loaded entries are older than the ones of this process
+        merged = OrderedDict();
+        for path, entry in entries:
+            if path not in self.__entries:
+                merged[path] = entry;
+        merged.update(self.__entries);
+
+        while len(merged) > self.__maxSize:
+            merged.popitem(False);
+
+        self.__entries = merged;
+
+    def dump(self, filename):
+        """Dumps the entries to a file, when they changed since the cache
+        was created or last dumped.
+
+        Entries that cannot be pickled are not dumped.
+
+        @param filename: string
+
+        """
+        if not self.__changed:
+            return;
+
+        entries = list(self.__entries.items());
+        try:
+            content = pickle.dumps(entries, PICKLE_PROTOCOL);
+        except Exception:
+            content = pickle.dumps(
+                [e for e in entries if self.__isPicklable(e)],
+                PICKLE_PROTOCOL
+            );
+
+        dirname = os.path.dirname(filename);
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname, 0o777);
+
+        CacheFileWriter().write(filename, content);
+
+        self.__changed = False;
+
+    def __isPicklable(self, value):
+        try:
+            pickle.dumps(value, PICKLE_PROTOCOL);
+        except Exception:
+            return False;
+
+        return True;
@@ -8,10 +8,15 @@
 
 from __future__ import absolute_import;
 
+import os;
 import os.path;
 import re;
 from pickle import dumps as serialize;
 from pickle import loads as unserialize;
+try:
+    from os import scandir;
+except ImportError:
+    scandir = None;
 
 from pymfony.component.system import Object;
 from pymfony.component.system import SerializableInterface;
@@ -103,6 +108,13 @@ class FileResource(ResourceInterface, SerializableInterface):
             return False;
         return os.path.getmtime(self.__resource) < timestamp;
 
+    def getWatchedPaths(self):
+        """Returns the paths whose changes make the resource stale.
+
+        @return: list
+        """
+        return [self.__resource];
+
     def serialize(self):
         return serialize(self.__resource);
 
@@ -169,23 +181,64 @@ class DirectoryResource(ResourceInterface, SerializableInterface):
         if ( not os.path.isdir(self.__resource)) :
             return False;
 
+        for path in self.__walk():
+            if os.path.getmtime(path) >= timestamp:
+                return False;
+
+        return True;
+
+
+    def getWatchedPaths(self):
+        """Returns the paths whose changes make the resource stale.
+
+        These are the directory itself, all its subdirectories, whose
+        modification time changes when an entry is added or removed, and the
+        files matching the pattern.
+
+        @return: list
+        """
+        if not os.path.isdir(self.__resource):
+            return [str(self.__resource)];
 
-        newestMTime = os.path.getmtime(self.__resource);
-        for root, dirs, files in os.walk(self.__resource, followlinks=True):
-            for filename in files + dirs:
-                filename = '/'.join([root, filename]);
+        return list(self.__walk());
+
+
+    def __walk(self):
+        """Walks the directory tree.
+
+        @return: iterator Over the directory, its subdirectories and the
+                 files matching the pattern
+        """
+        stack = [str(self.__resource)];
+        while stack:
+            directory = stack.pop();
+            yield directory;
+
+            for name, isDir in self.__listDirectory(directory):
+                path = directory+'/'+name;
+                if isDir:
+                    stack.append(path);
                 # if regex filtering is enabled only check matching files:
-                if (self.__pattern and os.path.isfile(filename) and  not re.search(self.__pattern, os.path.basename(filename))) :
-                    continue;
+                elif not self.__pattern or re.search(self.__pattern, name):
+                    yield path;
 
-                # always monitor directories for changes, except the .. entries
-                # (otherwise deleted files wouldn't get detected)
-                if os.path.isdir(filename) and '/..' == filename[-3:] :
-                    continue;
 
-                newestMTime = max(os.path.getmtime(filename), newestMTime);
+    def __listDirectory(self, directory):
+        """Lists the entries of a directory.
+
+        @param directory: string
+
+        @return: list of tuples like (name, isDir)
+        """
+        entries = list();
+        if scandir is not None:
+            for entry in scandir(directory):
+                entries.append((entry.name, entry.is_dir()));
+        else:
+            for name in os.listdir(directory):
+                entries.append((name, os.path.isdir(directory+'/'+name)));
 
-        return newestMTime < timestamp;
+        return entries;
 
 
     def serialize(self):
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import tempfile;
+import os;
+import shutil;
+import stat;
+
+from pymfony.component.config import CacheFileWriter;
+from pymfony.component.system.exception import RuntimeException;
+
+"""
+"""
+
+class CacheFileWriterTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._directory = tempfile.mkdtemp();
+
+
+    def tearDown(self):
+
+        shutil.rmtree(self._directory, ignore_errors=True);
+
+
+    def testWrite(self):
+
+        writer = CacheFileWriter();
+        filename = self._directory+'/cache.py';
+
+        writer.write(filename, b'bytes');
+        self.assertEqual(b'bytes', self._read(filename));
+
+        writer.write(filename, bytearray(b'array'));
+        self.assertEqual(b'array', self._read(filename));
+
+        try:
+            writer.write(filename, memoryview(b'view'));
+            self.assertEqual(b'view', self._read(filename));
+        except NameError:
+            # Python 2.6
+            pass;
+
+        writer.write(filename, u'café');
+        self.assertEqual(u'café'.encode('utf-8'), self._read(filename));
+
+        self.assertEqual(['cache.py'], os.listdir(self._directory));
+
+
+    def testWriteFollowsTheUmask(self):
+
+        umask = os.umask(0);
+        os.umask(umask);
+
+        filename = self._directory+'/cache.py';
+        CacheFileWriter().write(filename, 'content');
+
+        self.assertEqual(0o666 & ~umask, stat.S_IMODE(os.stat(filename).st_mode));
+
+
+    def testWriteFailures(self):
+
+        writer = CacheFileWriter();
+
+        os.mkdir(self._directory+'/dir');
+        for filename in [self._directory+'/missing/cache.py', self._directory+'/dir']:
+            try:
+                writer.write(filename, 'content');
+                self.fail();
+            except RuntimeException:
+                pass;
+
+        self.assertEqual(['dir'], os.listdir(self._directory));
+        self.assertEqual([], os.listdir(self._directory+'/dir'));
+
+
+    def testCommit(self):
+
+        writer = CacheFileWriter();
+        writer.add(self._directory+'/foo.py', 'foo');
+        writer.add(self._directory+'/bar.py', 'bar');
+        writer.add(self._directory+'/foo.py', 'new foo');
+
+        self.assertFalse(os.path.exists(self._directory+'/foo.py'));
+
+        writer.commit();
+
+        self.assertEqual(['bar.py', 'foo.py'], sorted(os.listdir(self._directory)));
+        self.assertEqual(b'new foo', self._read(self._directory+'/foo.py'));
+        self.assertEqual(b'bar', self._read(self._directory+'/bar.py'));
+
+
+    def testRollback(self):
+
+        writer = CacheFileWriter();
+        writer.add(self._directory+'/foo.py', 'foo');
+        writer.rollback();
+        writer.commit();
+
+        self.assertEqual([], os.listdir(self._directory));
+
+
+    def testAddFailureRollsBackTheBatch(self):
+
+        writer = CacheFileWriter();
+        writer.add(self._directory+'/foo.py', 'foo');
+        try:
+            writer.add(self._directory+'/missing/bar.py', 'bar');
+            self.fail();
+        except RuntimeException:
+            pass;
+        writer.commit();
+
+        self.assertEqual([], os.listdir(self._directory));
+
+
+    def _read(self, filename):
+
+        f = open(filename, 'rb');
+        try:
+            return f.read();
+        finally:
+            f.close();
+
+
+if __name__ == '__main__':
+    unittest.main();
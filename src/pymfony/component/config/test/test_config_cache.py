@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import tempfile;
+import os;
+import shutil;
+import json;
+from time import time;
+
+from pymfony.component.config import ConfigCache;
+from pymfony.component.config.resource import FileResource;
+from pymfony.component.config.resource import DirectoryResource;
+from pymfony.component.config.resource import ResourceInterface;
+from pymfony.component.system.serializer import serialize;
+from pymfony.component.system.exception import RuntimeException;
+
+"""
+"""
+
+class ConfigCacheTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._directory = tempfile.mkdtemp();
+        self._cacheFile = self._directory+'/cache.py';
+        self._resourceFile = self._directory+'/config.yml';
+        self._resourceDirectory = self._directory+'/templates';
+
+        os.mkdir(self._resourceDirectory);
+        self._touch(self._resourceFile, time() - 10);
+        self._touch(self._resourceDirectory+'/foo.html', time() - 10);
+
+
+    def tearDown(self):
+
+        shutil.rmtree(self._directory, ignore_errors=True);
+
+
+    def _touch(self, path, mtime):
+
+        open(path, 'a').close();
+        os.utime(path, (mtime, mtime));
+
+
+    def _createCache(self, debug = True):
+
+        cache = ConfigCache(self._cacheFile, debug);
+        cache.write('content', [
+            FileResource(self._resourceFile),
+            DirectoryResource(self._resourceDirectory, r'\.html$'),
+        ]);
+
+        return cache;
+
+
+    def testIsFreshWithoutCacheFile(self):
+
+        cache = ConfigCache(self._cacheFile, True);
+        self.assertFalse(cache.isFresh());
+
+
+    def testIsFreshAlwaysWhenDebugIsOff(self):
+
+        cache = self._createCache(False);
+        self._touch(self._resourceFile, time() + 10);
+
+        self.assertTrue(cache.isFresh());
+        self.assertFalse(os.path.exists(self._cacheFile+'.meta'));
+
+
+    def testWriteRaisesWhenTheMetadataCannotBeWritten(self):
+
+        os.mkdir(self._cacheFile+'.meta');
+
+        try:
+            self._createCache();
+            self.fail('->write() raises a RuntimeException when the metadata cannot be written');
+        except RuntimeException:
+            pass;
+
+        self.assertEqual(
+            sorted(['cache.py', 'cache.py.meta', 'config.yml', 'templates']),
+            sorted(os.listdir(self._directory))
+        );
+
+
+    def testIsFresh(self):
+
+        cache = self._createCache();
+
+        self.assertTrue(cache.isFresh());
+
+
+    def testIsFreshWhenAFileChanges(self):
+
+        cache = self._createCache();
+        self._touch(self._resourceFile, time() + 10);
+
+        self.assertFalse(cache.isFresh());
+
+
+    def testIsFreshWhenAFileIsRemoved(self):
+
+        cache = self._createCache();
+        os.remove(self._resourceFile);
+
+        self.assertFalse(cache.isFresh());
+
+
+    def testIsFreshWhenAFileIsAddedToADirectory(self):
+
+        cache = self._createCache();
+        self._touch(self._resourceDirectory+'/bar.html', time() - 10);
+        os.utime(self._resourceDirectory, (time() + 10, time() + 10));
+
+        self.assertFalse(cache.isFresh());
+
+
+    def testIsFreshWhenAFileOfADirectoryChanges(self):
+
+        cache = self._createCache();
+        self._touch(self._resourceDirectory+'/foo.html', time() + 10);
+
+        self.assertFalse(cache.isFresh());
+
+
+    def testMetadataStoresPathsWithTheirModificationTimeAndSize(self):
+
+        self._createCache();
+
+        f = open(self._cacheFile+'.meta');
+        meta = json.loads(f.read());
+        f.close();
+
+        self.assertEqual(None, meta['resources']);
+        self.assertEqual(
+            [['foo.html', os.path.getmtime(self._resourceDirectory+'/foo.html'), 0]],
+            meta['directories'][self._resourceDirectory]
+        );
+
+
+    def testIsFreshWithOtherResources(self):
+
+        resource = TestResource();
+        cache = ConfigCache(self._cacheFile, True);
+        cache.write('content', [resource]);
+
+        self.assertTrue(cache.isFresh());
+
+        os.utime(self._cacheFile, (1, 1));
+        self.assertFalse(cache.isFresh());
+
+
+    def testIsFreshWithAnOutdatedMetadataFormat(self):
+
+        cache = self._createCache();
+
+        f = open(self._cacheFile+'.meta', 'w');
+        f.write(serialize([FileResource(self._resourceFile)]));
+        f.close();
+
+        self.assertFalse(cache.isFresh());
+
+
+
+class TestResource(ResourceInterface):
+
+    def __str__(self):
+
+        return 'test';
+
+
+    def getResource(self):
+
+        return 'test';
+
+
+    def isFresh(self, timestamp):
+
+        return timestamp > 100;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -389,6 +389,28 @@ class PrototypedArrayNodeTest(unittest.TestCase):
         self.assertEqual({0: 'test'}, node.getDefaultValue());
 
 
+    def testPathsFollowThePrototypeName(self):
+
+        node = PrototypedArrayNode('root');
+        prototype = ArrayNode('', node);
+        child = ScalarNode('child', prototype);
+        prototype.addChild(child);
+        node.setPrototype(prototype);
+
+        prototype.setName('foo');
+        self.assertEqual('root.foo.child', child.getPath());
+
+        prototype.setName(0);
+        self.assertEqual('root.0', prototype.getPath());
+        self.assertEqual('root.0.child', child.getPath());
+
+        try:
+            node.normalize({'bar': {'child': ['baz']}});
+            self.fail();
+        except InvalidTypeException as e:
+            self.assertEqual('root.bar.child', e.getPath());
+
+
     # a remapped key (e.g. "mapping" -> "mappings") should be unset after being used
     def testRemappedKeysAreUnset(self):
 
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import tempfile;
+import os;
+import shutil;
+from time import time;
+
+from pymfony.component.config.loader import ParsedFileCache;
+
+"""
+"""
+
+class ParsedFileCacheTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._directory = tempfile.mkdtemp();
+        self._parsed = list();
+
+
+    def tearDown(self):
+
+        shutil.rmtree(self._directory, ignore_errors=True);
+
+
+    def _write(self, name, content, mtime = None):
+
+        path = self._directory+'/'+name;
+        f = open(path, 'w');
+        f.write(content);
+        f.close();
+        if mtime is None:
+            mtime = time() - 10;
+        os.utime(path, (mtime, mtime));
+
+        return path;
+
+
+    def _parse(self, filename):
+
+        self._parsed.append(filename);
+        f = open(filename);
+        content = {'lines': f.read().split("\n")};
+        f.close();
+
+        return content;
+
+
+    def testGetParsesAFileOnce(self):
+
+        cache = ParsedFileCache();
+        path = self._write('foo.yml', "foo\nbar");
+
+        self.assertEqual({'lines': ['foo', 'bar']}, cache.get(path, self._parse));
+        self.assertEqual({'lines': ['foo', 'bar']}, cache.get(path, self._parse));
+        self.assertEqual({'lines': ['foo', 'bar']}, cache.get(self._directory+'/./foo.yml', self._parse));
+        self.assertEqual([path], self._parsed);
+        self.assertTrue(cache.has(path));
+
+
+    def testGetReturnsACopy(self):
+
+        cache = ParsedFileCache();
+        path = self._write('foo.yml', "foo\nbar");
+
+        content = cache.get(path, self._parse);
+        content['lines'].append('baz');
+        del content['lines'][0];
+
+        self.assertEqual({'lines': ['foo', 'bar']}, cache.get(path, self._parse));
+
+
+    def testGetParsesAChangedFileAgain(self):
+
+        cache = ParsedFileCache();
+        path = self._write('foo.yml', "foo", time() - 20);
+        cache.get(path, self._parse);
+
+        # same size
+        self._write('foo.yml', "bar", time() - 10);
+        self.assertFalse(cache.has(path));
+        self.assertEqual({'lines': ['bar']}, cache.get(path, self._parse));
+
+        # same modification time
+        self._write('foo.yml', "foobar", time() - 10);
+        self.assertEqual({'lines': ['foobar']}, cache.get(path, self._parse));
+
+        self.assertEqual(3, len(self._parsed));
+
+
+    def testAParseErrorIsNotCached(self):
+
+        cache = ParsedFileCache();
+        path = self._write('foo.yml', "foo");
+
+        def parser(filename):
+            raise ValueError(filename);
+
+        self.assertRaises(ValueError, cache.get, path, parser);
+        self.assertFalse(cache.has(path));
+
+
+    def testLeastRecentlyUsedFilesAreDropped(self):
+
+        cache = ParsedFileCache(2);
+        foo = self._write('foo.yml', "foo");
+        bar = self._write('bar.yml', "bar");
+        baz = self._write('baz.yml', "baz");
+
+        cache.get(foo, self._parse);
+        cache.get(bar, self._parse);
+        cache.get(foo, self._parse);
+        cache.get(baz, self._parse);
+
+        self.assertTrue(cache.has(foo));
+        self.assertFalse(cache.has(bar));
+        self.assertTrue(cache.has(baz));
+
+
+    def testDumpAndLoad(self):
+
+        cacheFile = self._directory+'/cache/parsed.meta';
+        foo = self._write('foo.yml', "foo");
+        bar = self._write('bar.yml', "bar");
+
+        cache = ParsedFileCache();
+        cache.get(foo, self._parse);
+        cache.get(bar, self._parse);
+        cache.dump(cacheFile);
+
+        self._write('bar.yml', "baz", time() - 5);
+
+        cache = ParsedFileCache();
+        cache.load(cacheFile);
+
+        self.assertTrue(cache.has(foo));
+        self.assertFalse(cache.has(bar));
+        self.assertEqual({'lines': ['foo']}, cache.get(foo, self._parse));
+        self.assertEqual({'lines': ['baz']}, cache.get(bar, self._parse));
+        self.assertEqual([foo, bar, bar], self._parsed);
+
+
+    def testLoadKeepsTheNewerEntries(self):
+
+        cacheFile = self._directory+'/parsed.meta';
+        foo = self._write('foo.yml', "foo", time() - 20);
+
+        cache = ParsedFileCache();
+        cache.get(foo, self._parse);
+        cache.dump(cacheFile);
+
+        self._write('foo.yml', "bar", time() - 10);
+        cache = ParsedFileCache();
+        cache.get(foo, self._parse);
+        cache.load(cacheFile);
+
+        self.assertEqual({'lines': ['bar']}, cache.get(foo, self._parse));
+        self.assertEqual(2, len(self._parsed));
+
+
+    def testLoadIgnoresAnInvalidFile(self):
+
+        cache = ParsedFileCache();
+        cache.load(self._directory+'/missing.meta');
+        cache.load(self._write('invalid.meta', "foo"));
+
+        self.assertFalse(cache.has(self._directory+'/invalid.meta'));
+
+
+    def testDumpIsSkippedWhenNothingWasParsed(self):
+
+        cacheFile = self._directory+'/parsed.meta';
+
+        ParsedFileCache().dump(cacheFile);
+
+        self.assertFalse(os.path.exists(cacheFile));
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import copy;
+
+from pymfony.component.config.definition import ConfigurationInterface;
+from pymfony.component.config.definition import Processor;
+from pymfony.component.config.definition import ReferenceDumper;
+from pymfony.component.config.definition import TreeCompiler;
+from pymfony.component.config.definition import ScalarNode;
+from pymfony.component.config.definition.builder import TreeBuilder;
+from pymfony.component.config.definition.exception import InvalidConfigurationException;
+from pymfony.component.config.definition.exception import InvalidTypeException;
+from pymfony.component.config.definition.exception import ForbiddenOverwriteException;
+from pymfony.component.config.definition.exception import UnsetKeyException;
+
+"""
+"""
+
+class TreeCompilerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        CountingConfiguration.builds = 0;
+        for configurationClass in [CountingConfiguration, SharedConfiguration, KeyedConfiguration]:
+            for name in ['_configTrees', '_compiledConfigTrees']:
+                if name in configurationClass.__dict__:
+                    delattr(configurationClass, name);
+
+    def testProcessLikeTheNodeTree(self):
+
+        configs = [
+            {
+                'default-locale': 'fr',
+                'encoder': [
+                    {'class': 'foo', 'algorithm': 'plaintext'},
+                    {'class': 'bar', 'algorithm': 'sha1', 'iterations': 3},
+                ],
+                'paths': ['a', 'b'],
+                'unsettable': {'foo': 'a'},
+                'mode': 'fast',
+            },
+            {
+                'encoders': {'baz': 'md5'},
+                'paths': ['c'],
+                'unsettable': False,
+                'enabled': None,
+                'ratio': 2,
+            },
+        ];
+
+        tree = self._createTree();
+        expected = Processor().process(tree, copy.deepcopy(configs));
+
+        self.assertEqual(expected, TreeCompiler().compile(tree).process(copy.deepcopy(configs)));
+        self.assertEqual({
+            'default_locale': 'fr',
+            'encoders': {
+                'foo': {'algorithm': 'plaintext', 'iterations': 1},
+                'bar': {'algorithm': 'sha1', 'iterations': 3},
+                'baz': {'algorithm': 'md5', 'iterations': 1},
+            },
+            'paths': {0: 'a', 1: 'b', 2: 'c'},
+            'enabled': True,
+            'mode': 'fast',
+            'ratio': 2.0,
+        }, expected);
+
+
+    def testConfigurationsAreNotModified(self):
+
+        configs = [
+            {
+                'default-locale': 'fr',
+                'encoder': [{'class': 'foo', 'algorithm': 'plaintext'}],
+                'paths': {'first': 'a'},
+                'unsettable': {'foo': 'a'},
+            },
+            {'encoders': {'foo': {'iterations': 3}}},
+        ];
+        expected = copy.deepcopy(configs);
+
+        config = TreeCompiler().compile(self._createTree()).process(configs);
+
+        self.assertEqual(expected, configs);
+        self.assertEqual({'algorithm': 'plaintext', 'iterations': 3}, config['encoders']['foo']);
+        self.assertTrue(configs[0]['unsettable'] is config['unsettable'], 'an unchanged value is shared');
+
+
+    def testMergeAllLikeSuccessiveMerges(self):
+
+        configs = [
+            {'encoders': {'foo': 'md5'}, 'paths': ['a'], 'unsettable': {'foo': 'a'}},
+            {'encoders': {'bar': 'md5', 'foo': {'iterations': 2}}, 'unsettable': False},
+            {},
+            {'encoders': {'foo': {'algorithm': 'sha1'}}, 'paths': ['b'], 'unsettable': {'foo': 'b'}},
+        ];
+
+        tree = self._createTree();
+        compiled = TreeCompiler().compile(tree);
+
+        values = [tree.normalize(config) for config in copy.deepcopy(configs)];
+        expected = values[0];
+        for value in values[1:]:
+            expected = tree.merge(expected, value);
+
+        values = [compiled.normalize(config) for config in configs];
+        self.assertEqual(expected, compiled.mergeAll(values));
+
+
+    def testExceptionsAndPaths(self):
+
+        invalids = [
+            ({'encoders': {'foo': {'algorithm': ['md5']}}}, InvalidTypeException),
+            ({'encoders': {'foo': {'iterations': 'many'}}}, InvalidTypeException),
+            ({'encoders': [{'algorithm': 'md5'}]}, InvalidConfigurationException),
+            ({'paths': 'a'}, InvalidTypeException),
+            ({'mode': 'slow'}, InvalidConfigurationException),
+            ({'unknown': True}, InvalidConfigurationException),
+        ];
+
+        tree = self._createTree();
+        compiled = TreeCompiler().compile(tree);
+
+        for config, exceptionClass in invalids:
+            try:
+                Processor().process(tree, [copy.deepcopy(config)]);
+                self.fail();
+            except exceptionClass as e:
+                expected = e;
+
+            try:
+                compiled.process([copy.deepcopy(config)]);
+                self.fail();
+            except exceptionClass as e:
+                self.assertEqual(expected.getMessage(), e.getMessage());
+                self.assertEqual(expected.getPath(), e.getPath());
+
+
+    def testExceptionsOfSeveralConfigurations(self):
+
+        tb = TreeBuilder();
+        n = tb.root('root', 'array').children();
+        n =     n.scalarNode('once').cannotBeOverwritten().end();
+        n =     n.arrayNode('dc').children().booleanNode('x').end().end().end();
+        n.end();
+        tree = tb.buildTree();
+
+        configs = [{'once': None}, {'once': 'a'}, {'once': 'b', 'dc': {'x': 3}}];
+
+        try:
+            Processor().process(tree, copy.deepcopy(configs));
+            self.fail();
+        except ForbiddenOverwriteException as e:
+            expected = e;
+
+        try:
+            TreeCompiler().compile(tree).process(copy.deepcopy(configs));
+            self.fail();
+        except ForbiddenOverwriteException as e:
+            self.assertEqual(expected.getMessage(), e.getMessage());
+
+
+    def testFinalizeUnsetPrototypedArray(self):
+
+        tb = TreeBuilder();
+        tb.root('list', 'array').canBeUnset().prototype('scalar').end();
+        tree = tb.buildTree();
+
+        for node in [tree, TreeCompiler().compile(tree)]:
+            try:
+                node.finalize(False);
+                self.fail();
+            except UnsetKeyException as e:
+                self.assertEqual('Unsetting key for path "list", value: false', e.getMessage());
+
+
+    def testNodesOfUnknownClassesProcessTheirValues(self):
+
+        tb = TreeBuilder();
+        tree = tb.root('root', 'array');
+        tree = tree.children().node('names', 'array');
+        tree = tree.useAttributeAsKey('name').prototype('scalar').end();
+        tree = tree.end().end().end();
+        tree = tb.buildTree();
+
+        names = tree.getChildren()['names'];
+        prototype = UpperScalarNode('', names);
+        names.setPrototype(prototype);
+
+        compiled = TreeCompiler().compile(tree);
+
+        self.assertEqual({'names': {'foo': 'BAR'}}, compiled.process([{'names': {'foo': 'bar'}}]));
+
+        try:
+            compiled.process([{'names': {'foo': ['bar']}}]);
+            self.fail();
+        except InvalidTypeException as e:
+            self.assertEqual('root.names.foo', e.getPath());
+
+
+    def testProcessConfigurationCachesTheTreeOfConfigurationsWithAKey(self):
+
+        processor = Processor();
+
+        self.assertEqual({'name': 'foo'}, processor.processConfiguration(CountingConfiguration('foo'), [{}]));
+        self.assertEqual({'name': 'bar'}, processor.processConfiguration(CountingConfiguration('bar'), [{}]));
+        self.assertEqual(2, CountingConfiguration.builds, '->processConfiguration() builds the tree of a configuration without key each time');
+
+        self.assertEqual({'name': 'foo'}, processor.processConfiguration(SharedConfiguration(), [{'name': 'foo'}]));
+        self.assertEqual({'name': 'bar'}, processor.processConfiguration(SharedConfiguration(), [{'name': 'bar'}]));
+        self.assertEqual(3, CountingConfiguration.builds);
+
+        processor.processConfiguration(KeyedConfiguration('foo'), [{}]);
+        processor.processConfiguration(KeyedConfiguration('bar'), [{}]);
+        processor.processConfiguration(KeyedConfiguration('foo'), [{}]);
+        self.assertEqual(5, CountingConfiguration.builds);
+
+        self.assertEqual({'name': 'bar'}, processor.processConfiguration(KeyedConfiguration('bar'), [{}]));
+
+
+    def testBuildConfigTreeSharesTheTree(self):
+
+        tree = Processor.buildConfigTree(SharedConfiguration());
+
+        self.assertTrue(tree is Processor.buildConfigTree(SharedConfiguration()));
+        ReferenceDumper().dump(SharedConfiguration());
+        Processor().processConfiguration(SharedConfiguration(), [{}]);
+        self.assertEqual(1, CountingConfiguration.builds);
+
+        self.assertFalse(tree is Processor.buildConfigTree(KeyedConfiguration('foo')));
+        self.assertFalse(Processor.buildConfigTree(CountingConfiguration()) is Processor.buildConfigTree(CountingConfiguration()));
+
+
+    def _createTree(self):
+
+        tb = TreeBuilder();
+        n = tb.root('root', 'array');
+        n =     n.fixXmlConfig('encoder');
+        n =     n.fixXmlConfig('path');
+        n =     n.children();
+        n =         n.scalarNode('default_locale').defaultValue('en').end();
+        n =         n.arrayNode('encoders');
+        n =             n.useAttributeAsKey('class');
+        n =             n.prototype('array');
+        n =                 n.beforeNormalization().ifString().then(lambda v: {'algorithm': v}).end();
+        n =                 n.children();
+        n =                     n.scalarNode('algorithm').isRequired().end();
+        n =                     n.integerNode('iterations').defaultValue(1).end();
+        n =                 n.end();
+        n =             n.end();
+        n =         n.end();
+        n =         n.arrayNode('paths').prototype('scalar').end().end();
+        n =         n.arrayNode('unsettable');
+        n =             n.canBeUnset();
+        n =             n.children().scalarNode('foo').end().end();
+        n =         n.end();
+        n =         n.booleanNode('enabled').treatNullLike(True).defaultFalse().end();
+        n =         n.enumNode('mode').values(['fast', 'safe']).defaultValue('safe').end();
+        n =         n.floatNode('ratio').min(1).end();
+        n =     n.end();
+        n = n.end();
+
+        return tb.buildTree();
+
+
+class UpperScalarNode(ScalarNode):
+
+    def _normalizeValue(self, value):
+        return value.upper();
+
+
+class CountingConfiguration(ConfigurationInterface):
+
+    builds = 0;
+
+    def __init__(self, name = None):
+        self._name = name;
+
+    def getConfigTreeBuilder(self):
+        CountingConfiguration.builds += 1;
+
+        tb = TreeBuilder();
+        tb.root('root').children().scalarNode('name').defaultValue(self._getDefaultName()).end().end();
+
+        return tb;
+
+    def _getDefaultName(self):
+        return self._name;
+
+
+class SharedConfiguration(CountingConfiguration):
+
+    def getConfigTreeCacheKey(self):
+        return None;
+
+
+class KeyedConfiguration(CountingConfiguration):
+
+    def getConfigTreeCacheKey(self):
+        return self._name;
+
+
+if __name__ == '__main__':
+    unittest.main();
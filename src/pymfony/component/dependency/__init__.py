@@ -8,6 +8,9 @@
 from __future__ import absolute_import;
 
 import re;
+import sys;
+import inspect;
+import copy;
 
 from pymfony.component.system import ClassLoader;
 from pymfony.component.system import Object;
@@ -30,6 +33,7 @@ from pymfony.component.dependency.interface import ExtensionInterface;
 from pymfony.component.dependency.interface import CompilerPassInterface;
 from pymfony.component.dependency.definition import Alias;
 from pymfony.component.dependency.definition import Definition;
+from pymfony.component.dependency.definition import DefinitionTagIndex;
 from pymfony.component.dependency.definition import Reference;
 from pymfony.component.dependency.exception import BadMethodCallException;
 from pymfony.component.dependency.exception import ServiceNotFoundException;
@@ -42,6 +46,17 @@ from pymfony.component.dependency.parameterbag import ParameterBagInterface;
 from pymfony.component.dependency.parameterbag import FrozenParameterBag;
 from pymfony.component.dependency.compiler import PassConfig;
 from pymfony.component.dependency.compiler import Compiler;
+from pymfony.component.dependency.profiler import ServiceProfiler;
+from pymfony.component.dependency.proxy import LazyServiceProxy;
+from pymfony.component.dependency.threadsafe import ThreadLocalMap;
+from pymfony.component.dependency.threadsafe import ContextLocalMap;
+from pymfony.component.dependency.threadsafe import ThreadSafeServiceMap;
+
+if sys.version_info >= (3, 7):
+    from pymfony.component.dependency import aio;
+else:
+    aio = None;
+
 """
 """
 
@@ -138,6 +153,9 @@ class Container(IntrospectableContainerInterface):
     @api:
 
     """
+    __factoryMaps = dict();
+    __serviceMethods = dict();
+
     def __init__(self, parameterBag=None):
         """Constructor.
 
@@ -146,11 +164,13 @@ class Container(IntrospectableContainerInterface):
         @api
 
         """
+        self._factories = self.__getFactoryMap(type(self));
         self._services = dict();
         self._scopes = dict();
         self._scopeChildren = dict();
         self._scopedServices = dict();
         self._scopeStacks = dict();
+        self._scopeGeneration = 0;
         self._parameterBag = None;
         self._loading = dict();
 
@@ -262,6 +282,7 @@ class Container(IntrospectableContainerInterface):
                 );
 
             self._scopedServices[scope][identifier] = service;
+            self._scopeGeneration += 1;
 
 
         self._services[identifier] = service;
@@ -277,8 +298,13 @@ class Container(IntrospectableContainerInterface):
 
         """
         identifier = str(identifier).lower();
-        method = 'get'+self.camelize(identifier)+'Service';
-        return identifier in self._services.keys() or (hasattr(self, method) and isinstance(getattr(self, method), type(self.has)));
+        if identifier in self._services:
+            return True;
+
+        if identifier in self._factories:
+            return True;
+
+        return None is not self._getFactory(identifier);
 
     def get(self, identifier, invalidBehavior = ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE):
         """Gets a service.
@@ -300,19 +326,83 @@ class Container(IntrospectableContainerInterface):
         @api
 
         """
+        # the identifiers are mostly given lowercased already
+        try:
+            return self._services[identifier];
+        except (KeyError, TypeError):
+            pass;
+
         identifier = str(identifier).lower();
-        if identifier in self._services.keys():
+        try:
             return self._services[identifier];
+        except KeyError:
+            pass;
+
+        if isinstance(self._services, ThreadSafeServiceMap):
+            return self._services.build(identifier, self._getService, invalidBehavior);
+
+        return self._getService(identifier, invalidBehavior);
+
+    def aget(self, identifier, invalidBehavior = ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE):
+        """Gets a service from a coroutine.
+
+        Services with an asynchronous factory method can only be got this
+        way. The services they depend on are built concurrently.
+
+        @param: string  id              The service identifier:
+        @param integer invalidBehavior The behavior when the service does not exist
+
+        @return coroutine A coroutine returning the associated service
+
+        @raise LogicException Without asyncio support (Python 3.7 or newer)
+
+        """
+        if None is aio:
+            raise LogicException(
+                'Getting services asynchronously requires Python 3.7 or '
+                'newer.'
+            );
+
+        return aio.getService(self, identifier, invalidBehavior);
+
+    def _agetService(self, identifier, invalidBehavior):
+        """Creates a service that is not initialized from a coroutine.
+
+        The services of a Container are built synchronously.
+
+        @param: string  identifier      The lowercased service identifier
+        @param integer invalidBehavior The behavior when the service does not exist
+
+        @return coroutine A coroutine returning the associated service
+
+        """
+        return aio.getBuiltService(self.get, identifier, invalidBehavior);
+
+    def _getService(self, identifier, invalidBehavior):
+        """Creates a service that is not initialized.
+
+        @param: string  identifier      The lowercased service identifier
+        @param integer invalidBehavior The behavior when the service does not exist
 
-        if identifier in self._loading.keys():
+        @return object The associated service
+
+        @raise ServiceCircularReferenceException When a circular reference is detected
+        @raise ServiceNotFoundException When the service is not defined
+
+        """
+        if identifier in self._loading:
             raise ServiceCircularReferenceException(identifier, list(self._loading.keys()));
 
-        method = 'get'+self.camelize(identifier)+'Service';
-        if (hasattr(self, method) and isinstance(getattr(self, method), type(self.get))):
+        try:
+            factory = self._factories[identifier];
+        except KeyError:
+            factory = self._getFactory(identifier);
+
+        if None is not factory:
             self._loading[identifier] = True;
 
             try:
-                service = getattr(self, method)();
+                service = factory(self);
             except Exception as e:
                 self._loading.pop(identifier, None);
 
@@ -338,6 +428,98 @@ class Container(IntrospectableContainerInterface):
         identifier = str(identifier).lower();
         return identifier in self._services;
 
+    def enableThreadSafety(self):
+        """Allows threads to share this container.
+
+        The built services stay shared between threads and are read without
+        lock. Each service is built by one thread at a time, the other
+        threads requesting it wait for it. The circular reference detection
+        and the active scopes are tracked per thread: a scope entered by a
+        thread is not active in the others, nor are its services.
+
+        @raise LogicException When a scope is active or a service is in
+                              creation
+
+        """
+        self.__share(ThreadLocalMap);
+
+    def enableContextScopes(self):
+        """Allows threads and asyncio tasks to share this container.
+
+        Like enableThreadSafety(), but the circular reference detection and
+        the active scopes are tracked per execution context with the
+        contextvars module: each asyncio task gets its own scopes, starting
+        from the ones active when it was created.
+
+        @raise LogicException When a scope is active or a service is in
+                              creation, when the thread safety is already
+                              enabled, or without the contextvars module
+
+        """
+        self.__share(ContextLocalMap);
+
+    def __share(self, localMapClass):
+        """Replaces the state of the container with thread safe maps.
+
+        @param: type localMapClass The class of the maps holding the state
+                                   local to a thread or a task
+
+        """
+        if self.isThreadSafe():
+            if isinstance(self._scopedServices, localMapClass):
+                return;
+
+            raise LogicException(
+                'The thread safety is already enabled with another kind of '
+                'scopes.'
+            );
+
+        if self._scopedServices or self._loading:
+            raise LogicException(
+                'The thread safety cannot be enabled while a scope is active '
+                'or a service is in creation.'
+            );
+
+        self._loading = localMapClass();
+        self._scopedServices = localMapClass();
+        self._scopeStacks = localMapClass();
+        self._services = ThreadSafeServiceMap(self._services, self._scopedServices);
+
+    def isThreadSafe(self):
+        """Returns whether threads can share this container.
+
+        @return: Boolean
+
+        """
+        return isinstance(self._services, ThreadSafeServiceMap);
+
+    def setProfiler(self, profiler = None):
+        """Sets the profiler recording the service builds.
+
+        The profiler wraps the get() method of this container only, so a
+        container without profiler does not pay for it. The services built
+        by aget() are not profiled.
+
+        @param: ServiceProfiler profiler A ServiceProfiler instance or None
+                                         to stop the profiling
+
+        """
+        if 'get' in self.__dict__:
+            del self.get;
+
+        if profiler is None:
+            return;
+
+        assert isinstance(profiler, ServiceProfiler);
+
+        container = self;
+        get = type(self).get;
+
+        def profiledGet(identifier, invalidBehavior = ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE):
+            return profiler.profile(container, get, identifier, invalidBehavior);
+
+        self.get = profiledGet;
+
     def getServiceIds(self):
         """Gets all service ids.
 
@@ -346,11 +528,8 @@ class Container(IntrospectableContainerInterface):
         """
 
         ids = list();
-        r = ReflectionObject(self);
-        for method in r.getMethods():
-            match = re.search('^get(.+)Service$', method.getName());
-            if match :
-                ids.append(self.underscore(match.group(1)));
+        for method in self.__getServiceMethods(type(self)).keys():
+            ids.append(self.underscore(method[3:-7]));
 
         return Array.uniq(ids + list(self._services.keys()));
 
@@ -384,7 +563,6 @@ class Container(IntrospectableContainerInterface):
         # scopes from the global services map
         if name in self._scopedServices :
             services = OrderedDict();
-            services[0] = self._services;
             services[name] = self._scopedServices[name];
             self._scopedServices.pop(name, None);
 
@@ -394,18 +572,19 @@ class Container(IntrospectableContainerInterface):
                     self._scopedServices.pop(child, None);
 
 
-            # update global map
-            self._services = Array.diffKey(*services.values());
-            services.pop(0);
+            # update global map, a thread safe container does not hold the
+            # scoped services in it
+            if not self.isThreadSafe():
+                self._services = Array.diffKey(self._services, *services.values());
 
-            # add stack entry for this scope so we can restore the removed services later
-            if name not in self._scopeStacks :
-                self._scopeStacks[name] = list();
-
-            self._scopeStacks[name].append(services);
+            # add stack entry for this scope so we can restore the removed
+            # services later, the stack is never changed in place because
+            # asyncio tasks may share it
+            self._scopeStacks[name] = self._scopeStacks.get(name, list()) + [services];
 
 
         self._scopedServices[name] = dict();
+        self._scopeGeneration += 1;
 
 
     def leaveScope(self, name):
@@ -438,17 +617,35 @@ class Container(IntrospectableContainerInterface):
             services.append(self._scopedServices[child]);
             self._scopedServices.pop(child, None);
 
-        self._services = Array.diffKey(*services);
+        threadSafe = self.isThreadSafe();
+        if not threadSafe:
+            self._services = Array.diffKey(*services);
 
         # check if we need to restore services of a previous scope of this type:
         if name in self._scopeStacks and self._scopeStacks[name] :
-            services = self._scopeStacks[name].pop();
+            services = self._scopeStacks[name][-1];
+            self._scopeStacks[name] = self._scopeStacks[name][:-1];
             self._scopedServices.update(services);
 
-            for scopeServices in services.values():
-                self._services.update(scopeServices);
+            if not threadSafe:
+                for scopeServices in services.values():
+                    self._services.update(scopeServices);
+
+        self._scopeGeneration += 1;
 
 
+    def getScopeGeneration(self):
+        """Returns a counter that changes each time the scoped services
+        may have changed, when a scope is entered or left or when a scoped
+        service is set.
+
+        The counter is shared by the threads and contexts of a thread safe
+        container, it does not tell whether the scoped services of one of
+        them changed.
+
+        @return: int
+        """
+        return self._scopeGeneration;
 
     def addScope(self, scope):
         """Adds a scope to the container.
@@ -522,6 +719,67 @@ class Container(IntrospectableContainerInterface):
         return name in self._scopedServices;
 
 
+    def _getFactory(self, identifier):
+        """Returns the getXXXService() method that builds a service.
+
+        A found method is stored in the lookup table shared by all
+        instances of the class, so its name is computed once per identifier.
+        Unknown identifiers are not stored, they may come from user input.
+
+        @param: string identifier The lowercased service identifier
+
+        @return function|None The unbound method or None if there is none
+
+        """
+        method = 'get'+self.camelize(identifier)+'Service';
+        factory = self.__getServiceMethods(type(self)).get(method);
+        if None is not factory:
+            self._factories[identifier] = factory;
+
+        return factory;
+
+    @classmethod
+    def __getFactoryMap(cls, containerClass):
+        """Returns the identifier to factory lookup table of a class.
+
+        @param: type containerClass
+
+        @return dict
+
+        """
+        if containerClass not in cls.__factoryMaps:
+            cls.__factoryMaps[containerClass] = dict();
+
+        return cls.__factoryMaps[containerClass];
+
+    @classmethod
+    def __getServiceMethods(cls, containerClass):
+        """Returns all getXXXService() methods of a class.
+
+        @param: type containerClass
+
+        @return dict A dict of unbound methods indexed by method name
+
+        """
+        if containerClass in cls.__serviceMethods:
+            return cls.__serviceMethods[containerClass];
+
+        methods = dict();
+        for name in dir(containerClass):
+            if not name.startswith('get') or not name.endswith('Service') \
+                or len(name) <= len('getService'):
+                continue;
+
+            value = getattr(containerClass, name);
+            if inspect.isfunction(value) or (
+                inspect.ismethod(value) and value.__self__ is None
+            ):
+                methods[name] = value;
+
+        cls.__serviceMethods[containerClass] = methods;
+
+        return methods;
+
     @classmethod
     def camelize(self, identifier):
         """Camelizes a string.
@@ -585,11 +843,15 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         self.__trackResources = True;
         self.__resources = [];
         self.__definitions = dict();
+        self.__tagIndex = DefinitionTagIndex();
         self.__extensions = dict();
         self.__extensionsByNs = dict();
         self.__extensionConfigs  = dict();
         self.__aliases  = dict();
         self.__compiler = None;
+        self.__extensionSnapshots = None;
+        self._asyncBuilds = dict();
+        self._asyncWaits = list();
         Container.__init__(self, parameterBag=parameterBag);
 
     def setResourceTracking(self, track):
@@ -771,6 +1033,36 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         return self;
 
 
+    def setExtensionSnapshots(self, snapshots):
+        """Enables the snapshots of the extension loads.
+
+        The extensions whose snapshot is still fresh are not loaded again,
+        the output of their previous load is restored instead.
+
+        @param snapshots: dict The ExtensionSnapshot instances of a previous
+                          build by extension alias, or None to disable them
+
+        @return: ContainerBuilder The current instance
+        """
+        if snapshots is not None:
+            assert isinstance(snapshots, dict);
+            snapshots = dict(snapshots);
+
+        self.__extensionSnapshots = snapshots;
+
+        return self;
+
+    def getExtensionSnapshots(self):
+        """Returns the snapshots of the extension loads.
+
+        Once compiled, they describe the extension loads of this build.
+
+        @return: dict|None ExtensionSnapshot instances by extension alias,
+                           None when snapshots are disabled
+        """
+        return self.__extensionSnapshots;
+
+
     def addCompilerPass(self, cpass,
                         cType=PassConfig.TYPE_BEFORE_OPTIMIZATION):
         """Adds a compiler pass.
@@ -863,6 +1155,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
                 raise BadMethodCallException('Setting service "{0}" on a frozen container is not allowed.'.format(identifier));
 
         self.__definitions.pop(identifier, None);
+        self.__tagIndex.remove(identifier);
         self.__aliases.pop(identifier, None);
 
         Container.set(self, identifier, service, scope);
@@ -877,6 +1170,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         """
         identifier = str(identifier).lower();
         self.__definitions.pop(identifier, None);
+        self.__tagIndex.remove(identifier);
 
     def has(self, identifier):
         """Returns True if the given service is defined.:
@@ -893,10 +1187,10 @@ class ContainerBuilder(Container, TaggedContainerInterface):
             or identifier in self.__aliases\
             or Container.has(self, identifier);
 
-    def get(self, identifier, invalidBehavior = ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE):
-        """Gets a service.
+    def _getService(self, identifier, invalidBehavior):
+        """Creates a service that is not initialized.
 
-        @param: string  id              The service identifier:
+        @param: string  identifier      The lowercased service identifier
         @param integer invalidBehavior The behavior when the service does not exist
 
         @return object The associated service
@@ -904,14 +1198,9 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         @raise InvalidArgumentException if the service is not defined:
         @raise LogicException if the service has a circular reference to itself:
 
-        @see Reference
-
-        @api
-
         """
-        identifier = str(identifier).lower();
         try:
-            return Container.get(self, identifier, ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE);
+            return Container._getService(self, identifier, ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE);
         except InvalidArgumentException as e:
             if identifier in self._loading:
                 raise LogicException(
@@ -942,6 +1231,21 @@ class ContainerBuilder(Container, TaggedContainerInterface):
 
             return service;
 
+    def _agetService(self, identifier, invalidBehavior):
+        """Creates a service that is not initialized from a coroutine.
+
+        The references of the definition are resolved concurrently and an
+        asynchronous factory method is awaited. A lazy service is created
+        at once.
+
+        @param: string  identifier      The lowercased service identifier
+        @param integer invalidBehavior The behavior when the service does not exist
+
+        @return coroutine A coroutine returning the associated service
+
+        """
+        return aio.getDefinedService(self, identifier, invalidBehavior);
+
     def merge(self, container):
         """Merges a ContainerBuilder with the current ContainerBuilder configuration.
 
@@ -989,7 +1293,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
             if container.getExtensionConfig(name):
                 self.__extensionConfigs[name] = \
                     list(self.__extensionConfigs[name]) +\
-                    list(container.getExtensionConfig[name]);
+                    list(container.getExtensionConfig(name));
 
 
 
@@ -1009,6 +1313,20 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         return self.__extensionConfigs[name];
 
 
+    def getExtensionConfigs(self):
+        """Returns the configuration arrays of all extensions.
+
+        @return dict The non empty configuration arrays by extension name
+
+        """
+        configs = dict();
+        for name, config in self.__extensionConfigs.items():
+            if config:
+                configs[name] = config;
+
+        return configs;
+
+
 
     def prependExtensionConfig(self, name, config):
         """Prepends a config array to the configs of the given extension.
@@ -1124,6 +1442,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
             );
 
         self.__definitions.pop(alias, None);
+        self.__tagIndex.remove(alias);
 
         self.__aliases[alias] = identifier;
 
@@ -1232,6 +1551,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         assert isinstance(definitions, dict);
 
         self.__definitions = dict();
+        self.__tagIndex.clear();
         self.addDefinitions(definitions);
 
 
@@ -1269,6 +1589,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         self.__aliases.pop(identifier, None);
 
         self.__definitions[identifier] = definition;
+        self.__tagIndex.add(identifier, definition);
 
         return definition;
 
@@ -1328,11 +1649,13 @@ class ContainerBuilder(Container, TaggedContainerInterface):
 
         return self.getDefinition(identifier);
 
-    def __createService(self, definition, identifier):
+    def __createService(self, definition, identifier, tryProxy = True):
         """Creates a service for a service definition.
 
         @param: Definition definition A service definition instance
         @param string     id         The service identifier:
+        @param Boolean    tryProxy   Whether to return a proxy for a lazy
+                                     service
 
         @return object The service described by the service definition
 
@@ -1344,6 +1667,67 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         """
         assert isinstance(definition, Definition);
 
+        parameterBag = self.getParameterBag();
+
+        if tryProxy and definition.isLazy() and not definition.isSynthetic() :
+            serviceClass = None;
+            if definition.getClass() :
+                className = parameterBag.resolveValue(definition.getClass());
+                module = self.__loadModule(definition);
+                if module is not None:
+                    serviceClass = getattr(module, className);
+                else:
+                    serviceClass = ClassLoader.load(className);
+
+            container = self;
+            def factory():
+                service = container.__createService(definition, identifier, False);
+                # the proxy turns into the service, it stays shared so the
+                # consumers given the proxy and the next ones get the same
+                # instance
+                container.__shareService(definition, proxy, identifier);
+
+                return service;
+
+            proxy = LazyServiceProxy(factory, serviceClass);
+            self.__shareService(definition, proxy, identifier);
+
+            return proxy;
+
+        value = parameterBag.resolveValue(definition.getArguments());
+        value = parameterBag.unescapeValue(value);
+        arguments = self.resolveServices(value);
+
+        service = self._instantiateService(definition, identifier, arguments);
+        if None is not aio and aio.isAwaitable(service):
+            if hasattr(service, 'close'):
+                service.close();
+
+            raise RuntimeException(
+                'The service "{0}" is created asynchronously, use aget() to '
+                'get it.'.format(identifier)
+            );
+
+        self._configureService(definition, service, identifier);
+
+        return service;
+
+    def _instantiateService(self, definition, identifier, arguments):
+        """Calls the constructor or the factory method of a service.
+
+        @param: Definition definition A service definition instance
+        @param string     identifier The service identifier
+        @param list       arguments  The resolved arguments
+
+        @return object The service, or an awaitable for an asynchronous
+                       factory method
+
+        @raise RuntimeException When the factory definition is incomplete
+        @raise RuntimeException When the service is a synthetic service
+
+        """
+        assert isinstance(definition, Definition);
+
         if definition.isSynthetic():
             raise RuntimeException(
                 'You have requested a synthetic service ("{0}"). '
@@ -1352,16 +1736,7 @@ class ContainerBuilder(Container, TaggedContainerInterface):
             );
 
         parameterBag = self.getParameterBag();
-
-        if None is not definition.getFile() :
-            path = parameterBag.resolveValue(definition.getFile());
-            module = SourceFileLoader.load(path);
-        else:
-            module = None;
-
-        value = parameterBag.resolveValue(definition.getArguments());
-        value = parameterBag.unescapeValue(value);
-        arguments = self.resolveServices(value);
+        module = self.__loadModule(definition);
 
         if not definition.getFactoryMethod() is None:
             if not definition.getFactoryClass() is None:
@@ -1383,27 +1758,31 @@ class ContainerBuilder(Container, TaggedContainerInterface):
                     ''.format(identifier)
                 );
 
-            service = getattr(factory, definition.getFactoryMethod())(*arguments);
-        else:
-            className = parameterBag.resolveValue(definition.getClass());
-            if module is not None:
-                service = getattr(module, className)(*arguments);
-            else:
-                service = ClassLoader.load(className)(*arguments);
+            return getattr(factory, definition.getFactoryMethod())(*arguments);
 
-        scope = definition.getScope();
-        if self.SCOPE_PROTOTYPE  != scope :
-            if self.SCOPE_CONTAINER != scope and scope not in self._scopedServices :
-                raise RuntimeException(
-                    'You tried to create the "{0}" service of an inactive '
-                    'scope.'.format(identifier)
-                );
+        className = parameterBag.resolveValue(definition.getClass());
+        if module is not None:
+            return getattr(module, className)(*arguments);
 
-            lowerId = str(identifier).lower();
-            self._services[lowerId] = service;
+        return ClassLoader.load(className)(*arguments);
 
-            if (self.SCOPE_CONTAINER != scope) :
-                self._scopedServices[scope][lowerId] = service;
+    def _configureService(self, definition, service, identifier):
+        """Shares a new service then calls its methods, sets its properties
+        and runs its configurator.
+
+        @param: Definition definition A service definition instance
+        @param object     service    The service
+        @param string     identifier The service identifier
+
+        @raise RuntimeException When the scope is inactive
+        @raise InvalidArgumentException When configure callable is not callable
+
+        """
+        assert isinstance(definition, Definition);
+
+        parameterBag = self.getParameterBag();
+
+        self.__shareService(definition, service, identifier);
 
         for call in definition.getMethodCalls():
             services = self.getServiceConditionals(call[1]);
@@ -1443,7 +1822,44 @@ class ContainerBuilder(Container, TaggedContainerInterface):
 
             closure(service);
 
-        return service;
+    def __loadModule(self, definition):
+        """Loads the file of a definition.
+
+        @param: Definition definition A service definition instance
+
+        @return module|None The loaded module, None without file
+
+        """
+        if None is definition.getFile() :
+            return None;
+
+        path = self.getParameterBag().resolveValue(definition.getFile());
+
+        return SourceFileLoader.load(path);
+
+    def __shareService(self, definition, service, identifier):
+        """Shares a service according to the scope of its definition.
+
+        @param: Definition definition A service definition instance
+        @param object     service    The service
+        @param string     identifier The service identifier
+
+        @raise RuntimeException When the scope is inactive
+
+        """
+        scope = definition.getScope();
+        if self.SCOPE_PROTOTYPE  != scope :
+            if self.SCOPE_CONTAINER != scope and scope not in self._scopedServices :
+                raise RuntimeException(
+                    'You tried to create the "{0}" service of an inactive '
+                    'scope.'.format(identifier)
+                );
+
+            lowerId = str(identifier).lower();
+            if (self.SCOPE_CONTAINER != scope) :
+                self._scopedServices[scope][lowerId] = service;
+
+            self._services[lowerId] = service;
 
     def resolveServices(self, value):
         """Replaces service references by the real service instance.
@@ -1453,14 +1869,17 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         @return mixed The same value with all service references replaced by the real service instances
 
         """
+        # the given value may belong to a definition, so it is never modified
         if isinstance(value, dict):
+            services = dict();
             for k, v in value.items():
-                value[k] = self.resolveServices(v);
-        if isinstance(value, list):
-            i = 0;
+                services[k] = self.resolveServices(v);
+            value = services;
+        elif isinstance(value, list):
+            services = list();
             for v in value:
-                value[i] = self.resolveServices(v);
-                i+=1;
+                services.append(self.resolveServices(v));
+            value = services;
         elif isinstance(value, Reference):
             value = self.get(str(value), value.getInvalidBehavior());
         elif isinstance(value, Definition):
@@ -1478,23 +1897,15 @@ class ContainerBuilder(Container, TaggedContainerInterface):
         @api
 
         """
-        tags = dict();
-        for identifier, definition in self.getDefinitions().items():
-            if definition.getTag(name):
-                tags[identifier] = definition.getTag(name);
-        return tags;
+        return self.__tagIndex.find(name);
 
     def findTags(self):
         """Returns all tags the defined services use.
 
-        @return: array An array of tags
+        @return: list An array of tag names
 
         """
-        tags = dict();
-        for definition in self.getDefinitions().values():
-            tags.update(definition.getTags().keys());
-
-        return tags;
+        return self.__tagIndex.getNames();
 
     @classmethod
     def getServiceConditionals(cls, value):
@@ -1516,3 +1927,86 @@ class ContainerBuilder(Container, TaggedContainerInterface):
             services.append(str(value));
 
         return services;
+
+
+
+class ExtensionSnapshot(Object):
+    """Records what an extension load produced and from which resources.
+
+    A fresh snapshot is restored instead of loading the extension again when
+    the container is rebuilt.
+    """
+    def __init__(self, config, parameters, container, timestamp, loadedParameters):
+        """Constructor.
+
+        @param config: list The resolved configs passed to the extension
+        @param parameters: dict The container parameters before the load
+        @param container: ContainerBuilder The container loaded by the
+                          extension
+        @param timestamp: float The time at which the load started
+        @param loadedParameters: dict The container parameters after the load
+        """
+        assert isinstance(config, list);
+        assert isinstance(parameters, dict);
+        assert isinstance(container, ContainerBuilder);
+        assert isinstance(loadedParameters, dict);
+
+        self.__config = copy.deepcopy(config);
+        self.__parameters = copy.deepcopy(parameters);
+        self.__timestamp = float(timestamp);
+        self.__resources = list(container.getResources());
+        self.__definitions = copy.deepcopy(container.getDefinitions());
+        self.__aliases = copy.deepcopy(container.getAliases());
+        # the configs that the extension gave to other extensions
+        self.__extensionConfigs = copy.deepcopy(container.getExtensionConfigs());
+
+        self.__loadedParameters = dict();
+        for name, value in loadedParameters.items():
+            if name not in parameters or parameters[name] != value:
+                self.__loadedParameters[name] = copy.deepcopy(value);
+
+    def getResources(self):
+        """Returns the resources loaded by the extension.
+
+        @return: ResourceInterface[]
+        """
+        return self.__resources;
+
+    def isFresh(self, config, parameters):
+        """Checks if the extension would load the same thing again.
+
+        @param config: list The resolved configs passed to the extension
+        @param parameters: dict The current container parameters
+
+        @return: Boolean
+        """
+        if config != self.__config or parameters != self.__parameters:
+            return False;
+
+        for resource in self.__resources:
+            if not resource.isFresh(self.__timestamp):
+                return False;
+
+        return True;
+
+    def restore(self, parameterBag):
+        """Restores the output of the extension load.
+
+        @param parameterBag: ParameterBagInterface The bag where to restore
+                             the parameters set by the extension
+
+        @return: ContainerBuilder A container to merge, as it was loaded by
+                 the extension
+        """
+        assert isinstance(parameterBag, ParameterBagInterface);
+
+        parameterBag.add(copy.deepcopy(self.__loadedParameters));
+
+        container = ContainerBuilder(parameterBag);
+        container.setResources(list(self.__resources));
+        container.addDefinitions(copy.deepcopy(self.__definitions));
+        container.addAliases(copy.deepcopy(self.__aliases));
+        for name, configs in self.__extensionConfigs.items():
+            container.getExtensionConfig(name).extend(copy.deepcopy(configs));
+
+        return container;
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import asyncio;
+import contextvars;
+import inspect;
+
+from pymfony.component.dependency.interface import ContainerInterface;
+from pymfony.component.dependency.definition import Definition;
+from pymfony.component.dependency.definition import Reference;
+from pymfony.component.dependency.exception import InvalidArgumentException;
+from pymfony.component.dependency.exception import ServiceCircularReferenceException;
+
+"""Gets the services of a container from coroutines.
+
+This module requires Python 3.7 or newer.
+
+@see: Container.aget()
+"""
+
+# the services in creation of the current task and of the tasks that wait
+# for it, as pairs of the identifier and the future of a shared service
+_building = contextvars.ContextVar(
+    'pymfony.component.dependency.aio.building', default=()
+);
+
+
+def isAwaitable(value):
+    """Checks whether a factory method returned an awaitable.
+
+    @param: mixed value
+
+    @return: Boolean
+
+    """
+    return inspect.isawaitable(value);
+
+
+async def getService(container, identifier, invalidBehavior):
+    """Gets a service.
+
+    @param: Container container
+    @param  string    identifier      The service identifier
+    @param  integer   invalidBehavior The behavior when the service does not
+                                      exist
+
+    @return: object The associated service
+
+    """
+    identifier = str(identifier).lower();
+    try:
+        return container._services[identifier];
+    except KeyError:
+        pass;
+
+    return await container._agetService(identifier, invalidBehavior);
+
+
+async def getBuiltService(get, identifier, invalidBehavior):
+    """Gets a service built synchronously.
+
+    @param: callable get             The get() method of the container
+    @param  string   identifier      The lowercased service identifier
+    @param  integer  invalidBehavior The behavior when the service does not
+                                     exist
+
+    @return: object The associated service
+
+    """
+    return get(identifier, invalidBehavior);
+
+
+async def getDefinedService(builder, identifier, invalidBehavior):
+    """Creates the service of a definition.
+
+    A shared service is created once even when several tasks request it at
+    the same time, the other tasks wait for the end of its creation.
+
+    @param: ContainerBuilder builder
+    @param  string           identifier      The lowercased service identifier
+    @param  integer          invalidBehavior The behavior when the service
+                                             does not exist
+
+    @return: object The associated service
+
+    @raise ServiceCircularReferenceException: When a circular reference is
+                                              detected
+
+    """
+    if not builder.hasDefinition(identifier):
+        if builder.hasAlias(identifier):
+            return await builder.aget(
+                str(builder.getAlias(identifier)), invalidBehavior
+            );
+
+        return builder.get(identifier, invalidBehavior);
+
+    chain = _building.get();
+    path = [building for building, _ in chain];
+    if identifier in path:
+        raise ServiceCircularReferenceException(
+            identifier, path + [identifier]
+        );
+
+    definition = builder.getDefinition(identifier);
+    scope = definition.getScope();
+    if ContainerInterface.SCOPE_PROTOTYPE == scope:
+        token = _building.set(chain + ((identifier, None),));
+        try:
+            return await _createService(builder, definition, identifier);
+        finally:
+            _building.reset(token);
+
+    # the services of a scope are built once per entered scope
+    key = (identifier, id(builder._scopedServices.get(scope)));
+    future = builder._asyncBuilds.get(key);
+    if None is not future:
+        # the chain is per task, the task that builds it does not see it
+        waitingPath = _getWaitingPath(builder, identifier, future, chain);
+        if waitingPath:
+            raise ServiceCircularReferenceException(
+                identifier, path + waitingPath
+            );
+
+        wait = (chain, identifier, future);
+        builder._asyncWaits.append(wait);
+        try:
+            return await asyncio.shield(future);
+        finally:
+            builder._asyncWaits.remove(wait);
+
+    future = asyncio.get_running_loop().create_future();
+    builder._asyncBuilds[key] = future;
+
+    token = _building.set(chain + ((identifier, future),));
+    try:
+        service = await _createService(builder, definition, identifier);
+        future.set_result(service);
+
+        return service;
+    except Exception as e:
+        future.set_exception(e);
+        # the waiting tasks get it, it must not be reported as not retrieved
+        future.exception();
+        raise;
+    finally:
+        _building.reset(token);
+        del builder._asyncBuilds[key];
+        if not future.done():
+            future.cancel();
+
+
+def _getWaitingPath(builder, identifier, future, chain):
+    """Returns the services that the builds wait for, when one of them
+    waits for a service in creation by the current task.
+
+    @param: ContainerBuilder builder
+    @param  string           identifier The lowercased service identifier
+    @param  Future           future     The future of its creation
+    @param  tuple            chain      The services in creation by the
+                                        current task
+
+    @return: list|None
+
+    """
+    futures = [building for _, building in chain if None is not building];
+    visited = list();
+    pending = [([identifier], future)];
+    while pending:
+        path, future = pending.pop();
+        if future in futures:
+            return path;
+
+        if future in visited:
+            continue;
+        visited.append(future);
+
+        for waitChain, waitIdentifier, waited in builder._asyncWaits:
+            for _, building in waitChain:
+                if building is future:
+                    pending.append((path + [waitIdentifier], waited));
+                    break;
+
+    return None;
+
+
+async def resolveServices(builder, value):
+    """Replaces service references by the real service instances, the
+    services are got concurrently.
+
+    @param: ContainerBuilder builder
+    @param  mixed            value   A value
+
+    @return: mixed The same value with all service references replaced by
+                   the real service instances
+
+    """
+    # the given value may belong to a definition, so it is never modified
+    if isinstance(value, dict):
+        keys = list(value.keys());
+        values = await _resolveAll(builder, [value[k] for k in keys]);
+
+        return dict(zip(keys, values));
+
+    if isinstance(value, list):
+        return await _resolveAll(builder, value);
+
+    if isinstance(value, Reference):
+        return await builder.aget(str(value), value.getInvalidBehavior());
+
+    if isinstance(value, Definition):
+        return await _createService(builder, value, None);
+
+    return value;
+
+
+async def _resolveAll(builder, values):
+
+    values = list(values);
+    indexes = list();
+    coroutines = list();
+    for index, value in enumerate(values):
+        if isinstance(value, (dict, list, Reference, Definition)):
+            indexes.append(index);
+            coroutines.append(resolveServices(builder, value));
+
+    if coroutines:
+        results = await asyncio.gather(*coroutines);
+        for index, result in zip(indexes, results):
+            values[index] = result;
+
+    return values;
+
+
+async def _createService(builder, definition, identifier):
+
+    parameterBag = builder.getParameterBag();
+
+    value = parameterBag.resolveValue(definition.getArguments());
+    value = parameterBag.unescapeValue(value);
+
+    arguments, _ = await asyncio.gather(
+        resolveServices(builder, value),
+        _prefetchServices(builder, definition),
+    );
+
+    service = builder._instantiateService(definition, identifier, arguments);
+    if isAwaitable(service):
+        service = await service;
+
+    builder._configureService(definition, service, identifier);
+
+    return service;
+
+
+async def _prefetchServices(builder, definition):
+    """Gets the shared services that the configuration of a service uses,
+    so that they are built concurrently with its arguments.
+
+    The configuration gets them synchronously, a service that cannot be
+    prefetched (a circular reference through a setter) is built then.
+
+    """
+    parameterBag = builder.getParameterBag();
+
+    references = list();
+    if None is not definition.getFactoryService():
+        references.append(Reference(parameterBag.resolveValue(
+            definition.getFactoryService()
+        )));
+    for call in definition.getMethodCalls():
+        _collectReferences(call[1], references);
+    _collectReferences(definition.getProperties(), references);
+    configurator = definition.getConfigurator();
+    if isinstance(configurator, list):
+        _collectReferences(configurator[0], references);
+
+    chain = [identifier for identifier, _ in _building.get()];
+    coroutines = list();
+    for reference in references:
+        identifier = str(reference).lower();
+        if identifier in chain or identifier in builder._services:
+            continue;
+
+        try:
+            scope = builder.findDefinition(identifier).getScope();
+        except InvalidArgumentException:
+            continue;
+
+        if ContainerInterface.SCOPE_PROTOTYPE != scope:
+            coroutines.append(builder.aget(
+                identifier, reference.getInvalidBehavior()
+            ));
+
+    if coroutines:
+        await asyncio.gather(*coroutines, return_exceptions=True);
+
+
+def _collectReferences(value, references):
+
+    if isinstance(value, dict):
+        value = list(value.values());
+
+    if isinstance(value, list):
+        for item in value:
+            _collectReferences(item, references);
+    elif isinstance(value, Reference):
+        references.append(value);
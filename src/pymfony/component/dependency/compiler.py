@@ -487,6 +487,77 @@ class ServiceReferenceGraph(Object):
         destNode.addInEdge(edge);
 
 
+    def disconnect(self, identifier):
+        """Removes the out edges of a node.
+
+        Nodes left without any edge are removed from the graph.
+
+        @param: string identifier The id of the source node
+
+        @return list The ids of the nodes the removed edges pointed to
+
+        """
+
+        if identifier not in self.__nodes :
+            return list();
+
+        node = self.__nodes[identifier];
+        destIds = list();
+        for edge in node.getOutEdges():
+            destNode = edge.getDestNode();
+            node.removeOutEdge(edge);
+            destNode.removeInEdge(edge);
+            destIds.append(destNode.getId());
+            self.__removeUnconnectedNode(destNode);
+
+        self.__removeUnconnectedNode(node);
+
+        return destIds;
+
+
+    def removeNode(self, identifier):
+        """Removes a node and all its edges.
+
+        Nodes left without any edge are removed from the graph.
+
+        @param: string identifier The id of the node to remove
+
+        @return list The ids of the nodes the removed node was connected to
+
+        """
+
+        if identifier not in self.__nodes :
+            return list();
+
+        node = self.__nodes[identifier];
+        ids = self.disconnect(identifier);
+        for edge in node.getInEdges():
+            sourceNode = edge.getSourceNode();
+            sourceNode.removeOutEdge(edge);
+            node.removeInEdge(edge);
+            ids.append(sourceNode.getId());
+            self.__removeUnconnectedNode(sourceNode);
+
+        if self.__nodes.get(identifier) is node :
+            del self.__nodes[identifier];
+
+        return ids;
+
+
+    def __removeUnconnectedNode(self, node):
+        """Removes a node from the graph when it has no edge left.
+
+        @param: ServiceReferenceGraphNode node
+
+        """
+
+        if node.hasEdges() :
+            return;
+
+        if self.__nodes.get(node.getId()) is node :
+            del self.__nodes[node.getId()];
+
+
     def __createNode(self, identifier, value):
         """Creates a graph node.
 
@@ -590,8 +661,8 @@ class ServiceReferenceGraphNode(Object):
 
         self.__id = identifier;
         self.__value = value;
-        self.__inEdges = list();
-        self.__outEdges = list();
+        self.__inEdges = OrderedDict();
+        self.__outEdges = OrderedDict();
 
 
     def addInEdge(self, edge):
@@ -602,7 +673,7 @@ class ServiceReferenceGraphNode(Object):
         """
         assert isinstance(edge, ServiceReferenceGraphEdge);
 
-        self.__inEdges.append(edge);
+        self.__inEdges[edge] = True;
 
 
     def addOutEdge(self, edge):
@@ -613,7 +684,37 @@ class ServiceReferenceGraphNode(Object):
         """
         assert isinstance(edge, ServiceReferenceGraphEdge);
 
-        self.__outEdges.append(edge);
+        self.__outEdges[edge] = True;
+
+
+    def removeInEdge(self, edge):
+        """Removes an in edge from this node.
+
+        @param: ServiceReferenceGraphEdge edge
+
+        """
+
+        self.__inEdges.pop(edge, None);
+
+
+    def removeOutEdge(self, edge):
+        """Removes an out edge from this node.
+
+        @param: ServiceReferenceGraphEdge edge
+
+        """
+
+        self.__outEdges.pop(edge, None);
+
+
+    def hasEdges(self):
+        """Checks if this node has an in or an out edge.:
+
+        @return: Boolean
+
+        """
+
+        return bool(self.__inEdges) or bool(self.__outEdges);
 
 
     def isAlias(self):
@@ -653,7 +754,7 @@ class ServiceReferenceGraphNode(Object):
 
         """
 
-        return self.__inEdges;
+        return list(self.__inEdges);
 
 
     def getOutEdges(self):
@@ -663,7 +764,7 @@ class ServiceReferenceGraphNode(Object):
 
         """
 
-        return self.__outEdges;
+        return list(self.__outEdges);
 
 
     def getValue(self):
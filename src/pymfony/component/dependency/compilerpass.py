@@ -7,10 +7,16 @@
 # file that was distributed with this source code.
 from __future__ import absolute_import;
 
+import time;
+import copy;
+
+from pymfony.component.system import Object;
 from pymfony.component.system import clone;
 from pymfony.component.system.types import Array;
+from pymfony.component.system.types import OrderedDict;
 
 from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency import ExtensionSnapshot;
 from pymfony.component.dependency.extension import PrependExtensionInterface;
 from pymfony.component.dependency.definition import DefinitionDecorator;
 from pymfony.component.dependency.definition import Definition;
@@ -33,6 +39,11 @@ from pymfony.component.dependency.interface import ContainerInterface;
 class RepeatedPass(CompilerPassInterface):
     """A pass that might be run repeatedly.
 
+    When it only holds the built-in analyze, inline and remove passes, the
+    passes share a RepeatedPassWorklist: after the first round the service
+    reference graph is updated from the changes of the previous passes and
+    only the services around those changes are processed again.
+
     @author Johannes M. Schmitt <schmittjoh@gmail.com>
 
     """
@@ -51,6 +62,8 @@ class RepeatedPass(CompilerPassInterface):
 
         self.__passes = None; # @var RepeatablePassInterface[]
 
+        self.__worklist = None; # @var RepeatedPassWorklist
+
         for cPass in passes:
             if ( not isinstance(cPass, RepeatablePassInterface)) :
                 raise InvalidArgumentException(
@@ -71,15 +84,25 @@ class RepeatedPass(CompilerPassInterface):
 
         """
 
-        self.__repeat = False;
+        self.__worklist = RepeatedPassWorklist(container);
+        incrementalPasses = (
+            AnalyzeServiceReferencesPass,
+            InlineServiceDefinitionsPass,
+            RemoveUnusedDefinitionsPass,
+        );
 
-        for cPass in self.__passes:
-            cPass.process(container);
+        try:
+            self.__repeat = True;
+            while self.__repeat:
+                self.__repeat = False;
 
+                for cPass in self.__passes:
+                    cPass.process(container);
 
-        if (self.__repeat) :
-            self.process(container);
-
+                    if cPass.__class__ not in incrementalPasses :
+                        self.__worklist.invalidate();
+        finally:
+            self.__worklist = None;
 
 
     def setRepeat(self):
@@ -100,6 +123,227 @@ class RepeatedPass(CompilerPassInterface):
         return self.__passes;
 
 
+    def getWorklist(self):
+        """Returns the worklist of the current process.
+
+        @return RepeatedPassWorklist|None None when no process is running
+
+        """
+
+        return self.__worklist;
+
+
+class RepeatedPassWorklist(Object):
+    """Tracks the changes made by the passes of a RepeatedPass.
+
+    AnalyzeServiceReferencesPass updates the graph from the removed services
+    and the modified definitions, and marks the services whose in edges have
+    changed. InlineServiceDefinitionsPass and RemoveUnusedDefinitionsPass
+    only look at the services marked since their previous run.
+
+    """
+
+    def __init__(self, container):
+        """Constructor.
+
+        @param ContainerBuilder container
+
+        """
+        assert isinstance(container, ContainerBuilder);
+
+        self.__container = container;
+        self.invalidate();
+
+
+    def invalidate(self):
+        """Forgets the tracked changes.
+
+        The next analyze pass rebuilds the whole graph and the next passes
+        process all services.
+
+        """
+
+        self.__analyzed = False;
+        self.__positions = None;
+        self.__unanalyzedIds = None;
+        self.__owners = dict();
+        self.__modified = dict();
+        self.__removedIds = list();
+        self.__inlineCandidates = None;
+        self.__removalCandidates = None;
+
+
+    def isAnalyzed(self):
+        """Checks if the graph is in sync with the tracked changes.
+
+        @return: Boolean
+
+        """
+
+        return self.__analyzed;
+
+
+    def setAnalyzed(self):
+        """Marks the graph as built from all the definitions.
+
+        """
+
+        self.__analyzed = True;
+        self.__modified = dict();
+        self.__removedIds = list();
+
+
+    def addOwner(self, definition, identifier):
+        """Records that the analysis of a service goes through a definition.
+
+        @param: Definition definition A service or an inlined definition
+        @param string     identifier The service identifier
+
+        """
+
+        key = id(definition);
+        if key not in self.__owners :
+            # keeps the definition alive so that its id is not reused
+            self.__owners[key] = (definition, set());
+
+        self.__owners[key][1].add(identifier);
+
+
+    def modify(self, definition):
+        """Records that the arguments of a definition have changed.
+
+        @param: Definition definition A service or an inlined definition
+
+        """
+
+        self.__modified[id(definition)] = definition;
+
+
+    def remove(self, identifier):
+        """Records that a service has been removed.
+
+        @param: string identifier
+
+        """
+
+        self.__removedIds.append(identifier);
+
+
+    def touch(self, identifiers):
+        """Marks the services whose in edges have changed.
+
+        @param: list identifiers
+
+        """
+
+        for tracked in [self.__inlineCandidates, self.__removalCandidates]:
+            if tracked is not None :
+                tracked.update(identifiers);
+
+
+    def popRemovedIds(self):
+        """Returns and forgets the removed services.
+
+        @return: list
+
+        """
+
+        identifiers = self.__removedIds;
+        self.__removedIds = list();
+
+        return identifiers;
+
+
+    def popModifiedOwners(self):
+        """Returns and forgets the services to analyze again.
+
+        @return: list The service ids, in the container order
+
+        """
+
+        identifiers = set();
+        for key in self.__modified:
+            if key in self.__owners :
+                identifiers.update(self.__owners[key][1]);
+
+        self.__modified = dict();
+
+        return self.sortIds(identifiers);
+
+
+    def popInlineCandidates(self):
+        """Returns and forgets the candidates of the inline pass.
+
+        @return: set|None None when all services must be processed
+
+        """
+
+        candidates = self.__inlineCandidates;
+        self.__inlineCandidates = set();
+
+        return candidates;
+
+
+    def popRemovalCandidates(self):
+        """Returns and forgets the candidates of the remove pass.
+
+        @return: set|None None when all services must be processed
+
+        """
+
+        candidates = self.__removalCandidates;
+        self.__removalCandidates = set();
+
+        return candidates;
+
+
+    def getUnanalyzedIds(self):
+        """Returns the synthetic and abstract services.
+
+        Their references are not part of the graph.
+
+        @return: list
+
+        """
+
+        if self.__unanalyzedIds is None :
+            self.__unanalyzedIds = list();
+            for identifier, definition in self.__container.getDefinitions().items():
+                if definition.isSynthetic() or definition.isAbstract() :
+                    self.__unanalyzedIds.append(identifier);
+
+        return self.__unanalyzedIds;
+
+
+    def sortIds(self, identifiers):
+        """Keeps the defined services and sorts them in the container order.
+
+        @param: iterable identifiers
+
+        @return: list
+
+        """
+
+        definitions = self.__container.getDefinitions();
+
+        if self.__positions is None :
+            self.__positions = dict();
+            for identifier in definitions:
+                self.__positions[identifier] = len(self.__positions);
+
+        identifiers = [i for i in identifiers if i in definitions];
+        for identifier in identifiers:
+            if identifier not in self.__positions :
+                # a service has been added since the positions were computed
+                self.__positions = None;
+
+                return self.sortIds(identifiers);
+
+        identifiers.sort(key=self.__positions.__getitem__);
+
+        return identifiers;
+
+
 class MergeExtensionConfigurationPass(CompilerPassInterface):
     """Merges extension configs into the container builder"""
     def process(self, container):
@@ -121,11 +365,30 @@ class MergeExtensionConfigurationPass(CompilerPassInterface):
 
             config = container.getParameterBag().resolveValue(config);
 
+            snapshots = container.getExtensionSnapshots();
+            if snapshots is not None:
+                before = dict(container.getParameterBag().all());
+                if name in snapshots and snapshots[name].isFresh(config, before):
+                    container.merge(snapshots[name].restore(container.getParameterBag()));
+                    continue;
+                timestamp = time.time();
+
             tmpContainer = ContainerBuilder(container.getParameterBag());
             tmpContainer.setResourceTracking(container.isTrackingResources());
             tmpContainer.addObjectResource(extension);
 
-            extension.load(config, tmpContainer);
+            # the resolved config may share its lists and dicts with the
+            # stored extension configs, the extension may modify it
+            extension.load(copy.deepcopy(config), tmpContainer);
+
+            if snapshots is not None:
+                snapshots[name] = ExtensionSnapshot(
+                    config,
+                    before,
+                    tmpContainer,
+                    timestamp,
+                    container.getParameterBag().all()
+                );
 
             container.merge(tmpContainer);
 
@@ -245,6 +508,7 @@ class ResolveDefinitionTemplatesPass(CompilerPassInterface):
         newdef.setConfigurator(parentDef.getConfigurator());
         newdef.setFile(parentDef.getFile());
         newdef.setPublic(parentDef.isPublic());
+        newdef.setLazy(parentDef.isLazy());
 
         # overwrite with values specified in the decorator:
         changes = definition.getChanges();
@@ -269,6 +533,9 @@ class ResolveDefinitionTemplatesPass(CompilerPassInterface):
         if 'public' in changes :
             newdef.setPublic(definition.isPublic());
 
+        if 'lazy' in changes :
+            newdef.setLazy(definition.isLazy());
+
         # UPDATED
         # merge arguments
         for index in definition.getOverwriteArguments():
@@ -569,6 +836,7 @@ class AnalyzeServiceReferencesPass(RepeatablePassInterface):
         self.__currentId = None;
         self.__currentDefinition = None;
         self.__repeatedPass = None;
+        self.__worklist = None;
         self.__onlyConstructorArguments = None;
 
         self.__onlyConstructorArguments = bool(onlyConstructorArguments);
@@ -589,6 +857,25 @@ class AnalyzeServiceReferencesPass(RepeatablePassInterface):
 
         self.__container = container;
         self.__graph     = container.getCompiler().getServiceReferenceGraph();
+        self.__worklist  = None;
+        if self.__repeatedPass is not None :
+            self.__worklist = self.__repeatedPass.getWorklist();
+
+        if self.__worklist is not None and self.__onlyConstructorArguments :
+            # the graph misses the references of the method calls
+            self.__worklist.invalidate();
+            self.__worklist = None;
+
+        if self.__worklist is not None and self.__worklist.isAnalyzed() :
+            identifiers = self.__worklist.popModifiedOwners();
+            if 2 * len(identifiers) < len(container.getDefinitions()) :
+                self.__update(container, identifiers);
+
+                return;
+
+            # most of the services have changed, rebuilding is cheaper
+            self.__worklist.invalidate();
+
         self.__graph.clear();
 
         for identifier, definition in container.getDefinitions().items():
@@ -596,21 +883,68 @@ class AnalyzeServiceReferencesPass(RepeatablePassInterface):
                 continue;
 
 
-            self.__currentId = identifier;
-            self.__currentDefinition = definition;
-            self.__processArguments(definition.getArguments());
+            self.__processDefinition(identifier, definition);
 
-            if ( not self.__onlyConstructorArguments) :
-                self.__processArguments(definition.getMethodCalls());
-                self.__processArguments(definition.getProperties());
-                if (definition.getConfigurator()) :
-                    self.__processArguments([definition.getConfigurator()]);
 
+        for identifier, alias in container.getAliases().items():
+            self.__graph.connect(identifier, alias, str(alias), self.__getDefinition(str(alias)), None);
 
 
+        if self.__worklist is not None :
+            self.__worklist.setAnalyzed();
+
+
+    def __update(self, container, identifiers):
+        """Updates the service reference graph from the changes tracked by
+        the worklist.
+
+        @param ContainerBuilder container
+        @param list             identifiers The ids of the services to analyze again
+
+        """
+
+        for identifier in self.__worklist.popRemovedIds():
+            self.__worklist.touch(self.__graph.removeNode(identifier));
+
+
+        definitions = container.getDefinitions();
+        for identifier in identifiers:
+            definition = definitions[identifier];
+            if definition.isSynthetic() or definition.isAbstract() :
+                continue;
 
-        for identifier, alias in container.getAliases().items():
-            self.__graph.connect(identifier, alias, str(alias), self.__getDefinition(str(alias)), None);
+
+            self.__worklist.touch(self.__graph.disconnect(identifier));
+            self.__processDefinition(identifier, definition);
+
+            if self.__graph.hasNode(identifier) :
+                self.__worklist.touch([
+                    edge.getDestNode().getId()
+                    for edge in self.__graph.getNode(identifier).getOutEdges()
+                ]);
+
+
+
+    def __processDefinition(self, identifier, definition):
+        """Processes a service definition.
+
+        @param string     identifier
+        @param Definition definition
+
+        """
+
+        self.__currentId = identifier;
+        self.__currentDefinition = definition;
+        if self.__worklist is not None :
+            self.__worklist.addOwner(definition, identifier);
+
+        self.__processArguments(definition.getArguments());
+
+        if ( not self.__onlyConstructorArguments) :
+            self.__processArguments(definition.getMethodCalls());
+            self.__processArguments(definition.getProperties());
+            if (definition.getConfigurator()) :
+                self.__processArguments([definition.getConfigurator()]);
 
 
 
@@ -640,6 +974,9 @@ class AnalyzeServiceReferencesPass(RepeatablePassInterface):
                     argument
                 );
             elif (isinstance(argument, Definition)) :
+                if self.__worklist is not None :
+                    self.__worklist.addOwner(argument, self.__currentId);
+
                 self.__processArguments(argument.getArguments());
                 self.__processArguments(argument.getMethodCalls());
                 self.__processArguments(argument.getProperties());
@@ -1078,7 +1415,9 @@ class InlineServiceDefinitionsPass(RepeatablePassInterface):
         self.__graph = None;
         self.__compiler = None;
         self.__formatter = None;
+        self.__worklist = None;
         self.__currentId = None;
+        self.__currentDefinition = None;
 
     def setRepeatedPass(self, repeatedPass):
         assert isinstance(repeatedPass, RepeatedPass);
@@ -1097,9 +1436,24 @@ class InlineServiceDefinitionsPass(RepeatablePassInterface):
         self.__compiler = container.getCompiler();
         self.__formatter = self.__compiler.getLoggingFormatter();
         self.__graph = self.__compiler.getServiceReferenceGraph();
+        self.__worklist = None;
+        if self.__repeatedPass is not None :
+            self.__worklist = self.__repeatedPass.getWorklist();
 
-        for identifier, definition in container.getDefinitions().items():
-            self.__currentId = identifier
+        definitions = container.getDefinitions();
+        candidates = None;
+        if self.__worklist is not None :
+            candidates = self.__worklist.popInlineCandidates();
+
+        if candidates is None :
+            identifiers = list(definitions.keys());
+        else :
+            identifiers = self.__getReferencingIds(container, candidates);
+
+        for identifier in identifiers:
+            definition = definitions[identifier];
+            self.__currentId = identifier;
+            self.__currentDefinition = definition;
 
             definition.setArguments(
                 self.__inlineArguments(container, definition.getArguments())
@@ -1151,17 +1505,56 @@ class InlineServiceDefinitionsPass(RepeatablePassInterface):
                     else :
                         arguments[k] = clone(definition);
 
+                    if self.__worklist is not None :
+                        self.__worklist.modify(self.__currentDefinition);
+
 
             elif isinstance(argument, Definition) :
+                currentDefinition = self.__currentDefinition;
+                self.__currentDefinition = argument;
+
                 argument.setArguments(self.__inlineArguments(container, argument.getArguments()));
                 argument.setMethodCalls(self.__inlineArguments(container, argument.getMethodCalls()));
                 argument.setProperties(self.__inlineArguments(container, argument.getProperties()));
 
+                self.__currentDefinition = currentDefinition;
+
 
 
         return arguments;
 
 
+    def __getReferencingIds(self, container, candidates):
+        """Returns the services that may reference an inlineable candidate.
+
+        @param ContainerBuilder container
+        @param set              candidates The ids of the services whose in
+                                           edges have changed
+
+        @return list The service ids, in the container order
+
+        """
+
+        identifiers = set(self.__worklist.getUnanalyzedIds());
+        for identifier in candidates:
+            if not container.hasDefinition(identifier) or not self.__graph.hasNode(identifier) :
+                continue;
+
+            edges = self.__graph.getNode(identifier).getInEdges();
+            if not edges :
+                continue;
+
+            definition = container.getDefinition(identifier);
+            if not self.__isInlineableDefinition(container, identifier, definition) :
+                continue;
+
+            for edge in edges:
+                identifiers.add(edge.getSourceNode().getId());
+
+
+        return self.__worklist.sortIds(identifiers);
+
+
     def __isInlineableDefinition(self, container, identifier, definition):
         """Checks if the definition is inlineable.:
 
@@ -1175,6 +1568,9 @@ class InlineServiceDefinitionsPass(RepeatablePassInterface):
         assert isinstance(definition, Definition);
         assert isinstance(container, ContainerBuilder);
 
+        if (definition.isLazy()) :
+            return False;
+
         if (ContainerInterface.SCOPE_PROTOTYPE == definition.getScope()) :
             return True;
 
@@ -1226,8 +1622,16 @@ class RemoveUnusedDefinitionsPass(RepeatablePassInterface):
         formatter = compiler.getLoggingFormatter();
         graph = compiler.getServiceReferenceGraph();
 
+        worklist = self.__repeatedPass.getWorklist() if self.__repeatedPass else None;
+        candidates = None;
+        if worklist is not None :
+            candidates = worklist.popRemovalCandidates();
+
         hasChanged = False;
         definitions = container.getDefinitions().copy();
+        if candidates is not None :
+            definitions = OrderedDict([(i, definitions[i]) for i in worklist.sortIds(candidates)]);
+
         for identifier, definition in definitions.items():
             if (definition.isPublic()) :
                 continue;
@@ -1256,11 +1660,20 @@ class RemoveUnusedDefinitionsPass(RepeatablePassInterface):
                 definition.setPublic(True);
                 container.removeDefinition(identifier);
                 compiler.addLogMessage(formatter.formatRemoveService(self, identifier, 'replaces alias '+referencingAliases[0]));
+
+                if worklist is not None :
+                    worklist.remove(identifier);
+                    if container.hasDefinition(str(referencingAliases[0])) :
+                        worklist.invalidate();
+
             elif (0 == len(referencingAliases) and False is isReferenced) :
                 container.removeDefinition(identifier);
                 compiler.addLogMessage(formatter.formatRemoveService(self, identifier, 'unused'));
                 hasChanged = True;
 
+                if worklist is not None :
+                    worklist.remove(identifier);
+
 
 
         if (hasChanged) :
@@ -7,7 +7,11 @@
 # file that was distributed with this source code.
 from __future__ import absolute_import;
 
+import weakref;
+import bisect;
+
 from pymfony.component.system import Object;
+from pymfony.component.system.types import OrderedDict;
 
 from pymfony.component.dependency.exception import OutOfBoundsException;
 from pymfony.component.dependency.exception import InvalidArgumentException;
@@ -127,8 +131,21 @@ class Definition(Object):
         self.__tags = dict();
         self.__public = True;
         self.__synthetic = False;
+        self.__lazy = False;
         self.__abstract = False;
         self.__scope = ContainerInterface.SCOPE_CONTAINER;
+        self.__tagIndexes = list();
+
+    def __getstate__(self):
+        state = self.__dict__.copy();
+        # the tag indexes belong to the containers
+        state.pop('_Definition__tagIndexes', None);
+
+        return state;
+
+    def __setstate__(self, state):
+        self.__dict__.update(state);
+        self.__tagIndexes = list();
 
     def setFactoryClass(self, factoryClass):
         """Sets the name of the class that(, acts as a factory using the factory method,):
@@ -423,6 +440,7 @@ class Definition(Object):
         """
         assert isinstance(tags, dict);
         self.__tags = tags;
+        self.__updateTagIndexes();
         return self;
 
     def getTags(self):
@@ -469,6 +487,7 @@ class Definition(Object):
 
         if name not in self.__tags:
             self.__tags[name] = list();
+            self.__updateTagIndexes();
 
         self.__tags[name].append(attributes);
 
@@ -496,6 +515,7 @@ class Definition(Object):
         """
         if self.hasTag(name):
             del self.__tags[name];
+            self.__updateTagIndexes();
         return self;
 
     def clearTags(self):
@@ -507,8 +527,36 @@ class Definition(Object):
 
         """
         self.__tags = dict();
+        self.__updateTagIndexes();
         return self;
 
+    def _attachTagIndex(self, index, identifier):
+        """Registers an index to update when the tag names change.
+
+        @param: DefinitionTagIndex index
+        @param string             identifier The id of this definition in the index
+
+        """
+        self.__tagIndexes.append((weakref.ref(index), identifier));
+
+    def _detachTagIndex(self, index, identifier):
+        """Unregisters an index.
+
+        @param: DefinitionTagIndex index
+        @param string             identifier The id of this definition in the index
+
+        """
+        self.__tagIndexes = [
+            (ref, i) for ref, i in self.__tagIndexes
+            if ref() is not None and (ref() is not index or i != identifier)
+        ];
+
+    def __updateTagIndexes(self):
+        for ref, identifier in self.__tagIndexes:
+            index = ref();
+            if index is not None:
+                index.update(identifier, self);
+
     def setFile(self, filename):
         """Sets a file to require before creating the service.
 
@@ -608,6 +656,28 @@ class Definition(Object):
         """
         return self.__synthetic;
 
+    def setLazy(self, lazy):
+        """Sets the lazy flag of this service.
+
+        A lazy service is only created when it is used, until then the
+        container returns a proxy for it.
+
+        @param: Boolean lazy
+
+        @return Definition The current instance
+
+        """
+        self.__lazy = bool(lazy);
+        return self;
+
+    def isLazy(self):
+        """Whether this service is lazy.
+
+        @return: Boolean
+
+        """
+        return self.__lazy;
+
     def setAbstract(self, boolean):
         """Whether this definition is abstract, that means it merely serves as a
         template for other definitions.
@@ -802,6 +872,17 @@ class DefinitionDecorator(Definition):
         return Definition.setPublic(self, boolean);
 
 
+    def setLazy(self, lazy):
+        """
+        @api
+
+        """
+
+        self.__changes['lazy'] = True;
+
+        return Definition.setLazy(self, lazy);
+
+
     def getArgument(self, index):
         """Gets an argument to pass to the service constructor/factory method.
 
@@ -863,3 +944,140 @@ class DefinitionDecorator(Definition):
 
         return self;
 
+
+class DefinitionTagIndex(Object):
+    """Indexes the ids of the definitions of a container by tag name.
+
+    The container adds and removes its definitions, the definitions update
+    the index when their tag names change.
+
+    """
+
+    def __init__(self):
+        """Constructor.
+
+        """
+
+        self.__definitions = dict();
+        self.__positions = dict();
+        self.__nextPosition = 0;
+        self.__names = dict();
+        self.__ids = OrderedDict();
+
+
+    def add(self, identifier, definition):
+        """Adds or replaces a definition.
+
+        A replaced definition keeps the position of the previous one, like
+        in the dict of the container.
+
+        @param string     identifier
+        @param Definition definition
+
+        """
+        assert isinstance(definition, Definition);
+
+        if identifier in self.__definitions :
+            if self.__definitions[identifier] is definition :
+                return;
+
+            self.__unindex(identifier);
+            self.__definitions[identifier]._detachTagIndex(self, identifier);
+        else :
+            self.__positions[identifier] = self.__nextPosition;
+            self.__nextPosition += 1;
+
+        self.__definitions[identifier] = definition;
+        definition._attachTagIndex(self, identifier);
+        self.__index(identifier, definition);
+
+
+    def remove(self, identifier):
+        """Removes a definition.
+
+        @param string identifier
+
+        """
+
+        if identifier not in self.__definitions :
+            return;
+
+        self.__unindex(identifier);
+        self.__definitions.pop(identifier)._detachTagIndex(self, identifier);
+        del self.__positions[identifier];
+
+
+    def clear(self):
+        """Removes all definitions.
+
+        """
+
+        for identifier in list(self.__definitions.keys()):
+            self.remove(identifier);
+
+
+    def update(self, identifier, definition):
+        """Indexes again the tag names of a definition.
+
+        @param string     identifier
+        @param Definition definition
+
+        """
+
+        if self.__definitions.get(identifier) is not definition :
+            return;
+
+        self.__unindex(identifier);
+        self.__index(identifier, definition);
+
+
+    def find(self, name):
+        """Returns the ids of the definitions having a tag.
+
+        @param string name The tag name
+
+        @return OrderedDict The tag attributes indexed by id, in the order
+                            of the definitions
+
+        """
+
+        tags = OrderedDict();
+        for _, identifier in self.__ids.get(name, ()):
+            attributes = self.__definitions[identifier].getTag(name);
+            if attributes :
+                tags[identifier] = attributes;
+
+        return tags;
+
+
+    def getNames(self):
+        """Returns the tag names used by the definitions.
+
+        @return list
+
+        """
+
+        return list(self.__ids.keys());
+
+
+    def __index(self, identifier, definition):
+
+        # the ids of a tag are kept sorted by position of their definition
+        item = (self.__positions[identifier], identifier);
+        names = list(definition.getTags().keys());
+        self.__names[identifier] = names;
+        for name in names:
+            if name not in self.__ids :
+                self.__ids[name] = list();
+
+            bisect.insort(self.__ids[name], item);
+
+
+    def __unindex(self, identifier):
+
+        item = (self.__positions[identifier], identifier);
+        for name in self.__names.pop(identifier, list()):
+            ids = self.__ids[name];
+            del ids[bisect.bisect_left(ids, item)];
+            if not ids :
+                del self.__ids[name];
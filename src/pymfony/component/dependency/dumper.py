@@ -0,0 +1,876 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+from pymfony.component.system import Object;
+from pymfony.component.system.oop import interface;
+from pymfony.component.system.oop import abstract;
+from pymfony.component.system.types import String;
+
+from pymfony.component.dependency import Container;
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency.interface import ContainerInterface;
+from pymfony.component.dependency.definition import Definition;
+from pymfony.component.dependency.definition import Reference;
+from pymfony.component.dependency.exception import RuntimeException;
+
+"""
+"""
+
+@interface
+class DumperInterface(Object):
+    """DumperInterface is the interface implemented by service container
+    dumper classes.
+
+    @author Fabien Potencier <fabien@symfony.com>
+
+    @api
+
+    """
+
+    def dump(self, options = None):
+        """Dumps the service container.
+
+        @param options: dict An array of options
+
+        @return: string The representation of the service container
+
+        @api
+
+        """
+        pass;
+
+
+@abstract
+class Dumper(DumperInterface):
+    """Dumper is the abstract class for all built-in dumpers.
+
+    @author Fabien Potencier <fabien@symfony.com>
+
+    @api
+
+    """
+
+    def __init__(self, container):
+        """Constructor.
+
+        @param container: ContainerBuilder The service container to dump
+
+        @api
+
+        """
+        assert isinstance(container, ContainerBuilder);
+
+        self._container = container;
+
+
+class PythonDumper(Dumper):
+    """PythonDumper dumps a service container as a Python module.
+
+    The generated module contains a Container subclass with one
+    getXXXService() method per service definition and a frozen parameter
+    bag, so that a compiled container can be imported instead of being
+    rebuilt.
+
+    @author Fabien Potencier <fabien@symfony.com>
+    @author Johannes M. Schmitt <schmittjoh@gmail.com>
+
+    @api
+
+    """
+
+    INDENT = '    ';
+
+    def __init__(self, container):
+        """Constructor.
+
+        @param container: ContainerBuilder The container to dump
+
+        @api
+
+        """
+        Dumper.__init__(self, container);
+
+        self.__inlinedDefinitions = None;
+        self.__variableCount = 0;
+
+    def dump(self, options = None):
+        """Dumps the service container as a Python module.
+
+        Available options:
+
+         * class:      The class name
+         * base_class: The base class name, fully qualified when it is not
+                       "Container"
+
+        @param options: dict An array of options
+
+        @return: string A Python module source representing
+                 the service container
+
+        @raise RuntimeException: When the container is not compiled
+
+        @api
+
+        """
+        if options is None:
+            options = dict();
+        assert isinstance(options, dict);
+
+        if not self._container.isFrozen():
+            raise RuntimeException(
+                'Only a compiled container can be dumped.'
+            );
+
+        className = options.get('class', 'ProjectServiceContainer');
+        baseClass = options.get('base_class', 'Container');
+
+        if '.' in baseClass:
+            baseModule, baseName = baseClass.rsplit('.', 1);
+        else:
+            baseModule, baseName = 'pymfony.component.dependency', baseClass;
+
+        code = self.__startModule(className, baseModule, baseName);
+        code += self.__addConstructor(baseName);
+        code += self.__addServices();
+        code += self.__addDefaultParametersMethod();
+
+        return code;
+
+    def __startModule(self, className, baseModule, baseName):
+        """Generates the module header and the class declaration.
+
+        @param className:  string The class name
+        @param baseModule: string The module of the base class
+        @param baseName:   string The base class name
+
+        @return: string
+
+        """
+        imports = [
+            'from pymfony.component.system import ClassLoader;',
+            'from pymfony.component.system import SourceFileLoader;',
+            'from pymfony.component.dependency.interface import ContainerInterface;',
+            'from pymfony.component.dependency.parameterbag import FrozenParameterBag;',
+            'from pymfony.component.dependency.exception import RuntimeException;',
+        ];
+
+        for definition in self._container.getDefinitions().values():
+            if definition.isLazy():
+                imports.append('from pymfony.component.dependency.proxy import LazyServiceProxy;');
+                break;
+
+        imports.append('from {0} import {1};'.format(baseModule, baseName));
+
+        return (
+            '# -*- coding: utf-8 -*-\n'
+            '# This file has been auto-generated by the pymfony Dependency '
+            'Injection Component\n'
+            '# for internal use only.\n'
+            'from __future__ import absolute_import;\n'
+            '\n'
+            '{0}\n'
+            '\n'
+            '"""\n'
+            '"""\n'
+            '\n'
+            'class {1}({2}):\n'
+            '    """{1}\n'
+            '\n'
+            '    This class has been auto-generated\n'
+            '    by the pymfony Dependency Injection Component.\n'
+            '\n'
+            '    """\n'
+            ''.format('\n'.join(imports), className, baseName)
+        );
+
+    def __addConstructor(self, baseName):
+        """Generates the constructor.
+
+        @param baseName: string The base class name
+
+        @return: string
+
+        """
+        scopes = dict();
+        scopeChildren = dict();
+        for name, parentName in self._container.getScopes().items():
+            scopes[name] = parentName;
+        for name, children in self._container.getScopeChildren().items():
+            scopeChildren[name] = list(children);
+
+        return (
+            '\n'
+            '    def __init__(self):\n'
+            '        """Constructor.\n'
+            '\n'
+            '        """\n'
+            '        {0}.__init__(self, FrozenParameterBag(self._getDefaultParameters()));\n'
+            '\n'
+            '        self._scopes = {1};\n'
+            '        self._scopeChildren = {2};\n'
+            ''.format(
+                baseName,
+                self.__exportValue(scopes),
+                self.__exportValue(scopeChildren),
+            )
+        );
+
+    def __addServices(self):
+        """Generates the service methods and the alias methods.
+
+        @return: string
+
+        """
+        code = '';
+
+        definitions = self._container.getDefinitions();
+        for identifier in sorted(definitions.keys()):
+            definition = definitions[identifier];
+            if definition.isAbstract():
+                continue;
+
+            if definition.isSynthetic():
+                code += self.__addSyntheticService(identifier);
+            else:
+                code += self.__addService(identifier, definition);
+
+        aliases = self._container.getAliases();
+        for alias in sorted(aliases.keys()):
+            code += self.__addServiceAlias(alias, str(aliases[alias]));
+
+        return code;
+
+    def __addService(self, identifier, definition):
+        """Generates the method that builds a service.
+
+        @param identifier: string     The service identifier
+        @param definition: Definition The service definition
+
+        @return: string
+
+        """
+        assert isinstance(definition, Definition);
+
+        self.__inlinedDefinitions = dict();
+        self.__variableCount = 0;
+
+        scope = definition.getScope();
+        className = definition.getClass();
+
+        doc = '';
+        if ContainerInterface.SCOPE_PROTOTYPE != scope:
+            doc += (
+                '\n'
+                '        This service is shared.\n'
+                '        This method always returns the same instance of the service.\n'
+            );
+
+        if not definition.isPublic():
+            doc += (
+                '\n'
+                '        This service is private.\n'
+                '        If you want to be able to request this service from the container directly,\n'
+                '        make it public, otherwise you might end up with broken code.\n'
+            );
+
+        if className:
+            returnDoc = '@return: {0} A {0} instance.'.format(className);
+        else:
+            returnDoc = '@return: object An instance returned by {0}.'.format(
+                definition.getFactoryMethod()
+            );
+
+        if definition.isLazy():
+            doc += (
+                '\n'
+                '        This service is lazy.\n'
+                '        A proxy is returned until the service is used.\n'
+            );
+            returnDoc = (
+                '@param: Boolean lazyLoad Whether to return a proxy\n'
+                '\n'
+                '        '+returnDoc
+            );
+
+        code = (
+            '\n'
+            '    def get{0}Service(self{1}):\n'
+            '        """Gets the \'{2}\' service.\n'
+            '{3}'
+            '\n'
+            '        {4}\n'
+            '\n'
+            '        """\n'
+            ''.format(
+                Container.camelize(identifier),
+                ', lazyLoad = True' if definition.isLazy() else '',
+                identifier,
+                doc,
+                returnDoc,
+            )
+        );
+
+        if ContainerInterface.SCOPE_CONTAINER != scope and \
+            ContainerInterface.SCOPE_PROTOTYPE != scope:
+            code += (
+                '        if {0} not in self._scopedServices:\n'
+                '            raise RuntimeException(\n'
+                '                \'You tried to create the "{1}" service of an inactive scope.\'\n'
+                '            );\n'
+                '\n'
+                ''.format(self.__exportValue(scope), identifier)
+            );
+
+        if definition.isLazy():
+            code += self.__addProxy(identifier, definition, 2);
+
+        code += self.__addInlinedDefinitions(definition, 2);
+        code += self.__addInstance(identifier, definition, 2);
+        code += self.__addMethodCalls('instance', definition, 2);
+        code += self.__addProperties('instance', definition, 2);
+        code += self.__addConfigurator('instance', definition, 2);
+        code += '\n        return instance;\n';
+
+        return code;
+
+    def __addSyntheticService(self, identifier):
+        """Generates the method of a synthetic service, it is only called
+        when the service has not been set.
+
+        @param identifier: string The service identifier
+
+        @return: string
+
+        """
+        return (
+            '\n'
+            '    def get{0}Service(self):\n'
+            '        """Gets the \'{1}\' service.\n'
+            '\n'
+            '        This service is synthetic, it must be set before being requested.\n'
+            '\n'
+            '        @raise RuntimeException: Always\n'
+            '\n'
+            '        """\n'
+            '        raise RuntimeException(\n'
+            '            {2}\n'
+            '        );\n'
+            ''.format(
+                Container.camelize(identifier),
+                identifier,
+                self.__exportValue(
+                    'You have requested a synthetic service ("{0}"). '
+                    'The DIC does not know how to construct this service.'
+                    ''.format(identifier)
+                ),
+            )
+        );
+
+    def __addServiceAlias(self, alias, identifier):
+        """Generates the method that returns an aliased service.
+
+        @param alias:      string The alias
+        @param identifier: string The aliased service identifier
+
+        @return: string
+
+        """
+        return (
+            '\n'
+            '    def get{0}Service(self):\n'
+            '        """Gets the \'{1}\' service alias.\n'
+            '\n'
+            '        @return: object An instance of the \'{2}\' service.\n'
+            '\n'
+            '        """\n'
+            '        return self.get({3});\n'
+            ''.format(
+                Container.camelize(alias),
+                alias,
+                identifier,
+                self.__exportValue(identifier),
+            )
+        );
+
+    def __addInstance(self, identifier, definition, depth):
+        """Generates the service instantiation.
+
+        @param identifier: string     The service identifier
+        @param definition: Definition The service definition
+        @param depth:      int        The indentation depth
+
+        @return: string
+
+        """
+        return '{0}{1} = {2};\n'.format(
+            self.INDENT * depth,
+            self.__getInstanceTarget(identifier, definition),
+            self.__newInstance(identifier, definition),
+        );
+
+    def __addProxy(self, identifier, definition, depth):
+        """Generates the proxy returned for a lazy service.
+
+        @param identifier: string     The service identifier
+        @param definition: Definition The service definition
+        @param depth:      int        The indentation depth
+
+        @return: string
+
+        """
+        indent = self.INDENT * depth;
+
+        if definition.getClass():
+            serviceClass = self.__loadClass(definition.getClass(), definition.getFile());
+        else:
+            serviceClass = 'None';
+
+        # the proxy turns into the service, it stays shared so the consumers
+        # given the proxy and the next ones get the same instance
+        return (
+            '{0}if lazyLoad:\n'
+            '{0}{1}def factory():\n'
+            '{0}{1}{1}service = self.get{3}Service(False);\n'
+            '{0}{1}{1}{2} = proxy;\n'
+            '\n'
+            '{0}{1}{1}return service;\n'
+            '\n'
+            '{0}{1}{2} = proxy = LazyServiceProxy(factory, {4});\n'
+            '\n'
+            '{0}{1}return instance;\n'
+            '\n'
+            ''.format(
+                indent,
+                self.INDENT,
+                self.__getInstanceTarget(identifier, definition),
+                Container.camelize(identifier),
+                serviceClass,
+            )
+        );
+
+    def __getInstanceTarget(self, identifier, definition):
+        """Generates the assignment target of a service instance.
+
+        @param identifier: string     The service identifier
+        @param definition: Definition The service definition
+
+        @return: string
+
+        """
+        scope = definition.getScope();
+        lowerId = self.__exportValue(str(identifier).lower());
+
+        if ContainerInterface.SCOPE_CONTAINER == scope:
+            return 'self._services[{0}] = instance'.format(lowerId);
+        elif ContainerInterface.SCOPE_PROTOTYPE == scope:
+            return 'instance';
+
+        return 'self._scopedServices[{1}][{0}] = self._services[{0}] = instance'.format(
+            lowerId,
+            self.__exportValue(scope),
+        );
+
+    def __newInstance(self, identifier, definition):
+        """Generates the expression that creates a service instance.
+
+        @param identifier: string     The service identifier
+        @param definition: Definition The service definition
+
+        @return: string
+
+        @raise RuntimeException: When the factory definition is incomplete
+
+        """
+        arguments = list();
+        for value in definition.getArguments():
+            arguments.append(self.__dumpValue(value));
+        arguments = ', '.join(arguments);
+
+        if None is not definition.getFactoryMethod():
+            if None is not definition.getFactoryClass():
+                factory = self.__loadClass(
+                    definition.getFactoryClass(),
+                    definition.getFile()
+                );
+            elif None is not definition.getFactoryService():
+                factory = 'self.get({0})'.format(self.__exportValue(
+                    str(definition.getFactoryService()).lower()
+                ));
+            else:
+                raise RuntimeException(
+                    'Cannot dump definition "{0}" because of a factory method '
+                    'without a factory service or factory class.'
+                    ''.format(identifier)
+                );
+
+            return '{0}.{1}({2})'.format(
+                factory,
+                definition.getFactoryMethod(),
+                arguments,
+            );
+
+        if not definition.getClass():
+            raise RuntimeException(
+                'Cannot dump definition "{0}" because it has no class.'
+                ''.format(identifier)
+            );
+
+        return '{0}({1})'.format(
+            self.__loadClass(definition.getClass(), definition.getFile()),
+            arguments,
+        );
+
+    def __loadClass(self, className, filename = None):
+        """Generates the expression that loads a class.
+
+        @param className: string The class name
+        @param filename:  string A file to load the class from
+
+        @return: string
+
+        """
+        className = self.__resolveString(className);
+
+        if None is not filename:
+            return 'getattr(SourceFileLoader.load({0}), {1})'.format(
+                self.__exportValue(self.__resolveString(filename)),
+                self.__exportValue(className),
+            );
+
+        return 'ClassLoader.load({0})'.format(self.__exportValue(className));
+
+    def __addMethodCalls(self, variableName, definition, depth):
+        """Generates the method calls of a definition.
+
+        @param variableName: string     The variable holding the instance
+        @param definition:   Definition The service definition
+        @param depth:        int        The indentation depth
+
+        @return: string
+
+        """
+        indent = self.INDENT * depth;
+        code = '';
+
+        for method, arguments in definition.getMethodCalls():
+            args = list();
+            for value in arguments:
+                args.append(self.__dumpValue(value));
+
+            call = '{0}.{1}({2});\n'.format(variableName, method, ', '.join(args));
+
+            conditions = list();
+            for serviceId in self.__getServiceConditionals(arguments):
+                conditions.append('self.has({0})'.format(
+                    self.__exportValue(serviceId)
+                ));
+
+            if conditions:
+                code += '{0}if {1}:\n{0}{2}{3}'.format(
+                    indent,
+                    ' and '.join(conditions),
+                    self.INDENT,
+                    call,
+                );
+            else:
+                code += indent + call;
+
+        return code;
+
+    def __addProperties(self, variableName, definition, depth):
+        """Generates the properties assignment of a definition.
+
+        @param variableName: string     The variable holding the instance
+        @param definition:   Definition The service definition
+        @param depth:        int        The indentation depth
+
+        @return: string
+
+        """
+        indent = self.INDENT * depth;
+        code = '';
+
+        properties = definition.getProperties();
+        for name in sorted(properties.keys()):
+            code += '{0}{1}.{2} = {3};\n'.format(
+                indent,
+                variableName,
+                name,
+                self.__dumpValue(properties[name]),
+            );
+
+        return code;
+
+    def __addConfigurator(self, variableName, definition, depth):
+        """Generates the configurator call of a definition.
+
+        @param variableName: string     The variable holding the instance
+        @param definition:   Definition The service definition
+        @param depth:        int        The indentation depth
+
+        @return: string
+
+        @raise RuntimeException: When the configurator cannot be dumped
+
+        """
+        indent = self.INDENT * depth;
+        closure = definition.getConfigurator();
+
+        if not closure:
+            return '';
+
+        if isinstance(closure, list):
+            if isinstance(closure[0], Reference):
+                target = self.__dumpValue(closure[0]);
+            elif isinstance(closure[0], Definition):
+                target = self.__dumpValue(closure[0]);
+            else:
+                target = self.__loadClass(closure[0]);
+
+            return '{0}{1}.{2}({3});\n'.format(
+                indent,
+                target,
+                closure[1],
+                variableName,
+            );
+
+        if isinstance(closure, String):
+            return '{0}{1}({2});\n'.format(
+                indent,
+                self.__loadClass(closure),
+                variableName,
+            );
+
+        raise RuntimeException(
+            'Unable to dump the configurator "{0}" of the service '
+            'definition with class "{1}".'
+            ''.format(repr(closure), definition.getClass())
+        );
+
+    def __addInlinedDefinitions(self, definition, depth):
+        """Generates local variables for the inlined definitions used by
+        a definition, deepest first.
+
+        @param definition: Definition The service definition
+        @param depth:      int        The indentation depth
+
+        @return: string
+
+        """
+        indent = self.INDENT * depth;
+        code = '';
+
+        for inlined in self.__getInlinedDefinitions(definition):
+            if id(inlined) in self.__inlinedDefinitions:
+                continue;
+
+            code += self.__addInlinedDefinitions(inlined, depth);
+
+            variableName = self.__getNextVariableName();
+
+            code += '{0}{1} = {2};\n'.format(
+                indent,
+                variableName,
+                self.__newInstance(None, inlined),
+            );
+            code += self.__addMethodCalls(variableName, inlined, depth);
+            code += self.__addProperties(variableName, inlined, depth);
+            code += self.__addConfigurator(variableName, inlined, depth);
+
+            self.__inlinedDefinitions[id(inlined)] = variableName;
+
+        if code:
+            code += '\n';
+
+        return code;
+
+    def __getInlinedDefinitions(self, definition):
+        """Returns the inlined definitions used directly by a definition.
+
+        @param definition: Definition
+
+        @return: Definition[]
+
+        """
+        values = list(definition.getArguments());
+        for method, arguments in definition.getMethodCalls():
+            values.append(arguments);
+        values.append(list(definition.getProperties().values()));
+        configurator = definition.getConfigurator();
+        if isinstance(configurator, list):
+            values.append(configurator[0]);
+
+        definitions = list();
+        self.__findDefinitions(values, definitions);
+
+        return definitions;
+
+    def __findDefinitions(self, value, definitions):
+        if isinstance(value, Definition):
+            definitions.append(value);
+        elif isinstance(value, list):
+            for v in value:
+                self.__findDefinitions(v, definitions);
+        elif isinstance(value, dict):
+            for v in value.values():
+                self.__findDefinitions(v, definitions);
+
+    def __getNextVariableName(self):
+        self.__variableCount += 1;
+
+        return 'inlined{0}'.format(self.__variableCount);
+
+    def __getServiceConditionals(self, value):
+        """Returns the ids of the references that must be ignored when the
+        service does not exist.
+
+        @param value: mixed
+
+        @return: list
+
+        """
+        services = list();
+
+        if isinstance(value, list):
+            for v in value:
+                for serviceId in self.__getServiceConditionals(v):
+                    if serviceId not in services:
+                        services.append(serviceId);
+        elif isinstance(value, Reference):
+            if ContainerInterface.IGNORE_ON_INVALID_REFERENCE == value.getInvalidBehavior():
+                services.append(str(value));
+
+        return services;
+
+    def __addDefaultParametersMethod(self):
+        """Generates the method that returns the default parameters.
+
+        @return: string
+
+        """
+        parameters = self._container.getParameterBag().all();
+
+        lines = list();
+        for key in sorted(parameters.keys()):
+            lines.append('            {0}: {1},\n'.format(
+                self.__exportValue(key),
+                self.__exportValue(parameters[key]),
+            ));
+
+        return (
+            '\n'
+            '    def _getDefaultParameters(self):\n'
+            '        """Gets the default parameters.\n'
+            '\n'
+            '        @return: dict An array of the default parameters\n'
+            '\n'
+            '        """\n'
+            '        return {{\n'
+            '{0}'
+            '        }};\n'
+            ''.format(''.join(lines))
+        );
+
+    def __dumpValue(self, value):
+        """Dumps a definition value as a Python expression.
+
+        Parameter placeholders are resolved against the frozen parameter bag.
+
+        @param value: mixed
+
+        @return: string
+
+        @raise RuntimeException: When the value cannot be dumped
+
+        """
+        if isinstance(value, list):
+            return '[' + ', '.join(map(self.__dumpValue, value)) + ']';
+
+        if isinstance(value, dict):
+            items = list();
+            for k in sorted(value.keys(), key=str):
+                items.append('{0}: {1}'.format(
+                    self.__dumpValue(k),
+                    self.__dumpValue(value[k])
+                ));
+            return '{' + ', '.join(items) + '}';
+
+        if isinstance(value, Reference):
+            if ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE == value.getInvalidBehavior():
+                return 'self.get({0})'.format(self.__exportValue(str(value)));
+
+            return 'self.get({0}, ContainerInterface.NULL_ON_INVALID_REFERENCE)'.format(
+                self.__exportValue(str(value))
+            );
+
+        if isinstance(value, Definition):
+            if id(value) not in self.__inlinedDefinitions:
+                raise RuntimeException(
+                    'Inlined definitions must be dumped before being used.'
+                );
+
+            return self.__inlinedDefinitions[id(value)];
+
+        if isinstance(value, String):
+            return self.__exportValue(self.__resolveString(value));
+
+        return self.__exportValue(value);
+
+    def __resolveString(self, value):
+        """Resolves the parameter placeholders of a string.
+
+        @param value: string
+
+        @return: mixed
+
+        """
+        parameterBag = self._container.getParameterBag();
+
+        value = parameterBag.resolveValue(value);
+
+        if isinstance(value, String):
+            value = value.replace('%%', '%');
+
+        return value;
+
+    def __exportValue(self, value):
+        """Exports a scalar or a container of scalars as a Python literal.
+
+        @param value: mixed
+
+        @return: string
+
+        @raise RuntimeException: When the value is an object or a resource
+
+        """
+        if isinstance(value, list):
+            return '[' + ', '.join(map(self.__exportValue, value)) + ']';
+
+        if isinstance(value, tuple):
+            items = list(map(self.__exportValue, value));
+            if 1 == len(items):
+                return '(' + items[0] + ',)';
+            return '(' + ', '.join(items) + ')';
+
+        if isinstance(value, dict):
+            items = list();
+            for k in sorted(value.keys(), key=str):
+                items.append('{0}: {1}'.format(
+                    self.__exportValue(k),
+                    self.__exportValue(value[k])
+                ));
+            return '{' + ', '.join(items) + '}';
+
+        if value is None or isinstance(value, (bool, int, float, String)):
+            return repr(value);
+
+        raise RuntimeException(
+            'Unable to dump a service container if a parameter is an object '
+            'or a resource, got "{0}".'.format(type(value).__name__)
+        );
@@ -23,6 +23,7 @@ from pymfony.component.system.types import String;
 
 from pymfony.component.config import FileLocatorInterface;
 from pymfony.component.config.loader import FileLoader as BaseFileLoader;
+from pymfony.component.config.loader import ParsedFileCache;
 from pymfony.component.config.resource import FileResource;
 
 from pymfony.component.dependency import ContainerBuilder;
@@ -39,11 +40,23 @@ from pymfony.component.yaml import Yaml;
 
 @abstract
 class FileLoader(BaseFileLoader):
-    def __init__(self, container, locator):
+    def __init__(self, container, locator, parsedFileCache = None):
+        """Constructor.
+
+        @param container:       ContainerBuilder
+        @param locator:         FileLocatorInterface
+        @param parsedFileCache: ParsedFileCache The cache of the parsed
+            files, the one shared by the process by default
+
+        """
         assert isinstance(container, ContainerBuilder);
         assert isinstance(locator, FileLocatorInterface);
+        if parsedFileCache is None:
+            parsedFileCache = ParsedFileCache.getInstance();
+        assert isinstance(parsedFileCache, ParsedFileCache);
 
         self._container = container;
+        self._parsedFileCache = parsedFileCache;
         BaseFileLoader.__init__(self, locator);
 
 
@@ -146,6 +159,20 @@ class JsonFileLoader(FileLoader):
 
         @return: dict The file content
 
+        @raise InvalidArgumentException: When JSON file is not valid
+        """
+        return self.__validate(
+            self._parsedFileCache.get(filename, self.__decodeFile),
+            filename
+        );
+
+    def __decodeFile(self, filename):
+        """Decodes a JSON file.
+
+        @param filename: string The path file
+
+        @return: mixed The decoded content, None for an empty file
+
         @raise InvalidArgumentException: When JSON file is not valid
         """
         f = open(filename);
@@ -157,12 +184,10 @@ class JsonFileLoader(FileLoader):
             return None;
 
         try:
-            result = json.loads(s);
+            return json.loads(s);
         except ValueError as e:
             raise InvalidArgumentException(e);
 
-        return self.__validate(result, filename);
-
     def __validate(self, content, resource):
         """Validates a YAML file.
 
@@ -268,6 +293,9 @@ class JsonFileLoader(FileLoader):
         if 'public' in service:
             definition.setPublic(service['public']);
 
+        if 'lazy' in service:
+            definition.setLazy(service['lazy']);
+
         if 'abstract' in service:
             definition.setAbstract(service['abstract']);
 
@@ -506,6 +534,9 @@ class YamlFileLoader(FileLoader):
         if 'public' in service:
             definition.setPublic(service['public']);
 
+        if 'lazy' in service:
+            definition.setLazy(service['lazy']);
+
         if 'abstract' in service:
             definition.setAbstract(service['abstract']);
 
@@ -580,7 +611,10 @@ class YamlFileLoader(FileLoader):
 
         """
 
-        return self.__validate(Yaml.parse(resource), resource);
+        return self.__validate(
+            self._parsedFileCache.get(resource, Yaml.parse),
+            resource
+        );
 
 
     def __validate(self, content, resource):
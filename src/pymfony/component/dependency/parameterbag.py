@@ -12,7 +12,6 @@ import re;
 from pymfony.component.system import Object;
 from pymfony.component.system.oop import interface;
 from pymfony.component.system.types import String;
-from pymfony.component.system.types import OrderedDict;
 
 from pymfony.component.dependency.exception import ParameterNotFoundException;
 from pymfony.component.dependency.exception import RuntimeException;
@@ -104,6 +103,15 @@ class ParameterBagInterface(Object):
         pass;
 
 class ParameterBag(ParameterBagInterface):
+    # Parsed strings shared by all bags, see ParameterBag.__parse().
+    __segments = dict();
+    # The number of parsed or resolved strings kept, a cache is emptied
+    # beyond it
+    __SEGMENTS_LIMIT = 4096;
+
+    __PLACEHOLDER_PATTERN = re.compile(r"%%|%([^%\s]+)%");
+    __SINGLE_PLACEHOLDER_PATTERN = re.compile(r"^%([^%\s]+)%$");
+
     def __init__(self, parameters=None):
         if parameters is None:
             parameters = dict();
@@ -112,6 +120,7 @@ class ParameterBag(ParameterBagInterface):
 
         self._parameters = dict();
         self._resolved = False;
+        self._resolvedStrings = None;
 
         self.add(parameters);
 
@@ -131,18 +140,18 @@ class ParameterBag(ParameterBagInterface):
     def get(self, name):
         name = str(name).lower();
 
-        if not self.has(name):
+        try:
+            return self._parameters[name];
+        except KeyError:
             raise ParameterNotFoundException(name);
 
-        return self._parameters[name];
-
     def set(self, name, value):
         name = str(name).lower();
         self._parameters[name] = value;
 
     def has(self, name):
         name = str(name).lower();
-        return name in self._parameters.keys();
+        return name in self._parameters;
 
     def remove(self, name):
         name = str(name).lower();
@@ -165,60 +174,135 @@ class ParameterBag(ParameterBagInterface):
         self._resolved = True;
 
     def resolveValue(self, value, resolving = None):
+        """Replaces parameter placeholders (%name%) by their values.
+
+        Lists and dicts are only copied when at least one of their items
+        holds a placeholder, otherwise the given value is returned as is.
+
+        @param value: mixed A value
+        @param resolving: dict The parameter names being resolved
+
+        @return: mixed The resolved value
+
+        @raise ParameterNotFoundException: if a placeholder references
+            a parameter that does not exist
+        @raise ParameterCircularReferenceException: if a circular reference
+            is detected
+        @raise RuntimeException: when a given parameter has a type problem.
+        """
+        if resolving is None:
+            resolving = ();
+        else:
+            assert isinstance(resolving, dict);
+            resolving = tuple(resolving.keys());
+
+        return self.__resolveValue(value, resolving);
+
+    def resolveString(self, value, resolving = None):
+        """Resolves parameters inside a string.
+
+        @param value: string The string to resolve
+        @param resolving: dict The parameter names being resolved
+
+        @return: mixed The resolved string, or the value of the parameter
+            when the string is a single placeholder
+
+        @raise ParameterNotFoundException: if a placeholder references
+            a parameter that does not exist
+        @raise ParameterCircularReferenceException: if a circular reference
+            is detected
+        @raise RuntimeException: when a given parameter has a type problem.
+        """
         if resolving is None:
-            resolving = OrderedDict();
-        assert isinstance(resolving, dict);
-        resolving = resolving.copy();
+            resolving = ();
+        else:
+            assert isinstance(resolving, dict);
+            resolving = tuple(resolving.keys());
+
+        return self.__resolveString(value, resolving);
+
+    def __resolveValue(self, value, resolving):
+        if isinstance(value, String):
+            if '%' not in value:
+                return value;
+
+            return self.__resolveString(value, resolving);
 
         if isinstance(value, dict):
-            args = dict();
+            changed = False;
+            items = list();
             for k, v in value.items():
-                args[self.resolveValue(k, resolving)] = self.resolveValue(v, resolving);
-            return args;
+                resolvedKey = self.__resolveValue(k, resolving);
+                resolvedValue = self.__resolveValue(v, resolving);
+                if resolvedKey is not k or resolvedValue is not v:
+                    changed = True;
+                items.append((resolvedKey, resolvedValue));
+
+            if not changed:
+                return value;
 
-        elif isinstance(value, list):
+            return dict(items);
+
+        if isinstance(value, list):
+            changed = False;
             args = list();
             for v in value:
-                args.append(self.resolveValue(v, resolving));
+                resolvedValue = self.__resolveValue(v, resolving);
+                if resolvedValue is not v:
+                    changed = True;
+                args.append(resolvedValue);
+
+            if not changed:
+                return value;
+
             return args;
 
-        if not isinstance(value, String):
-            return value;
+        return value;
 
-        return self.resolveString(value, resolving);
+    def __resolveString(self, value, resolving):
+        cache = self._resolvedStrings;
+        if cache is not None and not resolving:
+            try:
+                return cache[value];
+            except KeyError:
+                pass;
 
-    def resolveString(self, value, resolving = None):
-        if resolving is None:
-            resolving = OrderedDict();
-        assert isinstance(resolving, dict);
-        resolving = resolving.copy();
+        try:
+            segments = self.__segments[value];
+        except KeyError:
+            segments = self.__parse(value);
+
+        # no placeholder
+        if segments is None:
+            return value;
 
         # we do this to deal with non string values (Boolean, integer, ...)
-        # as the preg_replace_callback throw an exception when trying
-        # a non-string in a parameter value
-        match = re.search(r"^%([^%\s]+)%$", value);
-        if match:
-            key = match.group(1).lower();
-            if key in resolving.keys():
-                raise ParameterCircularReferenceException(
-                    list(resolving.keys())
-                );
-            resolving[key] = True;
+        # the value of a single placeholder is returned without casting
+        if isinstance(segments, ParameterPlaceholder):
+            key = segments.name;
+            if key in resolving:
+                raise ParameterCircularReferenceException(list(resolving));
+
             if self._resolved:
-                return self.get(key);
+                result = self.get(key);
             else:
-                return self.resolveValue(self.get(key), resolving);
-
-        def callback(match):
-            _resolving = resolving.copy();
-            key = match.group(1);
-            if not key:
-                return "%%";
-            key = key.lower();
-            if key in _resolving.keys():
-                raise ParameterCircularReferenceException(
-                    list(_resolving.keys())
-                );
+                result = self.__resolveValue(self.get(key), resolving + (key,));
+
+            if cache is not None and not resolving:
+                self.__storeResolved(cache, value, result);
+
+            return result;
+
+        parts = list();
+        for segment in segments:
+            if not isinstance(segment, ParameterPlaceholder):
+                parts.append(segment);
+                continue;
+
+            key = segment.name;
+            if key in resolving:
+                raise ParameterCircularReferenceException(list(resolving));
+
             resolved = self.get(key);
             if not isinstance(resolved, (String, float, int, complex)):
                 raise RuntimeException(
@@ -228,13 +312,80 @@ class ParameterBag(ParameterBagInterface):
                     "".format(key, type(resolved).__name__, value)
                 );
             resolved = str(resolved);
-            _resolving[key] = True;
-            if self.isResolved():
-                return resolved;
-            else:
-                return self.resolveString(resolved, _resolving);
 
-        return re.sub(r"%%|%([^%\s]+)%", callback, value);
+            if not self._resolved and '%' in resolved:
+                resolved = self.__resolveString(resolved, resolving + (key,));
+
+            parts.append(resolved);
+
+        result = ''.join(parts);
+
+        if cache is not None and not resolving:
+            self.__storeResolved(cache, value, result);
+
+        return result;
+
+    @classmethod
+    def __parse(cls, value):
+        """Parses a string into literal and placeholder segments.
+
+        The result is stored so that a distinct string is usually parsed
+        once, the store is emptied when it reaches its limit.
+
+        @param value: string
+
+        @return: None|ParameterPlaceholder|tuple None when the string holds
+            no placeholder, a ParameterPlaceholder when the whole string is
+            a placeholder, a tuple of strings and ParameterPlaceholder
+            otherwise.
+        """
+        match = cls.__SINGLE_PLACEHOLDER_PATTERN.search(value);
+        if match:
+            segments = ParameterPlaceholder(match.group(1));
+            cls.__storeSegments(value, segments);
+
+            return segments;
+
+        segments = list();
+        hasPlaceholder = False;
+        offset = 0;
+        for match in cls.__PLACEHOLDER_PATTERN.finditer(value):
+            if not match.group(1):
+                continue;
+
+            if match.start() > offset:
+                segments.append(value[offset:match.start()]);
+            segments.append(ParameterPlaceholder(match.group(1)));
+            hasPlaceholder = True;
+            offset = match.end();
+
+        if not hasPlaceholder:
+            segments = None;
+        else:
+            if offset < len(value):
+                segments.append(value[offset:]);
+            segments = tuple(segments);
+
+        cls.__storeSegments(value, segments);
+
+        return segments;
+
+    @classmethod
+    def __storeSegments(cls, value, segments):
+        # the bags may resolve strings built at runtime, the store is
+        # bounded to not grow with them
+        if len(cls.__segments) >= cls.__SEGMENTS_LIMIT:
+            cls.__segments.clear();
+
+        cls.__segments[value] = segments;
+
+    @classmethod
+    def __storeResolved(cls, cache, value, result):
+        # like the parsed strings, the resolved ones may be built at runtime
+        if len(cache) >= cls.__SEGMENTS_LIMIT:
+            cache.clear();
+
+        cache[value] = result;
 
     def isResolved(self):
         return self._resolved;
@@ -263,6 +414,14 @@ class ParameterBag(ParameterBagInterface):
 
         return value;
 
+
+class ParameterPlaceholder(Object):
+    """A parsed %name% placeholder, see ParameterBag.resolveString().
+    """
+    def __init__(self, name):
+        self.name = name.lower();
+
+
 class FrozenParameterBag(ParameterBag):
     def __init__(self, parameters=None):
         if parameters is None:
@@ -273,6 +432,10 @@ class FrozenParameterBag(ParameterBag):
         self._parameters = parameters;
         self._resolved = True;
 
+        # parameters of a frozen bag never change, so each string only
+        # needs to be resolved once
+        self._resolvedStrings = dict();
+
     def clear(self):
         raise LogicException(
             'Impossible to call clear() on a frozen ParameterBag.'
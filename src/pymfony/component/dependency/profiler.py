@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import json;
+import threading;
+from timeit import default_timer;
+
+from pymfony.component.system import Object;
+
+"""
+"""
+
+class ServiceProfiler(Object):
+    """Records the service builds of a container.
+
+    For each build, the profiler records the wall time spent including and
+    excluding the builds of its dependencies. The builds form a tree where
+    the children of a build are the services it requested. The profiler
+    also counts the requests of each service id, and how many times a
+    service was built without being shared (prototype scope).
+
+    A request that returns an already built service does not appear in the
+    tree. A request that returns the service built by its only child
+    request (an alias) is not counted as a build.
+
+    Each thread builds its own branch of the tree. The services built by
+    the coroutines of Container.aget() are not profiled.
+
+    @see: Container.setProfiler()
+
+    """
+
+    def __init__(self):
+        """Constructor.
+
+        """
+
+        self.__requests = None;
+        self.__services = None;
+        self.__roots = None;
+        # the builds in progress of each thread
+        self.__local = None;
+        self.__lock = threading.Lock();
+
+        self.reset();
+
+
+    def reset(self):
+        """Forgets the recorded data.
+
+        """
+
+        self.__requests = dict();
+        self.__services = dict();
+        self.__roots = list();
+        self.__local = threading.local();
+
+
+    def profile(self, container, get, identifier, invalidBehavior):
+        """Gets a service from a container and records its build.
+
+        @param: Container container
+        @param callable  get             The not profiled get() method of the
+                                         container class
+        @param string    identifier      The service identifier
+        @param integer   invalidBehavior The behavior when the service does
+                                         not exist
+
+        @return object The associated service
+
+        """
+
+        identifier = str(identifier).lower();
+        self.__lock.acquire();
+        try:
+            self.__requests[identifier] = self.__requests.get(identifier, 0) + 1;
+        finally:
+            self.__lock.release();
+
+        if container.initialized(identifier) :
+            return get(container, identifier, invalidBehavior);
+
+        node = {
+            'id': identifier,
+            'inclusiveTime': 0.0,
+            'exclusiveTime': 0.0,
+            'children': list(),
+        };
+        results = list();
+        stack = getattr(self.__local, 'stack', None);
+        if None is stack :
+            stack = self.__local.stack = list();
+        stack.append((node, results));
+
+        service = None;
+        failed = True;
+        start = default_timer();
+        try:
+            service = get(container, identifier, invalidBehavior);
+            failed = False;
+
+            return service;
+        finally:
+            elapsed = default_timer() - start;
+            stack.pop();
+
+            node['inclusiveTime'] = elapsed;
+            node['exclusiveTime'] = elapsed;
+            for child in node['children']:
+                node['exclusiveTime'] -= child['inclusiveTime'];
+
+            if failed :
+                node['failed'] = True;
+            elif 1 == len(results) and results[0] is service :
+                node['alias'] = True;
+
+            if stack :
+                parent, parentResults = stack[-1];
+                parent['children'].append(node);
+                parentResults.append(service);
+            else :
+                self.__roots.append(node);
+
+            if not failed and not node.get('alias') and service is not None :
+                shared = container.initialized(identifier);
+                self.__lock.acquire();
+                try:
+                    self.__recordBuild(node, shared);
+                finally:
+                    self.__lock.release();
+
+
+    def getRequests(self):
+        """Returns how often each service id was requested.
+
+        @return: dict The number of requests indexed by service id
+
+        """
+
+        return self.__requests;
+
+
+    def getServices(self):
+        """Returns the build statistics of each service.
+
+        @return: dict Indexed by service id, with the "builds",
+                 "prototypeBuilds", "inclusiveTime" and "exclusiveTime" keys,
+                 times in seconds
+
+        """
+
+        return self.__services;
+
+
+    def getTree(self):
+        """Returns the tree of the builds.
+
+        @return: list The root builds, dicts with the "id", "inclusiveTime",
+                 "exclusiveTime" and "children" keys, times in seconds
+
+        """
+
+        return self.__roots;
+
+
+    def exportJson(self):
+        """Exports the recorded data as JSON.
+
+        @return: string
+
+        """
+
+        services = dict();
+        for identifier, count in self.__requests.items():
+            services[identifier] = {
+                'requests': count,
+                'builds': 0,
+                'prototypeBuilds': 0,
+                'inclusiveTime': 0.0,
+                'exclusiveTime': 0.0,
+            };
+            services[identifier].update(self.__services.get(identifier, dict()));
+
+        return json.dumps({
+            'services': services,
+            'tree': self.__roots,
+        }, indent=2, sort_keys=True);
+
+
+    def exportFoldedStacks(self):
+        """Exports the tree of the builds in the folded stack format of the
+        flame graph tools.
+
+        Each line is a stack of service ids separated by semicolons followed
+        by the exclusive time of its last service, in microseconds.
+
+        @return: string
+
+        """
+
+        stacks = dict();
+        nodes = [(node, node['id']) for node in self.__roots];
+        while nodes:
+            node, stack = nodes.pop();
+            stacks[stack] = stacks.get(stack, 0) + node['exclusiveTime'];
+            for child in node['children']:
+                nodes.append((child, stack+';'+child['id']));
+
+        lines = list();
+        for stack in sorted(stacks.keys()):
+            microseconds = int(round(stacks[stack] * 1000000));
+            if microseconds > 0 :
+                lines.append('{0} {1}'.format(stack, microseconds));
+
+        return ''.join(line+"\n" for line in lines);
+
+
+    def __recordBuild(self, node, shared):
+
+        identifier = node['id'];
+        if identifier not in self.__services :
+            self.__services[identifier] = {
+                'builds': 0,
+                'prototypeBuilds': 0,
+                'inclusiveTime': 0.0,
+                'exclusiveTime': 0.0,
+            };
+
+        stats = self.__services[identifier];
+        stats['builds'] += 1;
+        if not shared :
+            stats['prototypeBuilds'] += 1;
+        stats['inclusiveTime'] += node['inclusiveTime'];
+        stats['exclusiveTime'] += node['exclusiveTime'];
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import threading;
+
+"""
+"""
+
+class LazyServiceProxy(object):
+    """Stands for a lazy service until it is used.
+
+    The real service is created on the first access to one of its
+    attributes. Then the proxy takes the class and the attributes of the
+    real service, so it is no longer a proxy and the next accesses cost
+    nothing. The real service and the proxy share their attributes but not
+    their identity.
+
+    When the class of the real service does not allow it (builtin types,
+    __slots__), the proxy keeps forwarding the attribute accesses.
+
+    The proxy does not extend Object, no method of its own must hide the
+    ones of the service.
+
+    """
+
+    def __init__(self, factory, serviceClass = None):
+        """Constructor.
+
+        @param: callable factory      Creates the real service
+        @param  type     serviceClass The class of the real service when it is
+                                      known, for isinstance() checks before its
+                                      creation
+
+        """
+        setattr = object.__setattr__;
+        setattr(self, '_LazyServiceProxy__factory', factory);
+        setattr(self, '_LazyServiceProxy__serviceClass', serviceClass);
+        setattr(self, '_LazyServiceProxy__service', None);
+        setattr(self, '_LazyServiceProxy__lock', threading.RLock());
+
+    def __getClass(self):
+        serviceClass = object.__getattribute__(self, '_LazyServiceProxy__serviceClass');
+        if None is serviceClass:
+            return LazyServiceProxy;
+
+        return serviceClass;
+
+    __class__ = property(__getClass);
+
+    # the helpers are static methods: once the proxy took the class of the
+    # service, Python 2 refuses it as self of an unbound method
+
+    @staticmethod
+    def __initialize(proxy):
+        """Creates the real service and turns the proxy into it.
+
+        @param: LazyServiceProxy proxy The proxy
+
+        @return: object The real service
+
+        """
+        try:
+            lock = object.__getattribute__(proxy, '_LazyServiceProxy__lock');
+        except AttributeError:
+            # another thread replaced it
+            return LazyServiceProxy.__replace(proxy);
+
+        lock.acquire();
+        try:
+            return LazyServiceProxy.__replace(proxy);
+        finally:
+            lock.release();
+
+    @staticmethod
+    def __replace(proxy):
+        if type(proxy) is not LazyServiceProxy:
+            # another thread replaced it
+            return proxy;
+
+        getattribute = object.__getattribute__;
+
+        service = getattribute(proxy, '_LazyServiceProxy__service');
+        if None is not service:
+            return service;
+
+        service = getattribute(proxy, '_LazyServiceProxy__factory')();
+
+        try:
+            attributes = object.__getattribute__(service, '__dict__');
+            object.__dict__['__class__'].__set__(proxy, type(service));
+        except (AttributeError, TypeError):
+            # keeps forwarding to the service
+            object.__setattr__(proxy, '_LazyServiceProxy__service', service);
+
+            return service;
+
+        object.__setattr__(proxy, '__dict__', attributes);
+
+        return service;
+
+    @staticmethod
+    def __target(proxy):
+        if type(proxy) is LazyServiceProxy:
+            return object.__getattribute__(proxy, '_LazyServiceProxy__service');
+
+        return proxy;
+
+    def __getattr__(self, name):
+        return getattr(LazyServiceProxy.__initialize(self), name);
+
+    def __setattr__(self, name, value):
+        LazyServiceProxy.__initialize(self);
+        setattr(LazyServiceProxy.__target(self), name, value);
+
+    def __delattr__(self, name):
+        LazyServiceProxy.__initialize(self);
+        delattr(LazyServiceProxy.__target(self), name);
+
+    # special methods are looked up on the type, they give a chance to
+    # initialize the service before a second lookup
+
+    def __call__(self, *args, **kwargs):
+        LazyServiceProxy.__initialize(self);
+        return LazyServiceProxy.__target(self)(*args, **kwargs);
+
+    def __len__(self):
+        LazyServiceProxy.__initialize(self);
+        return len(LazyServiceProxy.__target(self));
+
+    def __iter__(self):
+        LazyServiceProxy.__initialize(self);
+        return iter(LazyServiceProxy.__target(self));
+
+    def __contains__(self, item):
+        LazyServiceProxy.__initialize(self);
+        return item in LazyServiceProxy.__target(self);
+
+    def __getitem__(self, key):
+        LazyServiceProxy.__initialize(self);
+        return LazyServiceProxy.__target(self)[key];
+
+    def __setitem__(self, key, value):
+        LazyServiceProxy.__initialize(self);
+        LazyServiceProxy.__target(self)[key] = value;
+
+    def __delitem__(self, key):
+        LazyServiceProxy.__initialize(self);
+        del LazyServiceProxy.__target(self)[key];
+
+    def __str__(self):
+        LazyServiceProxy.__initialize(self);
+        return str(LazyServiceProxy.__target(self));
+
+    def __bool__(self):
+        LazyServiceProxy.__initialize(self);
+        return bool(LazyServiceProxy.__target(self));
+
+    __nonzero__ = __bool__;
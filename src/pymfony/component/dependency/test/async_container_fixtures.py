@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import asyncio;
+
+from pymfony.component.system import Object;
+
+"""The coroutines of the async container tests.
+
+This module requires Python 3.7 or newer.
+"""
+
+async def gather(*coroutines):
+
+    return await asyncio.gather(*coroutines);
+
+
+async def handleRequest(container, request):
+
+    container.enterScope('request');
+    container.set('request', request, 'request');
+    await asyncio.sleep(0.01);
+    service = await container.aget('request');
+    container.leaveScope('request');
+
+    return service, container.has('request');
+
+
+async def getScopedService(container, identifier):
+
+    container.enterScope('request');
+    service = await container.aget(identifier);
+    again = await container.aget(identifier);
+    container.leaveScope('request');
+
+    return service, again;
+
+
+class AsyncFactory(Object):
+
+    builds = 0;
+
+    @classmethod
+    async def create(cls, argument = None):
+
+        AsyncFactory.builds += 1;
+        await asyncio.sleep(0.01);
+
+        service = Object();
+        service.argument = argument;
+        service.bar = argument;
+
+        def configure(baz):
+            service.baz = baz;
+            service.configured = True;
+        service.configure = configure;
+
+        return service;
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+
+from pymfony.component.system import Object;
+from pymfony.component.system.exception import LogicException;
+
+from pymfony.component.dependency import Container;
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency import Scope;
+from pymfony.component.dependency import aio;
+from pymfony.component.dependency.definition import Reference;
+from pymfony.component.dependency.exception import RuntimeException;
+from pymfony.component.dependency.exception import ServiceCircularReferenceException;
+
+if None is not aio:
+    import asyncio;
+    # the coroutines are a syntax error for the older versions
+    import async_container_fixtures as fixtures;
+    from async_container_fixtures import AsyncFactory;
+
+    TestCase = unittest.TestCase;
+else:
+    # asyncio support requires Python 3.7 or newer
+    TestCase = object;
+
+"""
+"""
+
+class AsyncContainerTest(TestCase):
+
+    def setUp(self):
+
+        AsyncFactory.builds = 0;
+
+    def testAgetWithAContainer(self):
+
+        sc = Container();
+        foo = Object();
+        sc.set('foo', foo);
+
+        self.assertTrue(foo is asyncio.run(sc.aget('FOO')));
+        self.assertEqual(None, asyncio.run(sc.aget('bar', Container.NULL_ON_INVALID_REFERENCE)));
+
+
+    def testAgetAwaitsTheFactoryMethod(self):
+
+        builder = self._createBuilder();
+
+        foo = asyncio.run(builder.aget('foo'));
+
+        self.assertTrue(isinstance(foo, Object));
+        self.assertTrue(foo is builder.get('foo'));
+        self.assertTrue(foo.bar is builder.get('bar'));
+        self.assertTrue(foo.baz is builder.get('baz'));
+        self.assertTrue(foo.configured, 'the method calls run once the service is created');
+
+
+    def testAgetResolvesAliases(self):
+
+        builder = self._createBuilder();
+        builder.setAlias('alias', 'bar');
+
+        self.assertTrue(asyncio.run(builder.aget('alias')) is builder.get('bar'));
+
+
+    def testAServiceIsBuiltOnce(self):
+
+        builder = self._createBuilder();
+
+        services = asyncio.run(fixtures.gather(*[builder.aget('foo') for i in range(4)]));
+
+        self.assertEqual(3, AsyncFactory.builds);
+        for service in services:
+            self.assertTrue(service is services[0]);
+
+
+    def testGetAnAsyncService(self):
+
+        builder = self._createBuilder();
+
+        self.assertRaises(RuntimeException, builder.get, 'bar');
+        self.assertFalse(builder.initialized('bar'));
+
+
+    def testCircularReference(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create').addArgument(Reference('bar'));
+        builder.register('bar', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create').addArgument(Reference('foo'));
+
+        self.assertRaises(ServiceCircularReferenceException, asyncio.run, builder.aget('foo'));
+
+
+    def testCircularReferenceBetweenConcurrentBuilds(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', __name__+'.SyncClass').addArgument([Reference('bar'), Reference('baz')]);
+        builder.register('bar', __name__+'.SyncClass').addArgument(Reference('baz'));
+        builder.register('baz', __name__+'.SyncClass').addArgument(Reference('bar'));
+
+        self.assertRaises(ServiceCircularReferenceException, builder.get, 'foo');
+
+        builder = ContainerBuilder();
+        builder.register('foo', __name__+'.SyncClass').addArgument([Reference('bar'), Reference('baz')]);
+        builder.register('bar', __name__+'.SyncClass').addArgument(Reference('baz'));
+        builder.register('baz', __name__+'.SyncClass').addArgument(Reference('bar'));
+
+        try:
+            asyncio.run(asyncio.wait_for(builder.aget('foo'), 3));
+            self.fail('->aget() throws a ServiceCircularReferenceException when two builds wait for each other');
+        except ServiceCircularReferenceException:
+            pass;
+
+
+    def testCircularReferenceThroughASetter(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create').setProperty('baz', Reference('bar'));
+        builder.register('bar', __name__+'.SyncClass').addArgument(Reference('foo'));
+
+        foo = asyncio.run(builder.aget('foo'));
+
+        self.assertTrue(foo.baz is builder.get('bar'));
+        self.assertTrue(foo.baz.argument is foo);
+
+
+    def testEnableContextScopes(self):
+
+        sc = Container();
+        sc.addScope(Scope('request'));
+        sc.enableContextScopes();
+        sc.enableContextScopes();
+
+        self.assertTrue(sc.isThreadSafe());
+        self.assertRaises(LogicException, sc.enableThreadSafety);
+
+        sc = Container();
+        sc.addScope(Scope('request'));
+        sc.enterScope('request');
+
+        self.assertRaises(LogicException, sc.enableContextScopes);
+
+
+    def testScopesArePerTask(self):
+
+        sc = Container();
+        sc.addScope(Scope('request'));
+        sc.enableContextScopes();
+
+        first, second = asyncio.run(fixtures.gather(
+            fixtures.handleRequest(sc, Object()),
+            fixtures.handleRequest(sc, Object()),
+        ));
+
+        self.assertFalse(first[0] is second[0]);
+        self.assertFalse(first[1]);
+        self.assertFalse(second[1]);
+        self.assertFalse(sc.isScopeActive('request'));
+
+
+    def testScopedServicesAreBuiltPerTask(self):
+
+        builder = ContainerBuilder();
+        builder.addScope(Scope('request'));
+        builder.register('foo', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create').setScope('request');
+        builder.enableContextScopes();
+
+        first, second = asyncio.run(fixtures.gather(
+            fixtures.getScopedService(builder, 'foo'),
+            fixtures.getScopedService(builder, 'foo'),
+        ));
+
+        self.assertTrue(first[0] is first[1]);
+        self.assertTrue(second[0] is second[1]);
+        self.assertFalse(first[0] is second[0]);
+        self.assertEqual(2, AsyncFactory.builds);
+
+
+    def _createBuilder(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create').addArgument(Reference('bar')).addMethodCall(
+            'configure', [Reference('baz')]
+        );
+        builder.register('bar', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create');
+        builder.register('baz', fixtures.__name__+'.AsyncFactory').setFactoryClass(
+            fixtures.__name__+'.AsyncFactory'
+        ).setFactoryMethod('create');
+
+        return builder;
+
+
+class SyncClass(Object):
+
+    def __init__(self, argument = None):
+
+        self.argument = argument;
+
+
+if __name__ == '__main__':
+    unittest.main();
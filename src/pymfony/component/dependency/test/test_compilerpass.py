@@ -8,6 +8,11 @@
 from __future__ import absolute_import;
 
 import unittest;
+import os;
+import time;
+import tempfile;
+import shutil;
+import random;
 
 from pymfony.component.system.types import OrderedDict;
 
@@ -15,6 +20,8 @@ from pymfony.component.dependency import ContainerBuilder;
 from pymfony.component.dependency import Scope;
 from pymfony.component.dependency.interface import ContainerInterface;
 from pymfony.component.dependency.compiler import Compiler;
+from pymfony.component.dependency.compiler import ServiceReferenceGraph;
+from pymfony.component.dependency.interface import RepeatablePassInterface;
 from pymfony.component.dependency.exception import RuntimeException;
 from pymfony.component.dependency.exception import ServiceNotFoundException;
 from pymfony.component.dependency.exception import InvalidArgumentException;
@@ -22,6 +29,13 @@ from pymfony.component.dependency.definition import DefinitionDecorator;
 from pymfony.component.dependency.definition import Reference;
 from pymfony.component.dependency.definition import Definition;
 from pymfony.component.dependency.compilerpass import RepeatedPass;
+from pymfony.component.dependency.compilerpass import RepeatedPassWorklist;
+from pymfony.component.dependency.compilerpass import InlineServiceDefinitionsPass;
+from pymfony.component.dependency.compilerpass import MergeExtensionConfigurationPass;
+from pymfony.component.dependency.extension import Extension;
+from pymfony.component.config.resource import FileResource;
+from pymfony.component.system.serializer import serialize;
+from pymfony.component.system.serializer import unserialize;
 from pymfony.component.dependency.compilerpass import AnalyzeServiceReferencesPass;
 from pymfony.component.dependency.compilerpass import CheckCircularReferencesPass;
 from pymfony.component.dependency.compilerpass import CheckDefinitionValidityPass;
@@ -414,6 +428,129 @@ class CheckReferenceValidityPassTest(unittest.TestCase):
 
 
 
+class MergeExtensionConfigurationPassTest(unittest.TestCase):
+
+    def setUp(self):
+        self.__tmpDir = tempfile.mkdtemp();
+        self.__resource = os.path.join(self.__tmpDir, 'services.yml');
+        f = open(self.__resource, 'w');
+        f.write('');
+        f.close();
+        os.utime(self.__resource, (time.time() - 10, time.time() - 10));
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmpDir);
+
+    def testProcessRecordsExtensionSnapshots(self):
+        extension = SnapshotExtension(self.__resource);
+        container = self.__process(extension, {'foo': 'bar'}, dict());
+
+        snapshots = container.getExtensionSnapshots();
+        self.assertEqual(['snapshot'], list(snapshots.keys()));
+        self.assertEqual(1, extension.loads);
+        self.assertTrue(self.__resource in [str(r) for r in snapshots['snapshot'].getResources()]);
+
+    def testProcessRestoresFreshSnapshots(self):
+        extension = SnapshotExtension(self.__resource);
+        snapshots = self.__process(extension, {'foo': 'bar'}, dict()).getExtensionSnapshots();
+
+        container = self.__process(extension, {'foo': 'bar'}, snapshots);
+        self.assertEqual(1, extension.loads);
+        self.assertTrue(container.hasDefinition('snapshot.service'));
+        self.assertEqual('bar', container.getParameter('snapshot.foo'));
+        self.assertEqual([['setFoo', ['%snapshot.foo%']]], container.getDefinition('snapshot.service').getMethodCalls());
+        self.assertTrue(self.__resource in [str(r) for r in container.getResources()]);
+
+        # restored definitions are not shared between builds
+        container.getDefinition('snapshot.service').addMethodCall('setBar');
+        container = self.__process(extension, {'foo': 'bar'}, snapshots);
+        self.assertEqual(1, extension.loads);
+        self.assertEqual([['setFoo', ['%snapshot.foo%']]], container.getDefinition('snapshot.service').getMethodCalls());
+
+    def testProcessLoadsAgainWhenTheConfigChanges(self):
+        extension = SnapshotExtension(self.__resource);
+        snapshots = self.__process(extension, {'foo': 'bar'}, dict()).getExtensionSnapshots();
+
+        container = self.__process(extension, {'foo': 'baz'}, snapshots);
+        self.assertEqual(2, extension.loads);
+        self.assertEqual('baz', container.getParameter('snapshot.foo'));
+
+    def testProcessLoadsAgainWhenAResourceChanges(self):
+        extension = SnapshotExtension(self.__resource);
+        snapshots = self.__process(extension, {'foo': 'bar'}, dict()).getExtensionSnapshots();
+
+        os.utime(self.__resource, (time.time() + 10, time.time() + 10));
+
+        self.__process(extension, {'foo': 'bar'}, snapshots);
+        self.assertEqual(2, extension.loads);
+
+    def testSnapshotsCanBeSerialized(self):
+        extension = SnapshotExtension(self.__resource);
+        snapshots = self.__process(extension, {'foo': 'bar'}, dict()).getExtensionSnapshots();
+        snapshots = unserialize(serialize(snapshots));
+
+        container = self.__process(extension, {'foo': 'bar'}, snapshots);
+        self.assertEqual(1, extension.loads);
+        self.assertTrue(container.hasDefinition('snapshot.service'));
+
+    def testProcessRestoresTheConfigsGivenToOtherExtensions(self):
+        extension = SnapshotExtension(self.__resource);
+        snapshots = dict();
+        for i in range(2):
+            container = ContainerBuilder();
+            container.setExtensionSnapshots(snapshots);
+            container.registerExtension(extension);
+            container.registerExtension(OtherExtension());
+            container.loadFromExtension('snapshot', {'foo': 'bar'});
+
+            MergeExtensionConfigurationPass().process(container);
+
+            self.assertEqual([['bar']], container.getExtensionConfig('other'));
+            snapshots = container.getExtensionSnapshots();
+
+        self.assertEqual(1, extension.loads);
+
+    def testProcessDoesNotShareTheConfigsWithTheExtensions(self):
+        container = ContainerBuilder();
+        container.registerExtension(MutatingExtension());
+        container.loadFromExtension('mutating', {'foo': ['bar']});
+
+        MergeExtensionConfigurationPass().process(container);
+
+        self.assertEqual([{'foo': ['bar']}], container.getExtensionConfig('mutating'));
+
+    def __process(self, extension, config, snapshots):
+        container = ContainerBuilder();
+        container.setExtensionSnapshots(snapshots);
+        container.registerExtension(extension);
+        container.loadFromExtension('snapshot', config);
+
+        MergeExtensionConfigurationPass().process(container);
+
+        return container;
+
+class SnapshotExtension(Extension):
+    def __init__(self, resource):
+        self.loads = 0;
+        self.__resource = resource;
+
+    def load(self, configs, container):
+        self.loads += 1;
+
+        container.addResource(FileResource(self.__resource));
+        container.setParameter('snapshot.foo', configs[0]['foo']);
+        container.register('snapshot.service', 'stdClass').addMethodCall('setFoo', ['%snapshot.foo%']);
+        container.prependExtensionConfig('other', [configs[0]['foo']]);
+
+class OtherExtension(Extension):
+    def load(self, configs, container):
+        pass;
+
+class MutatingExtension(Extension):
+    def load(self, configs, container):
+        configs[0]['foo'].append('baz');
+        configs[0]['bar'] = True;
+
 class RemoveUnusedDefinitionsPassTest(unittest.TestCase):
 
     def testProcess(self):
@@ -472,6 +609,208 @@ class RemoveUnusedDefinitionsPassTest(unittest.TestCase):
 
 
 
+class RepeatedPassTest(unittest.TestCase):
+
+    def testProcessInlinesPrivateServicesRecursively(self):
+
+        container = ContainerBuilder();
+        container.register('foo').setArguments([Reference('a')]);
+        container.register('a').setArguments([Reference('b')]).setPublic(False);
+        container.register('b').setArguments([Reference('c')]).setPublic(False);
+        container.register('c').setPublic(False);
+
+        self._process(container);
+
+        self.assertEqual(['foo'], list(container.getDefinitions().keys()));
+        a = container.getDefinition('foo').getArgument(0);
+        self.assertTrue(isinstance(a, Definition));
+        self.assertTrue(isinstance(a.getArgument(0), Definition));
+        self.assertTrue(isinstance(a.getArgument(0).getArgument(0), Definition));
+
+
+    def testProcessKeepsServicesReferencedTwice(self):
+
+        container = ContainerBuilder();
+        container.register('foo').setArguments([Reference('a')]);
+        container.register('bar').setArguments([Reference('a')]);
+        container.register('a').setArguments([Reference('b')]).setPublic(False);
+        container.register('b').setPublic(False);
+        container.register('unused').setArguments([Reference('a')]).setPublic(False);
+
+        self._process(container);
+
+        self.assertEqual(['a', 'bar', 'foo'], sorted(container.getDefinitions().keys()));
+        self.assertTrue(isinstance(container.getDefinition('a').getArgument(0), Definition));
+        self.assertTrue(isinstance(container.getDefinition('foo').getArgument(0), Reference));
+
+
+    def testProcessGivesTheSameResultAsAFullProcess(self):
+
+        for seed in range(5):
+            expected = self._createContainer(seed);
+            self._process(expected, [NoopRepeatablePass()]);
+
+            container = self._createContainer(seed);
+            self._process(container);
+
+            self.assertEqual(self._describe(expected), self._describe(container));
+            self.assertEqual(expected.getCompiler().getLog(), container.getCompiler().getLog());
+
+
+    def testCompileInlinesChainsAndRemovesUnusedOnes(self):
+
+        container = ContainerBuilder();
+        container.addScope(Scope('request'));
+
+        for i in range(3):
+            container.register('hub.{0}'.format(i), 'Hub').setPublic(False);
+
+            controller = container.register('controller.{0}'.format(i), 'Controller');
+            controller.addArgument(Reference('hub.{0}'.format(i)));
+            controller.addArgument(Reference('hub.{0}'.format((i + 1) % 3)));
+            controller.addArgument(Reference('link.{0}.0'.format(i)));
+
+            for k in range(4):
+                link = container.register('link.{0}.{1}'.format(i, k), 'Link').setPublic(False);
+                if k + 1 < 4 :
+                    link.addArgument(Reference('link.{0}.{1}'.format(i, k + 1)));
+                else :
+                    link.addArgument(Reference('hub.{0}'.format(i)));
+
+        # unused chains whose scopes alternate can not be inlined, one level
+        # of them is removed per round
+        for k in range(6):
+            service = container.register('unused.{0}'.format(k), 'Unused').setPublic(False);
+            if k % 2 :
+                service.setScope('request');
+            if k + 1 < 6 :
+                service.addArgument(Reference('unused.{0}'.format(k + 1), ContainerInterface.EXCEPTION_ON_INVALID_REFERENCE, False));
+
+        container.compile();
+
+        self.assertEqual(6, len(container.getDefinitions()));
+        definition = container.getDefinition('controller.0').getArgument(2);
+        for i in range(3):
+            self.assertTrue(isinstance(definition, Definition));
+            definition = definition.getArgument(0);
+        self.assertTrue(isinstance(definition, Definition));
+        self.assertEqual('hub.0', str(definition.getArgument(0)));
+
+
+    def testWorklistIsOnlyAvailableDuringTheProcess(self):
+
+        worklists = list();
+        repeatedPass = RepeatedPass([RecordingRepeatablePass(worklists)]);
+
+        self.assertTrue(repeatedPass.getWorklist() is None);
+
+        repeatedPass.process(ContainerBuilder());
+
+        self.assertEqual(1, len(worklists));
+        self.assertTrue(isinstance(worklists[0], RepeatedPassWorklist));
+        self.assertTrue(repeatedPass.getWorklist() is None);
+
+
+    def _createContainer(self, seed):
+
+        rand = random.Random(seed);
+        container = ContainerBuilder();
+        container._ContainerBuilder__definitions = OrderedDict();
+        ids = ['s{0}'.format(i) for i in range(80)];
+
+        def argument(i):
+            j = rand.randrange(i + 1, len(ids) + 1);
+            if j == len(ids) :
+                return 'value';
+            if rand.random() < 0.2 :
+                return Definition('Nested', [Reference(ids[j])]);
+
+            return Reference(ids[j]);
+
+        for i, identifier in enumerate(ids):
+            definition = container.register(identifier, 'Foo');
+            definition.setPublic(rand.random() < 0.2);
+            if rand.random() < 0.2 :
+                definition.setScope(ContainerInterface.SCOPE_PROTOTYPE);
+
+            for k in range(rand.randrange(3)):
+                definition.addArgument(argument(i));
+
+            if rand.random() < 0.3 :
+                definition.addMethodCall('setFoo', [argument(i)]);
+
+        return container;
+
+
+    def _describe(self, value):
+
+        if isinstance(value, ContainerBuilder) :
+            return [(i, self._describe(d)) for i, d in value.getDefinitions().items()];
+        if isinstance(value, Definition) :
+            return (value.getClass(), value.getScope(), value.isPublic(),
+                self._describe(value.getArguments()),
+                self._describe(value.getMethodCalls()),
+                self._describe(value.getProperties()),
+            );
+        if isinstance(value, Reference) :
+            return '@'+str(value);
+        if isinstance(value, list) :
+            return [self._describe(v) for v in value];
+        if isinstance(value, dict) :
+            return sorted((k, self._describe(v)) for k, v in value.items());
+
+        return value;
+
+
+    def _process(self, container, passes = None):
+        assert isinstance(container, ContainerBuilder);
+
+        if passes is None :
+            passes = list();
+
+        repeatedPass = RepeatedPass([
+            AnalyzeServiceReferencesPass(),
+            InlineServiceDefinitionsPass(),
+            AnalyzeServiceReferencesPass(),
+            RemoveUnusedDefinitionsPass(),
+        ] + passes);
+        repeatedPass.process(container);
+
+
+
+class NoopRepeatablePass(RepeatablePassInterface):
+    """Disables the worklist of the repeated pass.
+
+    """
+
+    def setRepeatedPass(self, repeatedPass):
+        pass;
+
+
+    def process(self, container):
+        pass;
+
+
+
+class RecordingRepeatablePass(NoopRepeatablePass):
+
+    def __init__(self, worklists):
+
+        self.__worklists = worklists;
+        self.__repeatedPass = None;
+
+
+    def setRepeatedPass(self, repeatedPass):
+
+        self.__repeatedPass = repeatedPass;
+
+
+    def process(self, container):
+
+        self.__worklists.append(self.__repeatedPass.getWorklist());
+
+
+
 class ReplaceAliasByActualDefinitionPassTest(unittest.TestCase):
 
     def testProcess(self):
@@ -763,5 +1102,43 @@ class ResolveReferencesToAliasesPassTest(unittest.TestCase):
         cPass.process(container);
 
 
+class ServiceReferenceGraphTest(unittest.TestCase):
+
+    def testDisconnect(self):
+
+        graph = self._createGraph();
+
+        self.assertEqual(['b', 'c'], graph.disconnect('a'));
+
+        self.assertFalse(graph.hasNode('a'));
+        self.assertFalse(graph.hasNode('c'));
+        self.assertEqual(['d'], [e.getDestNode().getId() for e in graph.getNode('b').getOutEdges()]);
+        self.assertEqual([], graph.getNode('b').getInEdges());
+        self.assertEqual([], graph.disconnect('a'));
+
+
+    def testRemoveNode(self):
+
+        graph = self._createGraph();
+
+        self.assertEqual(['d', 'a'], sorted(graph.removeNode('b'), reverse=True));
+
+        self.assertFalse(graph.hasNode('b'));
+        self.assertFalse(graph.hasNode('d'));
+        self.assertEqual(['c'], [e.getDestNode().getId() for e in graph.getNode('a').getOutEdges()]);
+        self.assertEqual([], graph.removeNode('b'));
+
+
+    def _createGraph(self):
+
+        graph = ServiceReferenceGraph();
+        graph.connect('a', None, 'b', None);
+        graph.connect('a', None, 'c', None);
+        graph.connect('b', None, 'd', None);
+
+        return graph;
+
+
+
 if __name__ == '__main__':
     unittest.main();
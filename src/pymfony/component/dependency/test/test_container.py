@@ -214,6 +214,37 @@ class ContainerTest(unittest.TestCase):
         self.assertTrue(None is sc.get('', ContainerInterface.NULL_ON_INVALID_REFERENCE));
 
 
+    def testGetLowercasesTheIdentifiers(self):
+
+        sc = ProjectServiceContainer();
+        foo = Object();
+        sc.set('Foo', foo);
+
+        self.assertTrue(foo is sc.get('foo'));
+        self.assertTrue(foo is sc.get('FOO'));
+        self.assertTrue(sc.get('Foo.Baz') is sc.get('foo.baz'));
+
+
+    def testGetCallsTheFactoryOfServicesNotInitialized(self):
+
+        sc = ProjectServiceContainer();
+
+        self.assertTrue(sc.get('shared') is sc.get('shared'), '->get() returns an initialized service without calling its factory');
+        self.assertFalse(sc.get('prototype') is sc.get('prototype'), '->get() calls the factory of a service that is not stored');
+
+
+    def testUnknownIdentifiersAreNotStored(self):
+
+        sc = ProjectServiceContainer();
+
+        self.assertFalse(sc.has('unknown'));
+        self.assertTrue(None is sc.get('unknown', ContainerInterface.NULL_ON_INVALID_REFERENCE));
+        self.assertTrue(sc.has('bar'));
+
+        self.assertFalse('unknown' in sc._factories);
+        self.assertTrue('bar' in sc._factories);
+
+
     def testGetCircularReference(self):
 
 
@@ -574,6 +605,18 @@ class ProjectServiceContainer(Container):
         return self.foo_baz;
 
 
+    def getSharedService(self):
+
+        self._services['shared'] = instance = Object();
+
+        return instance;
+
+
+    def getPrototypeService(self):
+
+        return Object();
+
+
     def getCircularService(self):
 
         return self.get('circular');
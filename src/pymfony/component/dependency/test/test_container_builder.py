@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import copy;
+
+from pymfony.component.system import Object;
+from pymfony.component.system.serializer import serialize;
+from pymfony.component.system.serializer import unserialize;
+
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency.definition import Reference;
+from pymfony.component.dependency.definition import Definition;
+
+"""
+"""
+
+class ContainerBuilderTest(unittest.TestCase):
+
+    def testFindTaggedServiceIds(self):
+
+        builder = ContainerBuilder();
+        builder\
+            .register('foo', 'FooClass')\
+            .addTag('foo', {'foo': 'foo'})\
+            .addTag('bar', {'bar': 'bar'})\
+            .addTag('foo', {'foofoo': 'foofoo'})\
+        ;
+
+        self.assertEqual({
+            'foo': [
+                {'foo': 'foo'},
+                {'foofoo': 'foofoo'},
+            ]
+        }, builder.findTaggedServiceIds('foo'), '->findTaggedServiceIds() returns an array of service ids and its tag attributes');
+        self.assertEqual({}, builder.findTaggedServiceIds('foobar'), '->findTaggedServiceIds() returns an empty array if there is annotated services');
+
+
+    def testFindTaggedServiceIdsKeepsTheDefinitionOrder(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', 'FooClass');
+        builder.register('bar', 'BarClass').addTag('foo');
+        builder.register('baz', 'BazClass').addTag('foo');
+        builder.getDefinition('foo').addTag('foo');
+
+        self.assertEqual(['foo', 'bar', 'baz'], list(builder.findTaggedServiceIds('foo').keys()));
+
+        builder.setDefinition('bar', Definition('BarClass')).addTag('foo');
+        self.assertEqual(['foo', 'bar', 'baz'], list(builder.findTaggedServiceIds('foo').keys()));
+
+
+    def testFindTaggedServiceIdsFollowsTheTagChanges(self):
+
+        builder = ContainerBuilder();
+        definition = builder.register('foo', 'FooClass').addTag('foo').addTag('bar');
+
+        definition.clearTag('foo');
+        self.assertEqual({}, builder.findTaggedServiceIds('foo'));
+        self.assertEqual(['foo'], list(builder.findTaggedServiceIds('bar').keys()));
+
+        definition.setTags({'foo': [{'bar': 'bar'}]});
+        self.assertEqual({'foo': [{'bar': 'bar'}]}, builder.findTaggedServiceIds('foo'));
+        self.assertEqual({}, builder.findTaggedServiceIds('bar'));
+
+        definition.clearTags();
+        self.assertEqual({}, builder.findTaggedServiceIds('foo'));
+
+
+    def testFindTaggedServiceIdsFollowsTheDefinitionChanges(self):
+
+        builder = ContainerBuilder();
+        foo = builder.register('foo', 'FooClass').addTag('foo');
+        builder.register('bar', 'BarClass').addTag('foo');
+        builder.register('baz', 'BazClass').addTag('foo');
+        builder.register('moo', 'MooClass').addTag('foo');
+
+        builder.removeDefinition('bar');
+        builder.setAlias('baz', 'foo');
+        builder.set('moo', Object());
+        builder.setDefinition('foo', Definition('FooClass'));
+        foo.addTag('bar');
+
+        self.assertEqual({}, builder.findTaggedServiceIds('foo'));
+        self.assertEqual({}, builder.findTaggedServiceIds('bar'));
+
+        builder.setDefinitions({'bar': foo});
+        self.assertEqual(['bar'], list(builder.findTaggedServiceIds('foo').keys()));
+
+
+    def testFindTaggedServiceIdsWithADefinitionInSeveralContainers(self):
+
+        builder = ContainerBuilder();
+        definition = builder.register('foo', 'FooClass');
+
+        other = ContainerBuilder();
+        other.setDefinition('bar', definition);
+        definition.addTag('foo');
+
+        self.assertEqual(['foo'], list(builder.findTaggedServiceIds('foo').keys()));
+        self.assertEqual(['bar'], list(other.findTaggedServiceIds('foo').keys()));
+
+        other.removeDefinition('bar');
+        definition.clearTag('foo');
+
+        self.assertEqual({}, builder.findTaggedServiceIds('foo'));
+
+
+    def testFindTags(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', 'FooClass').addTag('foo').addTag('bar');
+        builder.register('bar', 'BarClass').addTag('foo');
+
+        self.assertEqual(['foo', 'bar'], builder.findTags());
+
+        builder.removeDefinition('foo');
+        self.assertEqual(['foo'], builder.findTags());
+
+
+    def testCopiedDefinitionsAreNotIndexed(self):
+
+        builder = ContainerBuilder();
+        definition = builder.register('foo', 'FooClass');
+
+        copies = [
+            copy.deepcopy(definition),
+            unserialize(serialize(definition)),
+        ];
+        for definition in copies:
+            definition.addTag('foo');
+            self.assertEqual(['foo'], list(definition.getTags().keys()));
+
+        self.assertEqual({}, builder.findTaggedServiceIds('foo'));
+
+
+    def testGetReturnsAProxyForLazyServices(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', __name__+'.LazyClass').addArgument('foo').setLazy(True);
+        LazyClass.instances = 0;
+
+        foo = builder.get('foo');
+        self.assertEqual(0, LazyClass.instances);
+        self.assertTrue(isinstance(foo, LazyClass));
+        self.assertTrue(foo is builder.get('foo'));
+
+        self.assertEqual('foo', foo.getArgument());
+        self.assertEqual(1, LazyClass.instances);
+        self.assertTrue(type(foo) is LazyClass);
+        self.assertEqual('foo', builder.get('foo').getArgument());
+        self.assertEqual(1, LazyClass.instances);
+
+
+    def testLazyServicesKeepOneIdentity(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', __name__+'.LazyClass').addArgument('foo').setLazy(True);
+        builder.register('bar', __name__+'.LazyClass').addArgument(Reference('foo'));
+
+        bar = builder.get('bar');
+        self.assertEqual('foo', bar.getArgument().getArgument());
+        self.assertTrue(bar.getArgument() is builder.get('foo'), '->get() returns the instance the consumers were given');
+
+
+class LazyClass(Object):
+
+    instances = 0;
+
+    def __init__(self, argument):
+
+        LazyClass.instances += 1;
+        self.__argument = argument;
+
+
+    def getArgument(self):
+
+        return self.__argument;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+
+from pymfony.component.system import Object;
+
+from pymfony.component.dependency.proxy import LazyServiceProxy;
+
+"""
+"""
+
+class LazyServiceProxyTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self._services = list();
+
+
+    def _factory(self, service):
+
+        def factory():
+            self._services.append(service);
+
+            return service;
+
+        return factory;
+
+
+    def testTheServiceIsCreatedOnFirstAccess(self):
+
+        service = FooClass();
+        proxy = LazyServiceProxy(self._factory(service), FooClass);
+
+        self.assertTrue(isinstance(proxy, FooClass));
+        self.assertEqual([], self._services);
+
+        self.assertEqual('foo', proxy.getFoo());
+        self.assertEqual([service], self._services);
+
+        self.assertTrue(type(proxy) is FooClass);
+        proxy.setFoo('bar');
+        self.assertEqual('bar', service.getFoo());
+        self.assertEqual([service], self._services);
+
+
+    def testSettingAnAttributeCreatesTheService(self):
+
+        service = FooClass();
+        proxy = LazyServiceProxy(self._factory(service));
+
+        proxy.bar = 'bar';
+
+        self.assertEqual('bar', service.bar);
+        self.assertTrue(type(proxy) is FooClass);
+
+
+    def testProxyForwardsToServicesWithoutAttributes(self):
+
+        service = {'foo': 'bar'};
+        proxy = LazyServiceProxy(self._factory(service), dict);
+
+        self.assertTrue(isinstance(proxy, dict));
+        self.assertEqual('bar', proxy['foo']);
+        self.assertEqual(['foo'], list(proxy));
+        self.assertEqual(1, len(proxy));
+        self.assertTrue('foo' in proxy);
+        self.assertEqual('bar', proxy.get('foo'));
+        self.assertEqual([service], self._services);
+
+
+    def testCallCreatesTheService(self):
+
+        service = FooClass();
+        proxy = LazyServiceProxy(self._factory(service));
+
+        self.assertEqual('foo', proxy());
+
+
+class FooClass(Object):
+
+    def __init__(self):
+
+        self.__foo = 'foo';
+
+
+    def getFoo(self):
+
+        return self.__foo;
+
+
+    def setFoo(self, foo):
+
+        self.__foo = foo;
+
+
+    def __call__(self):
+
+        return self.__foo;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -181,6 +181,56 @@ class ParameterBagTest(unittest.TestCase):
         self.assertEqual('foo.bar:1337', bag.resolveValue('%host%:%port%'));
 
 
+    def testResolveValueDoesNotCopyValuesWithoutPlaceholders(self):
+        """
+        @covers Symfony\Component\DependencyInjection\ParameterBag\ParameterBag.resolveValue
+
+        """
+
+        bag = ParameterBag({'foo': 'bar'});
+
+        value = ['foo', {'bar': ['baz', 1, None]}, '100%%'];
+        self.assertTrue(value is bag.resolveValue(value), '->resolveValue() returns its argument unmodified if no placeholders are found');
+
+        value = {'foo': ['bar'], 'bar': '%foo%'};
+        resolved = bag.resolveValue(value);
+        self.assertEqual({'foo': ['bar'], 'bar': 'bar'}, resolved, '->resolveValue() replaces placeholders of nested values');
+        self.assertTrue(value['foo'] is resolved['foo'], '->resolveValue() only copies values that hold placeholders');
+        self.assertEqual('%foo%', value['bar'], '->resolveValue() does not modify its argument');
+
+
+    def testResolveValueParsesEachStringOnce(self):
+        """
+        @covers Symfony\Component\DependencyInjection\ParameterBag\ParameterBag.resolveValue
+
+        """
+
+        bag = ParameterBag({'foo': 'bar'});
+        self.assertEqual('a bar b', bag.resolveValue('a %foo% b'));
+
+        bag.set('foo', 'baz');
+        self.assertEqual('a baz b', bag.resolveValue('a %foo% b'), '->resolveValue() uses the current parameter values with a parsed string');
+
+        bag = ParameterBag({'foo': 'baz'});
+        self.assertEqual('a baz b', bag.resolveValue('a %foo% b'), '->resolveValue() shares parsed strings between bags');
+
+
+    def testResolveValueBoundsTheParsedStrings(self):
+
+        bag = ParameterBag({'foo': 'bar'});
+        for i in range(5000):
+            self.assertEqual('bar {0}'.format(i), bag.resolveValue('%foo% {0}'.format(i)));
+
+        segments = getattr(ParameterBag, '_ParameterBag__segments');
+        self.assertTrue(len(segments) <= getattr(ParameterBag, '_ParameterBag__SEGMENTS_LIMIT'));
+
+        bag = FrozenParameterBag({'foo': 'bar'});
+        for i in range(5000):
+            self.assertEqual('bar {0}'.format(i), bag.resolveValue('%foo% {0}'.format(i)));
+
+        self.assertTrue(len(bag._resolvedStrings) <= getattr(ParameterBag, '_ParameterBag__SEGMENTS_LIMIT'));
+
+
     def testResolveIndicatesWhyAParameterIsNeeded(self):
         """
         @covers Symfony\Component\DependencyInjection\ParameterBag\ParameterBag.resolve
@@ -284,6 +334,27 @@ class FrozenParameterBagTest(unittest.TestCase):
         self.assertEqual(parameters, bag.all(), '__init__() takes an array of parameters as its first argument');
 
 
+    def testResolveValue(self):
+        """
+        @covers Symfony\Component\DependencyInjection\ParameterBag\FrozenParameterBag.resolveValue
+
+        """
+
+        bag = FrozenParameterBag({'foo': 'bar', 'list': ['%foo%'], 'port': 1337});
+
+        self.assertEqual('bar', bag.resolveValue('%foo%'));
+        self.assertEqual(['%foo%'], bag.resolveValue('%list%'), '->resolveValue() does not resolve the values of a frozen bag again');
+        self.assertEqual('bar:1337', bag.resolveValue('%foo%:%port%'));
+        self.assertEqual('bar:1337', bag.resolveValue('%foo%:%port%'), '->resolveValue() returns the same result for a resolved string');
+        self.assertEqual(['bar', {'bar': '100%%'}], bag.resolveValue(['%foo%', {'%foo%': '100%%'}]));
+
+        try:
+            bag.resolveValue('%baz%');
+            self.fail('->resolveValue() raise a ParameterNotFoundException if a placeholder references a non-existent parameter');
+        except ParameterNotFoundException as e:
+            self.assertEqual('You have requested a non-existent parameter "baz".', e.getMessage());
+
+
     def testClear(self):
         """
         @covers Symfony\Component\DependencyInjection\ParameterBag\FrozenParameterBag.clear
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import json;
+import threading;
+
+from pymfony.component.system import Object;
+
+from pymfony.component.dependency import Container;
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency.interface import ContainerInterface;
+from pymfony.component.dependency.profiler import ServiceProfiler;
+from pymfony.component.dependency.exception import InvalidArgumentException;
+
+"""
+"""
+
+class ServiceProfilerTest(unittest.TestCase):
+
+    def testProfileRecordsTheBuildTree(self):
+
+        container = ProjectServiceContainer();
+        profiler = ServiceProfiler();
+        container.setProfiler(profiler);
+
+        foo = container.get('foo');
+        self.assertTrue(foo is container.get('FOO'));
+
+        tree = profiler.getTree();
+        self.assertEqual(['foo'], [node['id'] for node in tree]);
+        self.assertEqual(['bar'], [node['id'] for node in tree[0]['children']]);
+        self.assertEqual(['baz'], [node['id'] for node in tree[0]['children'][0]['children']]);
+
+        self.assertEqual({'foo': 2, 'bar': 1, 'baz': 2}, profiler.getRequests());
+
+        foo = tree[0];
+        self.assertTrue(foo['inclusiveTime'] >= foo['exclusiveTime'] >= 0);
+        children = sum(node['inclusiveTime'] for node in foo['children']);
+        self.assertAlmostEqual(foo['inclusiveTime'], foo['exclusiveTime'] + children);
+
+
+    def testProfileRecordsATreePerThread(self):
+
+        container = ProjectServiceContainer();
+        profiler = ServiceProfiler();
+        container.setProfiler(profiler);
+
+        container.get('threaded');
+
+        tree = profiler.getTree();
+        self.assertEqual(['baz', 'threaded'], [node['id'] for node in tree]);
+        self.assertEqual([], tree[1]['children'], 'the builds of another thread are not children of the current build');
+
+
+    def testProfileCountsTheBuilds(self):
+
+        container = ProjectServiceContainer();
+        profiler = ServiceProfiler();
+        container.setProfiler(profiler);
+
+        container.get('foo');
+        container.get('prototype');
+        container.get('prototype');
+
+        services = profiler.getServices();
+        self.assertEqual(['bar', 'baz', 'foo', 'prototype'], sorted(services.keys()));
+        self.assertEqual(1, services['baz']['builds']);
+        self.assertEqual(0, services['baz']['prototypeBuilds']);
+        self.assertEqual(2, services['prototype']['builds']);
+        self.assertEqual(2, services['prototype']['prototypeBuilds']);
+
+
+    def testProfileDoesNotCountAliasesAndFailures(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', 'pymfony.component.system.Object');
+        builder.setAlias('alias', 'foo');
+        profiler = ServiceProfiler();
+        builder.setProfiler(profiler);
+
+        self.assertTrue(builder.get('alias') is builder.get('foo'));
+        self.assertRaises(InvalidArgumentException, builder.get, 'missing');
+        self.assertEqual(None, builder.get('missing', ContainerInterface.NULL_ON_INVALID_REFERENCE));
+
+        self.assertEqual(['foo'], list(profiler.getServices().keys()));
+        self.assertEqual(1, profiler.getServices()['foo']['builds']);
+
+        tree = profiler.getTree();
+        self.assertTrue(tree[0]['alias']);
+        self.assertEqual('foo', tree[0]['children'][0]['id']);
+        self.assertTrue(tree[1]['failed']);
+
+
+    def testSetProfilerWithNoneRestoresTheGetMethod(self):
+
+        container = ProjectServiceContainer();
+        profiler = ServiceProfiler();
+        container.setProfiler(profiler);
+        container.setProfiler(None);
+
+        container.get('foo');
+
+        self.assertEqual({}, profiler.getRequests());
+        self.assertFalse('get' in container.__dict__);
+
+
+    def testExportJson(self):
+
+        container = ProjectServiceContainer();
+        profiler = ServiceProfiler();
+        container.setProfiler(profiler);
+        container.get('bar');
+        container.get('baz');
+
+        data = json.loads(profiler.exportJson());
+
+        self.assertEqual(['services', 'tree'], sorted(data.keys()));
+        self.assertEqual(2, data['services']['baz']['requests']);
+        self.assertEqual(1, data['services']['baz']['builds']);
+        self.assertEqual('bar', data['tree'][0]['id']);
+
+
+    def testExportFoldedStacks(self):
+
+        profiler = ServiceProfiler();
+        profiler.getTree().extend([
+            {'id': 'foo', 'inclusiveTime': 0.5, 'exclusiveTime': 0.25, 'children': [
+                {'id': 'bar', 'inclusiveTime': 0.25, 'exclusiveTime': 0.25, 'children': []},
+            ]},
+            {'id': 'foo', 'inclusiveTime': 0.25, 'exclusiveTime': 0.25, 'children': []},
+            {'id': 'baz', 'inclusiveTime': 0.0, 'exclusiveTime': 0.0, 'children': []},
+        ]);
+
+        self.assertEqual(
+            "foo 500000\n"
+            "foo;bar 250000\n",
+            profiler.exportFoldedStacks()
+        );
+
+
+class ProjectServiceContainer(Container):
+
+    def getFooService(self):
+        self._services['foo'] = instance = Object();
+        instance.bar = self.get('bar');
+        instance.baz = self.get('baz');
+
+        return instance;
+
+    def getBarService(self):
+        self._services['bar'] = instance = Object();
+        instance.baz = self.get('baz');
+
+        return instance;
+
+    def getBazService(self):
+        self._services['baz'] = instance = Object();
+
+        return instance;
+
+    def getPrototypeService(self):
+        return Object();
+
+    def getThreadedService(self):
+        thread = threading.Thread(target=self.get, args=('baz',));
+        thread.start();
+        thread.join();
+
+        self._services['threaded'] = instance = Object();
+
+        return instance;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import unittest;
+import os;
+import shutil;
+import tempfile;
+
+from pymfony.component.system import Object;
+from pymfony.component.system import SourceFileLoader;
+
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency import Container;
+from pymfony.component.dependency import Scope;
+from pymfony.component.dependency.interface import ContainerInterface;
+from pymfony.component.dependency.definition import Definition;
+from pymfony.component.dependency.definition import Reference;
+from pymfony.component.dependency.parameterbag import ParameterBag;
+from pymfony.component.dependency.parameterbag import FrozenParameterBag;
+from pymfony.component.dependency.exception import RuntimeException;
+from pymfony.component.dependency.dumper import PythonDumper;
+
+"""
+"""
+
+class PythonDumperTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.__dir = tempfile.mkdtemp();
+
+
+    def tearDown(self):
+
+        shutil.rmtree(self.__dir);
+
+
+    def testDumpRequiresACompiledContainer(self):
+
+        dumper = PythonDumper(ContainerBuilder());
+
+        try:
+            dumper.dump();
+            self.fail('->dump() raises a RuntimeException if the container is not compiled');
+        except Exception as e:
+            self.assertTrue(isinstance(e, RuntimeException), '->dump() raises a RuntimeException if the container is not compiled');
+
+
+    def testDumpParameters(self):
+
+        container = ContainerBuilder(ParameterBag({
+            'foo': 'bar',
+            'baz': '%foo%/baz',
+            'escaped': '100%%',
+            'list': ['%foo%', 1, True, None],
+        }));
+        container.compile();
+
+        sc = self.__load(container, 'DumpParametersContainer');
+
+        self.assertTrue(isinstance(sc, Container));
+        self.assertTrue(isinstance(sc.getParameterBag(), FrozenParameterBag), '->dump() generates a container with a frozen parameter bag');
+        self.assertEqual('bar', sc.getParameter('foo'));
+        self.assertEqual('bar/baz', sc.getParameter('baz'));
+        self.assertEqual('100%', sc.getParameter('escaped'));
+        self.assertEqual(['bar', 1, True, None], sc.getParameter('list'));
+
+
+    def testDumpServices(self):
+
+        container = ContainerBuilder(ParameterBag({
+            'foo.class': __name__+'.FooClass',
+            'foo.arg': 'foo',
+        }));
+        container.register('bar', __name__+'.FooClass').addArgument('%foo.arg%/bar');
+        container.register('foo', '%foo.class%')\
+            .addArgument(Reference('bar'))\
+            .addArgument([Reference('missing', ContainerInterface.NULL_ON_INVALID_REFERENCE), '100%%'])\
+            .addMethodCall('setBar', [Reference('bar')])\
+            .addMethodCall('setBar', [Reference('missing', ContainerInterface.IGNORE_ON_INVALID_REFERENCE)])\
+            .setProperty('foo', 'bar')\
+            .setConfigurator([__name__+'.FooClass', 'configure']);
+        container.register('proto', __name__+'.FooClass').setScope(ContainerInterface.SCOPE_PROTOTYPE);
+        container.register('factory', __name__+'.FooClass')\
+            .setFactoryClass(__name__+'.FooClass')\
+            .setFactoryMethod('create')\
+            .addArgument('%foo.arg%');
+        container.register('from_service', __name__+'.FooClass')\
+            .setFactoryService('bar')\
+            .setFactoryMethod('getSelf');
+        container.setAlias('alias_for_foo', 'foo');
+        container.compile();
+
+        sc = self.__load(container, 'DumpServicesContainer');
+
+        foo = sc.get('foo');
+        self.assertTrue(isinstance(foo, FooClass), '->dump() dumps a method per service');
+        self.assertTrue(foo is sc.get('foo'), '->dump() dumps shared services');
+        self.assertTrue(foo.arg1 is sc.get('bar'), '->dump() dumps references to services');
+        self.assertEqual('foo/bar', sc.get('bar').arg1, '->dump() resolves parameters of arguments');
+        self.assertEqual([None, '100%'], foo.arg2, '->dump() dumps NULL_ON_INVALID_REFERENCE references and unescapes strings');
+        self.assertTrue(foo.bar is sc.get('bar'), '->dump() dumps method calls and ignores the ones with invalid references');
+        self.assertEqual('bar', foo.foo, '->dump() dumps properties');
+        self.assertTrue(foo.configured, '->dump() dumps the configurator');
+        self.assertTrue(foo is sc.get('alias_for_foo'), '->dump() dumps aliases');
+
+        self.assertFalse(sc.get('proto') is sc.get('proto'), '->dump() does not share prototype services');
+        self.assertEqual('foo', sc.get('factory').arg1, '->dump() dumps factory classes');
+        self.assertTrue(sc.get('bar') is sc.get('from_service'), '->dump() dumps factory services');
+
+
+    def testDumpInlinedDefinitions(self):
+
+        container = ContainerBuilder();
+        inlined = Definition(__name__+'.FooClass', ['inlined']);
+        inlined.addMethodCall('setBar', ['bar']);
+        container.register('foo', __name__+'.FooClass').addArgument(inlined);
+        container.compile();
+
+        sc = self.__load(container, 'DumpInlinedContainer');
+
+        foo = sc.get('foo');
+        self.assertTrue(isinstance(foo.arg1, FooClass), '->dump() dumps inlined definitions');
+        self.assertEqual('inlined', foo.arg1.arg1);
+        self.assertEqual('bar', foo.arg1.bar);
+
+
+    def testDumpScopedServices(self):
+
+        container = ContainerBuilder();
+        container.addScope(Scope('foo'));
+        container.register('scoped', __name__+'.FooClass').setScope('foo');
+        container.compile();
+
+        sc = self.__load(container, 'DumpScopedContainer');
+
+        try:
+            sc.get('scoped');
+            self.fail('->dump() dumps services that cannot be created out of their scope');
+        except Exception as e:
+            self.assertTrue(isinstance(e, RuntimeException));
+
+        sc.enterScope('foo');
+        scoped = sc.get('scoped');
+        self.assertTrue(scoped is sc.get('scoped'));
+        sc.leaveScope('foo');
+        self.assertFalse(sc.initialized('scoped'));
+
+
+    def testDumpSyntheticServices(self):
+
+        container = ContainerBuilder();
+        container.register('request').setSynthetic(True);
+        container.compile();
+
+        sc = self.__load(container, 'DumpSyntheticContainer');
+
+        try:
+            sc.get('request');
+            self.fail('->dump() dumps a method that rejects a synthetic service which is not set');
+        except Exception as e:
+            self.assertTrue(isinstance(e, RuntimeException));
+            self.assertTrue('synthetic service ("request")' in str(e));
+
+        request = Object();
+        sc.set('request', request);
+        self.assertTrue(request is sc.get('request'));
+
+
+    def testDumpLazyServices(self):
+
+        FooClass.instances = 0;
+        container = ContainerBuilder();
+        container.register('lazy', __name__+'.FooClass').addArgument('lazy').setLazy(True);
+        container.register('foo', __name__+'.FooClass').addArgument(Reference('lazy'));
+        container.compile();
+
+        sc = self.__load(container, 'DumpLazyContainer');
+
+        foo = sc.get('foo');
+        self.assertEqual(1, FooClass.instances, '->dump() dumps a proxy for lazy services');
+        self.assertTrue(isinstance(foo.arg1, FooClass));
+        self.assertTrue(foo.arg1 is sc.get('lazy'));
+
+        self.assertEqual('lazy', foo.arg1.arg1);
+        self.assertEqual(2, FooClass.instances);
+        self.assertTrue(type(foo.arg1) is FooClass, 'the proxy turns into the lazy service');
+        self.assertTrue(foo.arg1 is sc.get('lazy'), 'the container keeps returning the instance the consumers were given');
+        self.assertEqual('lazy', sc.get('lazy').arg1);
+        self.assertEqual(2, FooClass.instances);
+
+
+    def __load(self, container, className):
+
+        dumper = PythonDumper(container);
+        path = os.path.join(self.__dir, className+'.py');
+        f = open(path, 'w');
+        f.write(dumper.dump({'class': className}));
+        f.close();
+
+        module = SourceFileLoader.load(path, True);
+
+        return getattr(module, className)();
+
+
+
+class FooClass(Object):
+
+    instances = 0;
+
+    def __init__(self, arg1 = None, arg2 = None):
+
+        FooClass.instances += 1;
+        self.arg1 = arg1;
+        self.arg2 = arg2;
+        self.bar = None;
+        self.configured = False;
+
+
+    def setBar(self, bar):
+
+        self.bar = bar;
+
+
+    def getSelf(self):
+
+        return self;
+
+
+    @classmethod
+    def create(cls, arg1):
+
+        return cls(arg1);
+
+
+    @classmethod
+    def configure(cls, instance):
+
+        instance.configured = True;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import threading;
+import time;
+
+from pymfony.component.system import Object;
+from pymfony.component.system.exception import LogicException;
+
+from pymfony.component.dependency import Container;
+from pymfony.component.dependency import ContainerBuilder;
+from pymfony.component.dependency import Scope;
+from pymfony.component.dependency.definition import Reference;
+
+"""
+"""
+
+class ThreadSafeContainerTest(unittest.TestCase):
+
+    def _run(self, *targets):
+
+        results = [None] * len(targets);
+        errors = list();
+
+        def run(index, target):
+            try:
+                results[index] = target();
+            except Exception as e:
+                errors.append(e);
+
+        threads = list();
+        for index, target in enumerate(targets):
+            threads.append(threading.Thread(target=run, args=(index, target)));
+        for thread in threads:
+            thread.start();
+        for thread in threads:
+            thread.join(10);
+            self.assertFalse(thread.is_alive(), 'a thread is blocked');
+
+        if errors:
+            raise errors[0];
+
+        return results;
+
+
+    def testEnableThreadSafety(self):
+
+        sc = ProjectServiceContainer();
+        self.assertFalse(sc.isThreadSafe());
+
+        foo = sc.get('foo');
+        sc.enableThreadSafety();
+
+        self.assertTrue(sc.isThreadSafe());
+        self.assertTrue(foo is sc.get('foo'), '->enableThreadSafety() keeps the built services');
+        self.assertTrue(sc.initialized('foo'));
+
+
+    def testEnableThreadSafetyWithAnActiveScope(self):
+
+        sc = ProjectServiceContainer();
+        sc.addScope(Scope('request'));
+        sc.enterScope('request');
+
+        self.assertRaises(LogicException, sc.enableThreadSafety);
+
+
+    def testAServiceIsBuiltOnce(self):
+
+        sc = ProjectServiceContainer();
+        sc.enableThreadSafety();
+
+        services = self._run(*[lambda: sc.get('slow')] * 8);
+
+        self.assertEqual(1, sc.builds['slow']);
+        for service in services:
+            self.assertTrue(service is services[0]);
+            self.assertTrue(service.foo is sc.get('foo'), 'the other threads get the service once it is built');
+
+
+    def testCircularReferencesBetweenThreads(self):
+
+        sc = ProjectServiceContainer();
+        sc.enableThreadSafety();
+
+        bar, baz = self._run(lambda: sc.get('bar'), lambda: sc.get('baz'));
+
+        self.assertTrue(bar.baz is baz);
+        self.assertTrue(baz.bar is bar);
+        self.assertEqual(1, sc.builds['bar']);
+        self.assertEqual(1, sc.builds['baz']);
+
+
+    def testScopesArePerThread(self):
+
+        sc = ProjectServiceContainer();
+        sc.addScope(Scope('request'));
+        sc.enableThreadSafety();
+
+        sc.enterScope('request');
+        request = Object();
+        sc.set('request', request, 'request');
+
+        def other():
+            self.assertFalse(sc.isScopeActive('request'));
+            self.assertFalse(sc.has('request'));
+
+            sc.enterScope('request');
+            service = Object();
+            sc.set('request', service, 'request');
+            self.assertTrue(service is sc.get('request'));
+            sc.leaveScope('request');
+
+            self.assertFalse(sc.has('request'));
+
+            return service;
+
+        service, = self._run(other);
+
+        self.assertFalse(service is request);
+        self.assertTrue(request is sc.get('request'));
+        self.assertTrue(sc.isScopeActive('request'));
+
+        sc.leaveScope('request');
+        self.assertFalse(sc.has('request'));
+
+
+    def testContainerBuilder(self):
+
+        builder = ContainerBuilder();
+        builder.register('foo', __name__+'.SlowClass').addArgument(Reference('bar'));
+        builder.register('bar', __name__+'.SlowClass');
+        builder.enableThreadSafety();
+        SlowClass.instances = 0;
+
+        services = self._run(*[lambda: builder.get('foo')] * 4);
+
+        self.assertEqual(2, SlowClass.instances);
+        for service in services:
+            self.assertTrue(service is services[0]);
+            self.assertTrue(service.argument is builder.get('bar'));
+
+
+class ProjectServiceContainer(Container):
+
+    def __init__(self):
+
+        Container.__init__(self);
+
+        self.builds = dict();
+        self.__started = dict();
+        for identifier in ['bar', 'baz']:
+            self.__started[identifier] = threading.Event();
+
+
+    def __build(self, identifier):
+
+        self.builds[identifier] = self.builds.get(identifier, 0) + 1;
+
+
+    def getFooService(self):
+
+        self.__build('foo');
+        self._services['foo'] = instance = Object();
+
+        return instance;
+
+
+    def getSlowService(self):
+
+        self.__build('slow');
+        self._services['slow'] = instance = Object();
+        time.sleep(0.05);
+        instance.foo = self.get('foo');
+
+        return instance;
+
+
+    def getBarService(self):
+
+        self.__build('bar');
+        self._services['bar'] = instance = Object();
+        self.__started['bar'].set();
+        self.__started['baz'].wait(5);
+        instance.baz = self.get('baz');
+
+        return instance;
+
+
+    def getBazService(self):
+
+        self.__build('baz');
+        self._services['baz'] = instance = Object();
+        self.__started['baz'].set();
+        self.__started['bar'].wait(5);
+        instance.bar = self.get('bar');
+
+        return instance;
+
+
+class SlowClass(Object):
+
+    instances = 0;
+
+    def __init__(self, argument = None):
+
+        time.sleep(0.02);
+        SlowClass.instances += 1;
+        self.argument = argument;
+
+
+if __name__ == '__main__':
+    unittest.main();
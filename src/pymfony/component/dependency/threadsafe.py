@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import threading;
+
+try:
+    from thread import get_ident;
+except ImportError:
+    from threading import get_ident;
+
+try:
+    import contextvars;
+except ImportError:
+    contextvars = None;
+
+from pymfony.component.system import Object;
+
+from pymfony.component.dependency.exception import ServiceCircularReferenceException;
+from pymfony.component.dependency.exception import LogicException;
+
+"""
+"""
+
+class ThreadLocalMap(Object):
+    """A dict-like object holding one dict per thread.
+
+    @see: Container.enableThreadSafety()
+
+    """
+
+    def __init__(self):
+        """Constructor.
+
+        """
+
+        self.__local = threading.local();
+
+    def __getMap(self):
+
+        try:
+            return self.__local.map;
+        except AttributeError:
+            self.__local.map = dict();
+
+            return self.__local.map;
+
+    def __contains__(self, key):
+        return key in self.__getMap();
+
+    def __getitem__(self, key):
+        return self.__getMap()[key];
+
+    def __setitem__(self, key, value):
+        self.__getMap()[key] = value;
+
+    def __delitem__(self, key):
+        del self.__getMap()[key];
+
+    def __iter__(self):
+        return iter(self.__getMap());
+
+    def __len__(self):
+        return len(self.__getMap());
+
+    def get(self, key, default = None):
+        return self.__getMap().get(key, default);
+
+    def pop(self, key, *default):
+        return self.__getMap().pop(key, *default);
+
+    def keys(self):
+        return self.__getMap().keys();
+
+    def values(self):
+        return self.__getMap().values();
+
+    def items(self):
+        return self.__getMap().items();
+
+    def update(self, values):
+        self.__getMap().update(values);
+
+    def clear(self):
+        self.__getMap().clear();
+
+
+class ContextLocalMap(Object):
+    """A dict-like object holding one dict per execution context.
+
+    Each thread and each asyncio task has its own dict. A task starts with
+    the dict of the context that created it, and a write replaces the dict
+    of the current context only, so the changes of a task are seen neither
+    by its parent nor by the other tasks.
+
+    @see: Container.enableContextScopes()
+
+    """
+
+    def __init__(self):
+        """Constructor.
+
+        @raise LogicException: When the contextvars module is not available
+
+        """
+        if None is contextvars:
+            raise LogicException(
+                'The context local maps require the contextvars module '
+                '(Python 3.7 or newer).'
+            );
+
+        self.__map = contextvars.ContextVar(
+            'pymfony.component.dependency.ContextLocalMap', default=None
+        );
+
+    def __getMap(self):
+
+        current = self.__map.get();
+        if None is current:
+            return dict();
+
+        return current;
+
+    def __copyMap(self):
+
+        current = self.__map.get();
+        if None is current:
+            return dict();
+
+        return dict(current);
+
+    def __contains__(self, key):
+        return key in self.__getMap();
+
+    def __getitem__(self, key):
+        return self.__getMap()[key];
+
+    def __setitem__(self, key, value):
+        current = self.__copyMap();
+        current[key] = value;
+        self.__map.set(current);
+
+    def __delitem__(self, key):
+        current = self.__copyMap();
+        del current[key];
+        self.__map.set(current);
+
+    def __iter__(self):
+        return iter(self.__getMap());
+
+    def __len__(self):
+        return len(self.__getMap());
+
+    def get(self, key, default = None):
+        return self.__getMap().get(key, default);
+
+    def pop(self, key, *default):
+        current = self.__copyMap();
+        value = current.pop(key, *default);
+        self.__map.set(current);
+
+        return value;
+
+    def keys(self):
+        return self.__getMap().keys();
+
+    def values(self):
+        return self.__getMap().values();
+
+    def items(self):
+        return self.__getMap().items();
+
+    def update(self, values):
+        current = self.__copyMap();
+        current.update(values);
+        self.__map.set(current);
+
+    def clear(self):
+        self.__map.set(dict());
+
+
+class ThreadSafeServiceMap(dict):
+    """The services of a container shared between threads.
+
+    The dict holds the services visible from every thread, so reading a
+    built service costs a dict lookup without lock. A service in creation
+    stays pending and visible only from the thread building it until its
+    creation ends. The services of the active scopes are not shared, they
+    are read from the scoped services of the current thread.
+
+    The builds are coordinated per service: each service is built by one
+    thread at a time, the other threads requesting it wait for the end of
+    the build. When two threads wait for each other because of a circular
+    reference between setter injected services, the waiting thread gets
+    the pending service, as a single thread would.
+
+    @see: Container.enableThreadSafety()
+
+    """
+
+    def __init__(self, services, scopedServices):
+        """Constructor.
+
+        @param: dict           services       The shared services
+        @param  ThreadLocalMap scopedServices The scoped services of the
+                                              container
+
+        """
+        dict.__init__(self, services);
+
+        self.__scopedServices = scopedServices;
+        self.__pending = dict();
+        self.__builders = dict();
+        self.__waiting = dict();
+        self.__condition = threading.Condition();
+
+    def __missing__(self, key):
+
+        if key in self.__pending and get_ident() == self.__builders.get(key):
+            return self.__pending[key];
+
+        for services in self.__scopedServices.values():
+            if key in services:
+                return services[key];
+
+        raise KeyError(key);
+
+    def __contains__(self, key):
+
+        if dict.__contains__(self, key):
+            return True;
+
+        try:
+            self.__missing__(key);
+        except KeyError:
+            return False;
+
+        return True;
+
+    def __setitem__(self, key, value):
+
+        if get_ident() == self.__builders.get(key):
+            self.__pending[key] = value;
+        elif not self.__isScoped(key):
+            dict.__setitem__(self, key, value);
+
+    def pop(self, key, *default):
+
+        if get_ident() == self.__builders.get(key):
+            self.__pending.pop(key, None);
+
+        return dict.pop(self, key, *default);
+
+    def keys(self):
+
+        keys = list(dict.keys(self));
+        for services in self.__scopedServices.values():
+            keys.extend(services.keys());
+
+        return keys;
+
+    def build(self, identifier, create, invalidBehavior):
+        """Builds a service once, or waits for another thread to build it.
+
+        @param: string   identifier      The lowercased service identifier
+        @param  callable create          Creates the service, takes the
+                                         identifier and the invalid behavior
+        @param  integer  invalidBehavior The behavior when the service does
+                                         not exist
+
+        @return: object The service
+
+        @raise ServiceCircularReferenceException: When two threads wait for
+                                                  each other to create their
+                                                  services
+
+        """
+        me = get_ident();
+
+        self.__condition.acquire();
+        try:
+            while True:
+                try:
+                    return self[identifier];
+                except KeyError:
+                    pass;
+
+                builder = self.__builders.get(identifier);
+                if None is builder or me == builder:
+                    break;
+
+                path = self.__getWaitingPath(identifier, me);
+                if path:
+                    if identifier in self.__pending:
+                        return self.__pending[identifier];
+
+                    raise ServiceCircularReferenceException(identifier, path);
+
+                self.__waiting[me] = identifier;
+                self.__condition.wait();
+                del self.__waiting[me];
+
+            self.__builders[identifier] = me;
+        finally:
+            self.__condition.release();
+
+        if me == builder:
+            # the current thread builds it already
+            return create(identifier, invalidBehavior);
+
+        try:
+            return create(identifier, invalidBehavior);
+        finally:
+            self.__condition.acquire();
+            try:
+                self.__publish(identifier);
+                del self.__builders[identifier];
+                self.__condition.notify_all();
+            finally:
+                self.__condition.release();
+
+    def __publish(self, identifier):
+
+        if identifier not in self.__pending:
+            return;
+
+        service = self.__pending.pop(identifier);
+        if not self.__isScoped(identifier):
+            dict.__setitem__(self, identifier, service);
+
+    def __isScoped(self, key):
+
+        for services in self.__scopedServices.values():
+            if key in services:
+                return True;
+
+        return False;
+
+    def __getWaitingPath(self, identifier, thread):
+        """Returns the services that the builders wait for, when one of them
+        waits for the given thread.
+
+        @return: list|None
+
+        """
+        path = [identifier];
+        builder = self.__builders.get(identifier);
+        while None is not builder and builder in self.__waiting:
+            identifier = self.__waiting[builder];
+            if identifier in path:
+                return None;
+
+            path.append(identifier);
+            builder = self.__builders.get(identifier);
+
+        if builder == thread:
+            return path;
+
+        return None;
@@ -7,14 +7,19 @@
 # file that was distributed with this source code.
 from __future__ import absolute_import;
 
+import bisect;
+
 from pymfony.component.system import Object;
+from pymfony.component.system import ClassLoader;
 from pymfony.component.system import ArrayAccessInterface;
 from pymfony.component.system import IteratorAggregateInterface;
 from pymfony.component.system.oop import interface;
 from pymfony.component.system.types import String;
+from pymfony.component.system.types import OrderedDict;
 from pymfony.component.system.exception import InvalidArgumentException;
 from pymfony.component.system.exception import BadMethodCallException;
 
+from pymfony.component.dependency import Container;
 from pymfony.component.dependency import ContainerInterface;
 
 """
@@ -115,11 +120,15 @@ class EventSubscriberInterface(Object):
          * An array of arrays composed of the method names to call and
            respective priorities, or 0 if unset
 
+        The AsyncEventDispatcher also reads a third item after the priority,
+        a Boolean that marks the listener as deferred.
+
         For instance:
 
          * {'eventName': 'methodName'}
          * {'eventName': ('methodName', priority)}
          * {'eventName': [('methodName1', priority), ('methodName2')]}
+         * {'eventName': ('methodName', priority, True)}
 
         @return: dict The event names to listen to
         """
@@ -306,10 +315,27 @@ class GenericEvent(Event, ArrayAccessInterface, IteratorAggregateInterface):
 
 class EventDispatcher(EventDispatcherInterface):
     def __init__(self):
+        # {eventName: {priority: OrderedDict({serial: listener})}}
         self.__listeners = dict();
+        # {eventName: [priority, ...]} in ascending order
+        self.__priorities = dict();
+        # {eventName: [listener, ...]}
         self.__sorted = dict();
+        # {eventName: ((callable, ...), canStop)}
+        self.__plans = dict();
+        self.__serial = 0;
+
+        doDispatch = type(self)._doDispatch;
+        doDispatch = getattr(doDispatch, '__func__', doDispatch);
+        self.__doDispatchOverridden = doDispatch is not EventDispatcher.__dict__['_doDispatch'];
 
     def dispatch(self, eventName, event=None):
+        if eventName not in self.__listeners:
+            if event is None:
+                return Event();
+            assert isinstance(event, Event);
+            return event;
+
         if event is None:
             event = Event();
         else:
@@ -318,25 +344,39 @@ class EventDispatcher(EventDispatcherInterface):
         event.setDispatcher(self);
         event.setName(eventName);
 
-        if eventName not in self.__listeners:
+        if self.__doDispatchOverridden:
+            # the overridden method gets the listeners, not the plan
+            self._doDispatch(self.getListeners(eventName), eventName, event);
+
             return event;
 
-        self._doDispatch(self.getListeners(eventName), eventName, event);
+        try:
+            callables, canStop = self.__plans[eventName];
+        except KeyError:
+            callables, canStop = self.__compilePlan(eventName);
+
+        if canStop:
+            for listener in callables:
+                listener(event);
+                if event.isPropagationStopped():
+                    break;
+        else:
+            callables[0](event);
 
         return event;
 
     def getListeners(self, eventName=None):
         if eventName:
-            if eventName not in self.__sorted:
-                self.__sortListeners(eventName);
+            if eventName not in self.__listeners:
+                return list();
 
-            return self.__sorted[eventName];
+            return self.__getSorted(eventName);
 
+        listeners = dict();
         for eventName in self.__listeners.keys():
-            if eventName not in self.__sorted:
-                self.__sortListeners(eventName);
+            listeners[eventName] = self.__getSorted(eventName);
 
-        return self.__sorted;
+        return listeners;
 
     def hasListeners(self, eventName=None):
         return bool(len(self.getListeners(eventName)));
@@ -344,30 +384,50 @@ class EventDispatcher(EventDispatcherInterface):
     def addListener(self, eventName, listener, priority=0):
         if eventName not in self.__listeners:
             self.__listeners[eventName] = dict();
+            self.__priorities[eventName] = list();
 
-        if priority not in self.__listeners[eventName].keys():
-            self.__listeners[eventName][priority] = list();
+        buckets = self.__listeners[eventName];
+        if priority not in buckets:
+            buckets[priority] = OrderedDict();
+            bisect.insort(self.__priorities[eventName], priority);
 
-        self.__listeners[eventName][priority].append(listener);
+        self.__serial += 1;
+        buckets[priority][self.__serial] = listener;
 
-        if eventName in self.__sorted.keys():
-            del self.__sorted[eventName];
+        self.__sorted.pop(eventName, None);
+        self.__plans.pop(eventName, None);
 
     def removeListener(self, eventName, listener):
         if eventName not in self.__listeners:
             return;
 
-        for priority, listeners in self.__listeners[eventName].items():
-            try:
-                key = listeners.index(listener);
-            except ValueError:
-                pass;
+        # the first equal listener of each priority is removed
+        buckets = self.__listeners[eventName];
+        priorities = self.__priorities[eventName];
+        removed = False;
+        for priority in list(priorities):
+            bucket = buckets[priority];
+            for serial, l in bucket.items():
+                if l == listener:
+                    break;
             else:
-                del self.__listeners[eventName][priority][key];
-                try:
-                    del self.__sorted[eventName];
-                except KeyError:
-                    pass;
+                continue;
+
+            removed = True;
+            del bucket[serial];
+            if not bucket:
+                del buckets[priority];
+                del priorities[bisect.bisect_left(priorities, priority)];
+
+        if not removed:
+            return;
+
+        if not buckets:
+            del self.__listeners[eventName];
+            del self.__priorities[eventName];
+
+        self.__sorted.pop(eventName, None);
+        self.__plans.pop(eventName, None);
 
     def addSubscriber(self, subscriber):
         assert isinstance(subscriber, EventSubscriberInterface);
@@ -431,27 +491,51 @@ class EventDispatcher(EventDispatcherInterface):
             if event.isPropagationStopped():
                 break;
 
-    def __sortListeners(self, eventName):
-        """Sorts the internal list of listeners for the given event by priority.
+    def __getSorted(self, eventName):
+        """Gets the listeners of the given event sorted by priority.
+
+        Buckets are kept in priority order, so the list is only
+        concatenated again after a change.
 
         @param eventName: string The name of the event.
+
+        @return: list
         """
-        self.__sorted[eventName] = list();
+        try:
+            return self.__sorted[eventName];
+        except KeyError:
+            pass;
+
+        listeners = list();
+        buckets = self.__listeners[eventName];
+        for priority in reversed(self.__priorities[eventName]):
+            listeners.extend(buckets[priority].values());
+
+        self.__sorted[eventName] = listeners;
 
-        if eventName in self.__listeners.keys():
-            sortedList = self.__krsort(self.__listeners[eventName]);
-            for l in sortedList:
-                self.__sorted[eventName].extend(l);
+        return listeners;
 
-    def __krsort(self, d):
-        """Sort an dict by key in reverse order.
+    def __compilePlan(self, eventName):
+        """Compiles the dispatch plan of the given event.
 
-        @return: list The reverse list of value ([value, ...]).
+        The plan holds the callables to invoke in order, so that dispatching
+        does not look up methods, and whether the propagation has to be
+        checked between them, which is only useful with several listeners.
+
+        @param eventName: string The name of the event.
+
+        @return: tuple ((callable, ...), Boolean)
         """
-        l = list();
-        for k in sorted(d.keys(), reverse=True):
-            l.append(d[k]);
-        return l;
+        callables = list();
+        for listener in self.__getSorted(eventName):
+            if isinstance(listener, list):
+                listener = getattr(listener[0], listener[1]);
+            callables.append(listener);
+
+        plan = (tuple(callables), len(callables) > 1);
+        self.__plans[eventName] = plan;
+
+        return plan;
 
 class ImmutableEventDispatcher(EventDispatcherInterface):
     """A read-only proxy for an event dispatcher.
@@ -510,18 +594,27 @@ class ContainerAwareEventDispatcher(EventDispatcher):
         self.__container = container;
         self.__listenerIds = dict();
         self.__listeners = dict();
+        # {eventName: scope generation of the container when loaded}
+        self.__loaded = dict();
+        self.__tracksScopes = isinstance(container, Container);
 
         EventDispatcher.__init__(self);
 
-    def addListenerService(self, eventName, callback, priority=0):
+    def addListenerService(self, eventName, callback, priority=0, scope=None):
         """Adds a service as event listener
 
+        A listener service of the container scope is only fetched once from
+        the container, others are fetched again each time the scope
+        generation of the container changes.
+
         @param eventName: string Event for which the listener is added.
         @param callback: list The service ID of the listener service &
                          the method name that has to be called
         @param priority: integer The higher this value, the earlier an event
                          listener will be triggered in the chain.
                          Defaults to 0.
+        @param scope: string The scope of the listener service, None when
+                      unknown.
 
         @raise InvalidArgumentException: When the callback is not valid.
         """
@@ -537,7 +630,9 @@ class ContainerAwareEventDispatcher(EventDispatcher):
             callback[0],
             callback[1],
             priority,
+            scope,
         ]);
+        self.__loaded.pop(eventName, None);
 
     def removeListener(self, eventName, listener):
         self._lazyLoad(eventName);
@@ -547,7 +642,7 @@ class ContainerAwareEventDispatcher(EventDispatcher):
                 i = -1;
                 for args in self.__listenerIds[eventName]:
                     i += 1;
-                    serviceId, method, priority = args;
+                    serviceId, method, priority, scope = args;
                     if key == serviceId+'.'+method:
                         if listener == [l, method]:
                             del self.__listeners[eventName][key];
@@ -577,46 +672,46 @@ class ContainerAwareEventDispatcher(EventDispatcher):
 
         return EventDispatcher.getListeners(self, eventName);
 
-    def addSubscriberService(self, serviceId, className):
+    def addSubscriberService(self, serviceId, className, scope=None):
         """Adds a service as event subscriber
 
+        The subscribed events are read from the class, so the service is
+        only created on the first dispatch of one of these events.
+
         @param serviceId: string The service ID of the subscriber service
         @param className: string The service's class name (which must
                                  implement EventSubscriberInterface)
+        @param scope: string The scope of the subscriber service, None when
+                      unknown.
         """
-        subscriber = self.__container.get(serviceId);
+        classType = ClassLoader.load(className);
 
-        assert isinstance(subscriber, EventSubscriberInterface);
-
-        for eventName, params in subscriber.getSubscribedEvents().items():
-            if eventName not in self.__listenerIds:
-                self.__listenerIds[eventName] = list();
+        assert issubclass(classType, EventSubscriberInterface);
 
+        for eventName, params in classType.getSubscribedEvents().items():
             if isinstance(params, String):
-                self.__listenerIds[eventName].append([
-                    serviceId,
-                    params,
-                    0,
-                ]);
+                self.addListenerService(eventName, [serviceId, params], 0, scope);
             elif isinstance(params[0], String):
                 priority = 0;
                 if len(params) > 1:
                     priority = params[1];
-                self.__listenerIds[eventName].append([
-                    serviceId,
-                    params[0],
+                self.addListenerService(
+                    eventName,
+                    [serviceId, params[0]],
                     priority,
-                ]);
+                    scope
+                );
             else:
                 for listener in params:
                     priority = 0;
                     if len(listener) > 1:
                         priority = listener[1];
-                    self.__listenerIds[eventName].append([
-                        serviceId,
-                        listener[0],
-                        priority
-                    ]);
+                    self.addListenerService(
+                        eventName,
+                        [serviceId, listener[0]],
+                        priority,
+                        scope
+                    );
 
 
     def dispatch(self, eventName, event=None):
@@ -638,34 +733,54 @@ class ContainerAwareEventDispatcher(EventDispatcher):
         """Lazily loads listeners for this event from the dependency injection
         container.
 
+        Listeners are only fetched again when the scope generation of the
+        container has changed since the last load of this event. The scopes
+        of a thread safe container are per thread or per context while its
+        generation is shared, so its listeners are fetched on each load.
+
         @param eventName: string The name of the event to dispatch. The name of
                                  the event is the name of the method that is
                                  invoked on listeners.
         """
-        if eventName not in self.__listeners.keys():
+        if eventName not in self.__listenerIds:
+            return;
+
+        generation = None;
+        if self.__tracksScopes and not self.__container.isThreadSafe():
+            generation = self.__container.getScopeGeneration();
+            if eventName in self.__loaded and self.__loaded[eventName] == generation:
+                return;
+
+        if eventName not in self.__listeners:
             self.__listeners[eventName] = dict();
+        loaded = self.__listeners[eventName];
 
-        if eventName in self.__listenerIds.keys():
-            for args in self.__listenerIds[eventName]:
-                serviceId, method, priority = args;
-                listener = self.__container.get(serviceId);
+        for args in self.__listenerIds[eventName]:
+            serviceId, method, priority, scope = args;
 
-                key = serviceId+'.'+method;
-                if key not in self.__listeners[eventName].keys():
-                    self.addListener(
-                        eventName,
-                        [listener, method],
-                        priority
-                    );
-                elif listener is not self.__listeners[eventName][key]:
-                    EventDispatcher.removeListener(self,
-                        eventName,
-                        [self.__listeners[eventName][key], method]
-                    );
-                    self.addListener(
-                        eventName,
-                        [listener, method],
-                        priority
-                    );
+            key = serviceId+'.'+method;
+            if key in loaded and scope == ContainerInterface.SCOPE_CONTAINER:
+                continue;
+
+            listener = self.__container.get(serviceId);
+
+            if key not in loaded:
+                self.addListener(
+                    eventName,
+                    [listener, method],
+                    priority
+                );
+            elif listener is not loaded[key]:
+                EventDispatcher.removeListener(self,
+                    eventName,
+                    [loaded[key], method]
+                );
+                self.addListener(
+                    eventName,
+                    [listener, method],
+                    priority
+                );
+
+            loaded[key] = listener;
 
-                self.__listeners[eventName][key] = listener;
+        self.__loaded[eventName] = generation;
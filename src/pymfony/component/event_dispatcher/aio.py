@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import asyncio;
+import inspect;
+import threading;
+from concurrent.futures import ThreadPoolExecutor;
+from concurrent.futures import wait;
+
+from pymfony.component.system.types import String;
+from pymfony.component.system.exception import LogicException;
+
+from pymfony.component.event_dispatcher import Event;
+from pymfony.component.event_dispatcher import EventDispatcher;
+from pymfony.component.event_dispatcher import EventSubscriberInterface;
+
+"""Dispatches events to coroutine listeners.
+
+This module requires Python 3.7 or newer.
+"""
+
+class AsyncEventDispatcher(EventDispatcher):
+    """An event dispatcher that awaits coroutine listeners and runs the
+    deferred listeners in the background.
+
+    The listeners are called in priority order and the propagation can be
+    stopped, as with the EventDispatcher. A listener returning an awaitable
+    is awaited before the next one is called: adispatch() awaits it,
+    dispatch() runs it to completion when no event loop runs.
+
+    A deferred listener is a fire-and-forget listener: it cannot stop the
+    propagation and nothing waits for it. Once the other listeners have been
+    called, and unless one of them stopped the propagation, the deferred
+    listeners are started in priority order: coroutine functions as tasks
+    of the running event loop, other callables on a bounded thread pool.
+    """
+
+    def __init__(self, maxWorkers = 4):
+        """Constructor.
+
+        @param maxWorkers: int The number of threads running the deferred
+                               listeners
+        """
+        EventDispatcher.__init__(self);
+
+        self.__maxWorkers = maxWorkers;
+        self.__executor = None;
+        # the deferred listeners are sorted by their own dispatcher
+        self.__deferred = EventDispatcher();
+        # {eventName: ((callable, ...), (callable, ...))}
+        self.__plans = dict();
+        self.__pending = set();
+        self.__failures = list();
+        self.__lock = threading.Lock();
+
+    def addListener(self, eventName, listener, priority=0, deferred=False):
+        """Adds an event listener that listens on the specified events.
+
+        @param eventName: string The event to listen on
+        @param listener: callable The listener, it may return an awaitable
+        @param priority: int The higher this value, the earlier an event
+                             listener will be triggered in the chain
+                             (defaults to 0)
+        @param deferred: Boolean Whether the listener runs in the background
+        """
+        if deferred:
+            self.__deferred.addListener(eventName, listener, priority);
+        else:
+            EventDispatcher.addListener(self, eventName, listener, priority);
+
+        self.__plans.pop(eventName, None);
+
+    def removeListener(self, eventName, listener):
+        EventDispatcher.removeListener(self, eventName, listener);
+        self.__deferred.removeListener(eventName, listener);
+
+        self.__plans.pop(eventName, None);
+
+    def addSubscriber(self, subscriber):
+        """Adds an event subscriber.
+
+        A listener is deferred when its array holds a true value after the
+        priority, e.g. {'eventName': ('methodName', priority, True)}.
+
+        @param subscriber: EventSubscriberInterface The subscriber.
+        """
+        assert isinstance(subscriber, EventSubscriberInterface);
+
+        for eventName, params in subscriber.getSubscribedEvents().items():
+            if isinstance(params, String):
+                params = [[params]];
+            elif isinstance(params[0], String):
+                params = [params];
+
+            for listener in params:
+                priority = 0;
+                if len(listener) > 1:
+                    priority = listener[1];
+                deferred = len(listener) > 2 and bool(listener[2]);
+                self.addListener(
+                    eventName,
+                    [subscriber, listener[0]],
+                    priority,
+                    deferred
+                );
+
+    def getDeferredListeners(self, eventName=None):
+        """Gets the deferred listeners of a specific event or all deferred
+        listeners.
+
+        @param eventName: string The name of the event
+
+        @return: list|dict The deferred listeners for the specified event, or
+                 all deferred listeners by event name
+        """
+        return self.__deferred.getListeners(eventName);
+
+    def hasListeners(self, eventName=None):
+        if EventDispatcher.hasListeners(self, eventName):
+            return True;
+
+        return self.__deferred.hasListeners(eventName);
+
+    def dispatch(self, eventName, event=None):
+        """Dispatches an event to all registered listeners.
+
+        @param eventName: string The name of the event to dispatch.
+        @param event: Event The event to pass to the event handlers/listeners.
+                            If not supplied, an empty Event instance is created.
+
+        @return: Event
+
+        @raise LogicException: When a listener returns an awaitable while an
+                               event loop runs in the current thread
+        """
+        if event is None:
+            event = Event();
+        else:
+            assert isinstance(event, Event);
+
+        plan = self.__getPlan(eventName);
+        if plan is None:
+            return event;
+        callables, deferred = plan;
+
+        event.setDispatcher(self);
+        event.setName(eventName);
+
+        for listener in callables:
+            result = listener(event);
+            if inspect.isawaitable(result):
+                self.__runUntilComplete(result);
+            if event.isPropagationStopped():
+                return event;
+
+        for listener in deferred:
+            self.__defer(listener, event);
+
+        return event;
+
+    async def adispatch(self, eventName, event=None):
+        """Dispatches an event to all registered listeners from a coroutine.
+
+        @param eventName: string The name of the event to dispatch.
+        @param event: Event The event to pass to the event handlers/listeners.
+                            If not supplied, an empty Event instance is created.
+
+        @return: Event
+        """
+        if event is None:
+            event = Event();
+        else:
+            assert isinstance(event, Event);
+
+        plan = self.__getPlan(eventName);
+        if plan is None:
+            return event;
+        callables, deferred = plan;
+
+        event.setDispatcher(self);
+        event.setName(eventName);
+
+        for listener in callables:
+            result = listener(event);
+            if inspect.isawaitable(result):
+                await result;
+            if event.isPropagationStopped():
+                return event;
+
+        for listener in deferred:
+            self.__defer(listener, event);
+
+        return event;
+
+    def flush(self):
+        """Waits for the deferred listeners running on the thread pool.
+
+        The deferred coroutines run on an event loop, use aflush() to wait
+        for them.
+
+        @raise Exception: The first failure of a deferred listener since the
+                          last flush
+        """
+        with self.__lock:
+            futures = [f for f in self.__pending if not isinstance(f, asyncio.Future)];
+
+        wait(futures);
+        # the callbacks of the futures may not have run yet
+        for future in futures:
+            self.__done(future);
+
+        self.__raiseFailure();
+
+    async def aflush(self):
+        """Waits for all the deferred listeners from a coroutine.
+
+        @raise Exception: The first failure of a deferred listener since the
+                          last flush
+        """
+        loop = asyncio.get_running_loop();
+        while True:
+            with self.__lock:
+                pending = list(self.__pending);
+
+            awaitables = list();
+            for future in pending:
+                if not isinstance(future, asyncio.Future):
+                    awaitables.append(asyncio.wrap_future(future));
+                elif future.get_loop() is loop:
+                    awaitables.append(future);
+            if not awaitables:
+                break;
+
+            # a deferred listener may dispatch other events
+            await asyncio.gather(*awaitables, return_exceptions=True);
+            for future in pending:
+                if future.done():
+                    self.__done(future);
+
+        self.__raiseFailure();
+
+    def shutdown(self, wait = True):
+        """Stops the thread pool of the deferred listeners.
+
+        @param wait: Boolean Whether to wait for the running listeners
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait);
+            self.__executor = None;
+
+    def __getPlan(self, eventName):
+        """Gets the callables of the listeners and of the deferred listeners
+        of the given event, in priority order.
+
+        @param eventName: string The name of the event.
+
+        @return: tuple|None ((callable, ...), (callable, ...)), None without
+                 listener
+        """
+        try:
+            return self.__plans[eventName];
+        except KeyError:
+            pass;
+
+        listeners = EventDispatcher.getListeners(self, eventName);
+        deferred = self.__deferred.getListeners(eventName);
+        if not listeners and not deferred:
+            return None;
+
+        plan = (self.__resolve(listeners), self.__resolve(deferred));
+        self.__plans[eventName] = plan;
+
+        return plan;
+
+    def __resolve(self, listeners):
+        callables = list();
+        for listener in listeners:
+            if isinstance(listener, list):
+                listener = getattr(listener[0], listener[1]);
+            callables.append(listener);
+
+        return tuple(callables);
+
+    def __runUntilComplete(self, awaitable):
+        try:
+            asyncio.get_running_loop();
+        except RuntimeError:
+            return asyncio.run(_await(awaitable));
+
+        if hasattr(awaitable, 'close'):
+            awaitable.close();
+
+        raise LogicException(
+            'A listener returned an awaitable while an event loop is '
+            'running, use adispatch() to dispatch the event.'
+        );
+
+    def __defer(self, listener, event):
+        """Starts a deferred listener.
+
+        @param listener: callable The listener
+        @param event: Event The event
+        """
+        future = None;
+        if inspect.iscoroutinefunction(listener):
+            try:
+                loop = asyncio.get_running_loop();
+            except RuntimeError:
+                pass;
+            else:
+                future = loop.create_task(listener(event));
+
+        if future is None:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(self.__maxWorkers);
+            future = self.__executor.submit(_call, listener, event);
+
+        with self.__lock:
+            self.__pending.add(future);
+        future.add_done_callback(self.__done);
+
+    def __done(self, future):
+        with self.__lock:
+            if future not in self.__pending:
+                return;
+
+            self.__pending.remove(future);
+            if not future.cancelled() and future.exception() is not None:
+                self.__failures.append(future.exception());
+
+    def __raiseFailure(self):
+        with self.__lock:
+            failures = self.__failures;
+            self.__failures = list();
+
+        if failures:
+            raise failures[0];
+
+
+def _call(listener, event):
+    """Calls a deferred listener on a thread of the pool.
+    """
+    result = listener(event);
+    if inspect.isawaitable(result):
+        result = asyncio.run(_await(result));
+
+    return result;
+
+
+async def _await(awaitable):
+    return await awaitable;
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import asyncio;
+
+"""The coroutines of the async event dispatcher tests.
+
+This module requires Python 3.7 or newer.
+"""
+
+def createListener(calls, name, delay = 0):
+    async def listener(event):
+        await asyncio.sleep(delay);
+        calls.append(name);
+
+    return listener;
+
+def createStopListener(calls):
+    async def stop(event):
+        calls.append('stop');
+        event.stopPropagation();
+
+    return stop;
+
+async def dispatch(dispatcher, eventName):
+    dispatcher.dispatch(eventName);
+
+async def adispatchAndFlush(dispatcher, eventName, calls):
+    await dispatcher.adispatch(eventName);
+    calls.append('dispatched');
+    await dispatcher.aflush();
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+from __future__ import absolute_import;
+
+import unittest;
+import sys;
+import threading;
+
+from pymfony.component.system.exception import LogicException;
+
+from pymfony.component.event_dispatcher import Event;
+from pymfony.component.event_dispatcher import EventDispatcherInterface;
+from pymfony.component.event_dispatcher import EventSubscriberInterface;
+
+if sys.version_info >= (3, 7):
+    import asyncio;
+    from pymfony.component.event_dispatcher.aio import AsyncEventDispatcher;
+    # the coroutines are a syntax error for the older versions
+    import async_event_dispatcher_fixtures as fixtures;
+
+    TestCase = unittest.TestCase;
+else:
+    # asyncio support requires Python 3.7 or newer
+    TestCase = object;
+
+"""
+"""
+
+class AsyncEventDispatcherTest(TestCase):
+
+    def setUp(self):
+        self.dispatcher = AsyncEventDispatcher(2);
+        self.calls = list();
+
+    def tearDown(self):
+        self.dispatcher.shutdown();
+        self.dispatcher = None;
+
+    def testImplementsTheInterface(self):
+        self.assertTrue(isinstance(self.dispatcher, EventDispatcherInterface));
+
+    def testAdispatchAwaitsCoroutineListeners(self):
+        calls = self.calls;
+
+        first = fixtures.createListener(calls, 'first', 0.01);
+
+        def second(event):
+            calls.append('second');
+
+        self.dispatcher.addListener('pre.foo', second);
+        self.dispatcher.addListener('pre.foo', first, 10);
+
+        event = asyncio.run(self.dispatcher.adispatch('pre.foo'));
+
+        self.assertEqual(['first', 'second'], calls);
+        self.assertEqual('pre.foo', event.getName());
+        self.assertTrue(self.dispatcher is event.getDispatcher());
+
+    def testDispatchRunsCoroutineListeners(self):
+        calls = self.calls;
+
+        listener = fixtures.createListener(calls, 'listener');
+
+        self.dispatcher.addListener('pre.foo', listener);
+        self.dispatcher.dispatch('pre.foo');
+
+        self.assertEqual(['listener'], calls);
+
+    def testDispatchWithARunningLoop(self):
+        listener = fixtures.createListener(self.calls, 'listener');
+
+        self.dispatcher.addListener('pre.foo', listener);
+
+        self.assertRaises(LogicException, asyncio.run, fixtures.dispatch(self.dispatcher, 'pre.foo'));
+
+    def testStopPropagation(self):
+        calls = self.calls;
+
+        stop = fixtures.createStopListener(calls);
+
+        def other(event):
+            calls.append('other');
+
+        self.dispatcher.addListener('pre.foo', stop, 10);
+        self.dispatcher.addListener('pre.foo', other);
+        self.dispatcher.addListener('pre.foo', other, 0, True);
+
+        event = asyncio.run(self.dispatcher.adispatch('pre.foo'));
+        self.dispatcher.flush();
+
+        self.assertTrue(event.isPropagationStopped());
+        self.assertEqual(['stop'], calls);
+
+    def testDeferredListenersRunOnThePool(self):
+        started = threading.Event();
+        release = threading.Event();
+        threads = list();
+
+        def slow(event):
+            threads.append(threading.current_thread());
+            started.set();
+            release.wait(5);
+
+        self.dispatcher.addListener('pre.foo', slow, 0, True);
+        self.assertTrue(self.dispatcher.hasListeners('pre.foo'));
+        self.assertEqual([], self.dispatcher.getListeners('pre.foo'));
+        self.assertEqual([slow], self.dispatcher.getDeferredListeners('pre.foo'));
+
+        self.dispatcher.dispatch('pre.foo');
+        self.assertTrue(started.wait(5));
+        release.set();
+        self.dispatcher.flush();
+
+        self.assertFalse(threads[0] is threading.current_thread());
+
+    def testDeferredCoroutinesRunAsTasks(self):
+        calls = self.calls;
+
+        deferred = fixtures.createListener(calls, 'deferred', 0.01);
+
+        def listener(event):
+            calls.append('listener');
+
+        self.dispatcher.addListener('pre.foo', deferred, 10, True);
+        self.dispatcher.addListener('pre.foo', listener);
+
+        asyncio.run(fixtures.adispatchAndFlush(self.dispatcher, 'pre.foo', calls));
+
+        self.assertEqual(['listener', 'dispatched', 'deferred'], calls);
+
+    def testFlushRaisesTheFailures(self):
+        def failing(event):
+            raise ValueError('failure');
+
+        self.dispatcher.addListener('pre.foo', failing, 0, True);
+        self.dispatcher.dispatch('pre.foo');
+
+        self.assertRaises(ValueError, self.dispatcher.flush);
+        self.dispatcher.flush();
+
+    def testRemoveListener(self):
+        def listener(event):
+            pass;
+
+        self.dispatcher.addListener('pre.foo', listener, 0, True);
+        self.dispatcher.dispatch('pre.foo');
+        self.dispatcher.removeListener('pre.foo', listener);
+
+        self.assertFalse(self.dispatcher.hasListeners('pre.foo'));
+
+    def testAddSubscriberWithDeferredListeners(self):
+        subscriber = TestAsyncEventSubscriber();
+        self.dispatcher.addSubscriber(subscriber);
+
+        self.assertEqual([[subscriber, 'preFoo']], self.dispatcher.getListeners('pre.foo'));
+        self.assertEqual([[subscriber, 'postFoo']], self.dispatcher.getDeferredListeners('post.foo'));
+
+        self.dispatcher.removeSubscriber(subscriber);
+
+        self.assertFalse(self.dispatcher.hasListeners());
+
+
+class TestAsyncEventSubscriber(EventSubscriberInterface):
+    @classmethod
+    def getSubscribedEvents(cls):
+        return {
+            'pre.foo': ['preFoo', 10],
+            'post.foo': ['postFoo', 0, True],
+        };
+
+    def preFoo(self, event):
+        pass;
+
+    def postFoo(self, event):
+        pass;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -9,6 +9,7 @@
 from __future__ import absolute_import;
 
 import unittest;
+import threading;
 
 from pymfony.component.system.reflection import ReflectionClass;
 from pymfony.component.event_dispatcher import Event
@@ -66,6 +67,22 @@ class ContainerAwareEventDispatcherTest(unittest.TestCase):
         dispatcher.dispatch('onEvent', event);
 
 
+    def testASubscriberServiceIsCreatedOnFirstDispatch(self):
+
+        container = Container();
+
+        dispatcher = ContainerAwareEventDispatcher(container);
+        dispatcher.addSubscriberService('service.subscriber', ReflectionClass(SubscriberService).getName());
+
+        self.assertFalse(container.initialized('service.subscriber'));
+        self.assertTrue(dispatcher.hasListeners('onEvent'));
+
+        service = SubscriberService();
+        container.set('service.subscriber', service);
+
+        self.assertEqual([[service, 'onEvent']], dispatcher.getListeners('onEvent'));
+
+
     def testPreventDuplicateListenerService(self):
 
         event = Event();
@@ -138,6 +155,79 @@ class ContainerAwareEventDispatcherTest(unittest.TestCase):
         dispatcher.dispatch('onEvent');
 
 
+    def testContainerScopedListenerServiceIsFetchedOnce(self):
+
+        container = CountingContainer();
+        container.set('service.listener', Service());
+
+        dispatcher = ContainerAwareEventDispatcher(container);
+        dispatcher.addListenerService('onEvent', ['service.listener', 'onEvent'], 0, 'container');
+
+        dispatcher.dispatch('onEvent');
+        dispatcher.dispatch('onEvent');
+        container.addScope(Scope('scope'));
+        container.enterScope('scope');
+        dispatcher.dispatch('onEvent');
+
+        self.assertEqual(['service.listener'], container.requested);
+
+
+    def testScopedListenerServiceIsFetchedWhenTheScopeChanges(self):
+
+        service1 = Service();
+        service2 = Service();
+
+        container = CountingContainer();
+        container.addScope(Scope('scope'));
+        container.enterScope('scope');
+        container.set('service.listener', service1, 'scope');
+
+        dispatcher = ContainerAwareEventDispatcher(container);
+        dispatcher.addListenerService('onEvent', ['service.listener', 'onEvent'], 0, 'scope');
+
+        dispatcher.dispatch('onEvent');
+        dispatcher.dispatch('onEvent');
+        self.assertEqual(1, len(container.requested));
+
+        container.enterScope('scope');
+        container.set('service.listener', service2, 'scope');
+
+        dispatcher.dispatch('onEvent');
+        self.assertEqual(2, len(container.requested));
+        self.assertEqual([[service2, 'onEvent']], dispatcher.getListeners('onEvent'));
+
+        container.leaveScope('scope');
+
+        dispatcher.dispatch('onEvent');
+        self.assertEqual([[service1, 'onEvent']], dispatcher.getListeners('onEvent'));
+
+
+    def testScopedListenerServiceIsFetchedPerThread(self):
+
+        service1 = Service();
+        service2 = Service();
+
+        container = CountingContainer();
+        container.addScope(Scope('scope'));
+        container.enableThreadSafety();
+        container.enterScope('scope');
+        container.set('service.listener', service1, 'scope');
+
+        dispatcher = ContainerAwareEventDispatcher(container);
+        dispatcher.addListenerService('onEvent', ['service.listener', 'onEvent'], 0, 'scope');
+        dispatcher.dispatch('onEvent');
+
+        def run():
+            container.enterScope('scope');
+            container.set('service.listener', service2, 'scope');
+            dispatcher.dispatch('onEvent');
+        thread = threading.Thread(target=run);
+        thread.start();
+        thread.join();
+
+        self.assertEqual([[service1, 'onEvent']], dispatcher.getListeners('onEvent'));
+
+
     def testHasListenersOnLazyLoad(self):
 
         event = Event();
@@ -213,6 +303,19 @@ class ContainerAwareEventDispatcherTest(unittest.TestCase):
 
 
 
+class CountingContainer(Container):
+
+    def __init__(self):
+        Container.__init__(self);
+        self.requested = list();
+
+    def get(self, identifier, invalidBehavior = Container.EXCEPTION_ON_INVALID_REFERENCE):
+        self.requested.append(identifier);
+
+        return Container.get(self, identifier, invalidBehavior);
+
+
+
 class Service(Object):
 
     def onEvent(self, e):
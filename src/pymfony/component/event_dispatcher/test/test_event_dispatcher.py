@@ -101,6 +101,35 @@ class TestEventDispatcher(unittest.TestCase):
         self.assertEqual('pre.foo', event.getName());
         self.assertTrue(event is ret);
 
+    def testDispatchWithoutListenersLeavesTheEventUntouched(self):
+        event = Event();
+        ret = self.dispatcher.dispatch('noevent', event);
+        self.assertTrue(event is ret);
+        self.assertEqual(None, event.getName());
+        self.assertEqual(None, event.getDispatcher());
+
+    def testDispatchFollowsListenerChanges(self):
+        invoked = list();
+        def listener1(e):
+            invoked.append('1');
+        def listener2(e):
+            invoked.append('2');
+
+        self.dispatcher.addListener('pre.foo', listener1);
+        self.dispatcher.dispatch(self.preFoo);
+        self.dispatcher.addListener('pre.foo', listener2, 10);
+        self.dispatcher.dispatch(self.preFoo);
+        self.dispatcher.removeListener('pre.foo', listener1);
+        self.dispatcher.dispatch(self.preFoo);
+        self.assertEqual(['1', '2', '1', '2'], invoked);
+
+    def testDispatchCallsOverriddenDoDispatch(self):
+        dispatcher = TestDoDispatchEventDispatcher();
+        dispatcher.addListener('pre.foo', [self.listener, 'preFoo']);
+        dispatcher.dispatch(self.preFoo);
+        self.assertEqual([('pre.foo', [[self.listener, 'preFoo']])], dispatcher.dispatched);
+        self.assertTrue(self.listener.preFooInvoked);
+
     def testDispatchForClosure(self):
         self.invoked = 0;
         def listener(e):
@@ -145,6 +174,52 @@ class TestEventDispatcher(unittest.TestCase):
         self.assertFalse(self.dispatcher.hasListeners(self.preBar));
         self.dispatcher.removeListener('notExists', self.listener);
 
+    def testRemoveListenerKeepsPriorityOrder(self):
+        listener1 = TestEventListener();
+        listener2 = TestEventListener();
+        listener3 = TestEventListener();
+
+        self.dispatcher.addListener('pre.foo', [listener1, 'preFoo'], -10);
+        self.dispatcher.addListener('pre.foo', [listener2, 'preFoo'], 10);
+        self.dispatcher.addListener('pre.foo', [listener3, 'preFoo']);
+        self.dispatcher.getListeners('pre.foo');
+
+        self.dispatcher.removeListener('pre.foo', [listener2, 'preFoo']);
+        self.assertEqual([
+            [listener3, 'preFoo'],
+            [listener1, 'preFoo'],
+        ], self.dispatcher.getListeners('pre.foo'));
+
+        self.dispatcher.addListener('pre.foo', [listener2, 'preFoo'], 5);
+        self.assertEqual([
+            [listener2, 'preFoo'],
+            [listener3, 'preFoo'],
+            [listener1, 'preFoo'],
+        ], self.dispatcher.getListeners('pre.foo'));
+
+    def testRemoveBoundMethodListener(self):
+        self.dispatcher.addListener('pre.foo', self.listener.preFoo);
+        self.dispatcher.addListener('pre.foo', TestEventListener().preFoo);
+        self.dispatcher.removeListener('pre.foo', self.listener.preFoo);
+
+        self.dispatcher.dispatch(self.preFoo);
+        self.assertEqual(1, len(self.dispatcher.getListeners(self.preFoo)));
+        self.assertFalse(self.listener.preFooInvoked);
+
+    def testRemoveListenerRemovesTheFirstEqualListenerOfEachPriority(self):
+        listener = TestEventListener();
+        self.dispatcher.addListener('pre.foo', [listener, 'preFoo'], 10);
+        self.dispatcher.addListener('pre.foo', [listener, 'preFoo']);
+        self.dispatcher.addListener('pre.foo', [listener, 'preFoo']);
+        self.dispatcher.addListener('pre.foo', listener.postFoo);
+
+        self.dispatcher.removeListener('pre.foo', [listener, 'preFoo']);
+        self.dispatcher.removeListener('pre.foo', [listener, 'postFoo']);
+        self.assertEqual([
+            [listener, 'preFoo'],
+            listener.postFoo,
+        ], self.dispatcher.getListeners('pre.foo'));
+
     def testAddSubscriber(self):
         eventSubscriber = TestEventSubscriber();
         self.dispatcher.addSubscriber(eventSubscriber);
@@ -207,6 +282,15 @@ class TestEventDispatcher(unittest.TestCase):
         self.dispatcher.dispatch('test');
         self.assertTrue(self.dispatcher is dispatcher[0]);
 
+class TestDoDispatchEventDispatcher(EventDispatcher):
+    def __init__(self):
+        EventDispatcher.__init__(self);
+        self.dispatched = list();
+
+    def _doDispatch(self, listeners, eventName, event):
+        self.dispatched.append((eventName, list(listeners)));
+        EventDispatcher._doDispatch(self, listeners, eventName, event);
+
 class TestEventListener():
     preFooInvoked = False;
     postFooInvoked = False;
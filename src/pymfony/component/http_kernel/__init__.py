@@ -9,28 +9,36 @@
 from __future__ import absolute_import;
 
 import os;
+import threading;
 from time import time;
 import re;
+import py_compile;
 
 from pymfony.component.system import Object;
+from pymfony.component.system import SourceFileLoader;
 from pymfony.component.system.oop import final;
 from pymfony.component.system.oop import interface;
 from pymfony.component.system.types import Array;
 from pymfony.component.system.reflection import ReflectionObject;
+from pymfony.component.system.serializer import serialize;
+from pymfony.component.system.serializer import unserialize;
+from pymfony.component.system.exception import StandardException;
 from pymfony.component.system.exception import LogicException;
 from pymfony.component.system.exception import InvalidArgumentException;
 from pymfony.component.system.exception import RuntimeException;
-from pymfony.component.system.serializer import unserialize;
-from pymfony.component.system.serializer import serialize;
 
 from pymfony.component.config import ConfigCache;
+from pymfony.component.config import CacheFileWriter;
 from pymfony.component.config.loader import LoaderResolver;
 from pymfony.component.config.loader import DelegatingLoader;
+from pymfony.component.config.loader import ParsedFileCache;
 
 from pymfony.component.dependency import ContainerBuilder;
 from pymfony.component.dependency.interface import ContainerInterface;
 from pymfony.component.dependency.interface import ContainerAwareInterface;
 from pymfony.component.dependency.parameterbag import ParameterBag;
+from pymfony.component.dependency.profiler import ServiceProfiler;
+from pymfony.component.dependency.dumper import PythonDumper;
 from pymfony.component.dependency.loader import IniFileLoader;
 from pymfony.component.dependency.loader import JsonFileLoader;
 from pymfony.component.dependency.loader import YamlFileLoader;
@@ -220,6 +228,12 @@ class Kernel(KernelInterface):
     RELEASE_VERSION = '1';
     EXTRA_VERSION = '';
 
+    # the number of kernels that disabled the exception traces and the
+    # trace state to restore once they are all shut down
+    __traceDisablers = 0;
+    __traceEnabled = True;
+    __traceLock = threading.Lock();
+
     def __init__(self, environment, debug):
         self._environment = environment;
         self._debug = bool(debug);
@@ -231,6 +245,9 @@ class Kernel(KernelInterface):
         self._container = None;
         self._extension = None;
         self._booted = False;
+        self._serviceProfiler = None;
+        # whether this kernel disabled the exception traces
+        self._tracesDisabled = False;
 
         self._rootDir = self.getRootDir();
         self._name = self.getName();
@@ -244,6 +261,42 @@ class Kernel(KernelInterface):
     def init(self):
         if self._debug:
             ExceptionHandler.register(self._debug);
+        else:
+            self.__disableTraces();
+
+    def __disableTraces(self):
+        """Disables the exception traces of the process until the kernel is
+        shut down.
+
+        The traces are restored once all the kernels that disabled them are
+        shut down, a debug kernel does not change them.
+        """
+        if self._tracesDisabled:
+            return;
+        self._tracesDisabled = True;
+
+        Kernel.__traceLock.acquire();
+        try:
+            if 0 == Kernel.__traceDisablers:
+                Kernel.__traceEnabled = StandardException.isTraceEnabled();
+            Kernel.__traceDisablers += 1;
+
+            StandardException.setTraceEnabled(False);
+        finally:
+            Kernel.__traceLock.release();
+
+    def __restoreTraces(self):
+        if not self._tracesDisabled:
+            return;
+        self._tracesDisabled = False;
+
+        Kernel.__traceLock.acquire();
+        try:
+            Kernel.__traceDisablers -= 1;
+            if 0 == Kernel.__traceDisablers:
+                StandardException.setTraceEnabled(Kernel.__traceEnabled);
+        finally:
+            Kernel.__traceLock.release();
 
     def __clone__(self):
         if self._debug:
@@ -251,6 +304,8 @@ class Kernel(KernelInterface):
 
         self._booted = False;
         self._container = None;
+        self._serviceProfiler = None;
+        self._tracesDisabled = False;
 
     def _getKernelParameters(self):
         bundles = dict();
@@ -268,6 +323,7 @@ class Kernel(KernelInterface):
             'kernel.charset': self.getCharset(),
             'kernel.container_class': self._getContainerClass(),
             'kernel.version': self.getVersion(),
+            'kernel.profile_services': False,
         };
         parameters.update(self._getEnvParameters());
         return parameters;
@@ -288,6 +344,9 @@ class Kernel(KernelInterface):
         if self._booted:
             return;
 
+        if not self._debug:
+            self.__disableTraces();
+
         # init container
         self._initializeBundles();
 
@@ -333,7 +392,7 @@ class Kernel(KernelInterface):
         """
 
         className = self._getContainerClass();
-        cache = ConfigCache(self.getCacheDir()+'/'+className+'.dat', self._debug);
+        cache = ConfigCache(self.getCacheDir()+'/'+className+'.py', self._debug);
         fresh = True;
         if not cache.isFresh() :
             container = self._buildContainer();
@@ -341,16 +400,13 @@ class Kernel(KernelInterface):
 
             fresh = False;
 
-        if fresh :
-            f = open(str(cache));
-            try:
-                content = f.read();
-            finally:
-                f.close();
+        module = SourceFileLoader.load(str(cache), not fresh);
+        self._container = getattr(module, className)();
 
-            self._container = unserialize(content);
-        else:
-            self._container = container;
+        if self._container.hasParameter('kernel.profile_services') \
+            and self._container.getParameter('kernel.profile_services') :
+            self._serviceProfiler = ServiceProfiler();
+            self._container.setProfiler(self._serviceProfiler);
 
         self._container.set('kernel', self);
 
@@ -455,6 +511,10 @@ class Kernel(KernelInterface):
         container = self._getContainerBuilder();
         extensions = list();
 
+        if self._debug:
+            container.setExtensionSnapshots(self._loadExtensionSnapshots());
+            ParsedFileCache.getInstance().load(self._getParsedFileCacheFile());
+
         container.addObjectResource(self);
 
         for bundle in self._bundles.values():
@@ -484,8 +544,68 @@ class Kernel(KernelInterface):
 
         container.compile();
 
+        if self._debug:
+            self._dumpExtensionSnapshots(container.getExtensionSnapshots());
+            ParsedFileCache.getInstance().dump(self._getParsedFileCacheFile());
+
         return container;
 
+    def _getParsedFileCacheFile(self):
+        """Gets the file where the parsed configuration files are kept
+        between two processes.
+
+        @return: string
+        """
+        return self.getCacheDir()+'/'+self._getContainerClass()+'ParsedFiles.meta';
+
+    def _getExtensionSnapshotCache(self):
+        """Gets the cache of the extension loads of the last build.
+
+        @return: ConfigCache
+        """
+        return ConfigCache(
+            self.getCacheDir()+'/'+self._getContainerClass()+'Snapshots.meta',
+            False
+        );
+
+    def _loadExtensionSnapshots(self):
+        """Loads the extension loads of the last build, so that only the
+        extensions whose configuration or resources changed are loaded again.
+
+        @return: dict ExtensionSnapshot instances by extension alias
+        """
+        cache = self._getExtensionSnapshotCache();
+        if not cache.isFresh():
+            return dict();
+
+        try:
+            f = open(str(cache));
+            try:
+                snapshots = unserialize(f.read());
+            finally:
+                f.close();
+        except Exception:
+            return dict();
+
+        if not isinstance(snapshots, dict):
+            return dict();
+
+        return snapshots;
+
+    def _dumpExtensionSnapshots(self, snapshots):
+        """Dumps the extension loads of this build for the next one.
+
+        @param snapshots: dict ExtensionSnapshot instances by extension alias
+        """
+        try:
+            content = serialize(snapshots);
+        except Exception:
+            # an extension defined something that cannot be pickled,
+            # the next build loads all extensions
+            content = serialize(dict());
+
+        self._getExtensionSnapshotCache().write(content);
+
     def _getContainerLoader(self, container):
         assert isinstance(container, ContainerInterface);
         locator = FileLocator(self);
@@ -501,7 +621,7 @@ class Kernel(KernelInterface):
 
 
     def _dumpContainer(self, cache, container, className, baseClass):
-        """Dumps the service container to PHP code in the cache.
+        """Dumps the service container to Python code in the cache.
 
         @param ConfigCache cache The config cache
         @param ContainerBuilder container The service container
@@ -513,12 +633,22 @@ class Kernel(KernelInterface):
         assert isinstance(cache, ConfigCache);
 
         # cache the container
-        content = serialize(container);
+        dumper = PythonDumper(container);
+        content = dumper.dump({'class': className, 'base_class': baseClass});
 
         cache.write(content, container.getResources());
 
+        # the module is imported on each boot, so its bytecode is written
+        # once here rather than compiled again by every process
+        try:
+            py_compile.compile(str(cache), doraise=True);
+        except (py_compile.PyCompileError, EnvironmentError):
+            pass;
+
 
     def shutdown(self):
+        self.__restoreTraces();
+
         if not self._booted:
             return;
         self._booted = False;
@@ -528,8 +658,38 @@ class Kernel(KernelInterface):
             bundle.shutdown();
             bundle.setContainer(None);
 
+        if None is not self._serviceProfiler :
+            self._container.setProfiler(None);
+            self._dumpServiceProfile(self._serviceProfiler);
+            self._serviceProfiler = None;
+
         self._container = None;
 
+    def _dumpServiceProfile(self, profiler):
+        """Writes the service builds recorded during the kernel life in the
+        logs directory, as JSON and as folded stacks for flame graphs.
+
+        @param: ServiceProfiler profiler
+
+        """
+        assert isinstance(profiler, ServiceProfiler);
+
+        logDir = self.getLogDir();
+        if not os.path.isdir(logDir):
+            try:
+                os.makedirs(logDir, 0o777);
+            except Exception:
+                raise RuntimeException(
+                    "Unable to create the logs directory ({0})\n"
+                    "".format(logDir)
+                );
+
+        prefix = logDir+'/'+self._getContainerClass()+'ServiceProfile';
+        writer = CacheFileWriter();
+        writer.add(prefix+'.json', profiler.exportJson());
+        writer.add(prefix+'.folded', profiler.exportFoldedStacks());
+        writer.commit();
+
     def getBundles(self):
         return self._bundles;
 
@@ -8,12 +8,17 @@
 
 from __future__ import absolute_import;
 
-import os;
+import threading;
+import time;
 
 from pymfony.component.system import Object;
 from pymfony.component.system.oop import interface;
 from pymfony.component.system.oop import abstract;
-from pymfony.component.system.exception import RuntimeException;
+from pymfony.component.system.types import OrderedDict;
+from pymfony.component.system.reflection import ReflectionObject;
+from pymfony.component.system.exception import LogicException;
+
+from pymfony.component.config import CacheFileWriter;
 
 """
 """
@@ -66,56 +71,70 @@ class CacheWarmer(CacheWarmerInterface):
     """
 
     def _writeCacheFile(self, filename, content):
+        """Writes a file to the cache atomically.
 
-        try:
-            suffix = 0;
-            while os.path.exists(filename+str(suffix)):
-                suffix += 1;
-            tmpFile = filename+str(suffix);
-            f = open(tmpFile, 'w');
-            f.write(content);
-            f.close();
-            if os.path.exists(filename):
-                os.remove(filename);
-            os.rename(tmpFile, filename);
-            if hasattr(os, 'chmod'):
-                umask = os.umask(0o220);
-                os.umask(umask);
-                os.chmod(filename, 0o666 & ~umask);
-        except Exception:
-            raise RuntimeException('Failed to write cache file "{0}".'.format(filename));
-        else:
-            try:
-                if hasattr(os, 'chmod'):
-                    umask = os.umask(0o220);
-                    os.umask(umask);
-                    os.chmod(filename, 0o666 & ~umask);
-            except Exception:
-                pass;
-        finally:
-            try:
-                f.close();
-            except Exception:
-                pass;
-            if os.path.exists(tmpFile):
-                os.remove(tmpFile);
+        @param filename: string The path of the file
+        @param content: bytes|string The content of the file
+
+        @raise RuntimeException: When the file cannot be written
+
+        """
+
+        CacheFileWriter().write(filename, content);
+
+
+    def _writeCacheFiles(self, contents):
+        """Writes several files to the cache, none of them is published when
+        one of them cannot be written.
+
+        @param contents: dict The contents by file path
+
+        @raise RuntimeException: When a file cannot be written
+
+        """
+        assert isinstance(contents, dict);
+
+        writer = CacheFileWriter();
+        for filename, content in contents.items():
+            writer.add(filename, content);
+        writer.commit();
 
 
 class CacheWarmerAggregate(CacheWarmerInterface):
     """Aggregates several cache warmers into a single one.
 
+    The warmers run in the order they were added, a warmer waits for the
+    end of the warmers it depends on. A parallel safe warmer runs on a
+    thread of its own, at most maxWorkers of them at the same time, while
+    the other warmers run one after another in the calling thread.
+
+    A warmer can declare its dependencies and whether it is parallel safe
+    itself, with a getDependencies() method returning the names of other
+    warmers and an isParallelSafe() method.
+
     @author Fabien Potencier <fabien@symfony.com>
 
     """
 
 
-    def __init__(self, warmers = None):
+    def __init__(self, warmers = None, maxWorkers = 4):
+        """Constructor.
+
+        @param warmers: list The cache warmers
+        @param maxWorkers: int The number of parallel safe warmers that can
+                               run at the same time, 0 runs all the warmers
+                               in the calling thread
+
+        """
         if warmers is None:
             warmers = list();
         assert isinstance(warmers, list);
 
         self._warmers = None;
         self._optionalsEnabled = None;
+        self.__options = None;
+        self.__maxWorkers = int(maxWorkers);
+        self.__timings = OrderedDict();
 
         self.setWarmers(warmers);
         self._optionalsEnabled = False;
@@ -131,15 +150,57 @@ class CacheWarmerAggregate(CacheWarmerInterface):
 
         @param string cacheDir The cache directory
 
+        @raise LogicException: When the warmers have circular dependencies
+                               or depend on an unknown warmer
+
         """
 
-        for  warmer in self._warmers :
+        self.__timings = OrderedDict();
+
+        names = set([options[0] for options in self.__options]);
+        for options in self.__options:
+            for dependency in options[1]:
+                if dependency not in names:
+                    raise LogicException(
+                        'The cache warmer "{0}" depends on the unknown cache '
+                        'warmer "{1}".'.format(options[0], dependency)
+                    );
+
+        entries = list();
+        for  warmer, options in zip(self._warmers, self.__options) :
             if not self._optionalsEnabled and warmer.isOptional() :
                 continue;
 
+            entries.append((warmer,) + options);
+
+        # a warmer only waits for the warmers that run, not for the
+        # disabled optional ones
+        indexes = dict();
+        for index, entry in enumerate(entries):
+            indexes.setdefault(entry[1], list()).append(index);
+
+        jobs = list();
+        for index, (warmer, name, dependencies, parallel) in enumerate(entries):
+            waited = set();
+            for dependency in dependencies:
+                waited.update(indexes.get(dependency, list()));
+            parallel = parallel and self.__maxWorkers > 0;
+            jobs.append((index, warmer, name, waited, parallel));
+
+        self.__run(jobs, cacheDir);
 
-            warmer.warmUp(cacheDir);
 
+    def getTimings(self):
+        """Gets how long each warmer took during the last warm up.
+
+        The time of the warmers sharing a name is added up.
+
+        @return: OrderedDict The seconds by warmer name, in the order the
+                 warmers ended
+
+        """
+
+        return OrderedDict(self.__timings);
 
 
     def isOptional(self):
@@ -156,12 +217,155 @@ class CacheWarmerAggregate(CacheWarmerInterface):
         assert isinstance(warmers, list);
 
         self._warmers = list();
+        self.__options = list();
         for warmer in warmers :
             self.add(warmer);
 
 
 
-    def add(self, warmer):
+    def add(self, warmer, name = None, dependencies = None, parallel = None):
+        """Adds a cache warmer.
+
+        @param warmer: CacheWarmerInterface The cache warmer
+        @param name: string The name of the warmer, its class name by default
+        @param dependencies: list The names of the warmers that must end
+                                  before this one starts, the warmer tells
+                                  them by default
+        @param parallel: Boolean Whether the warmer can run at the same time
+                                 as other warmers, the warmer tells it by
+                                 default
+
+        """
         assert isinstance(warmer, CacheWarmerInterface);
 
+        if name is None:
+            name = ReflectionObject(warmer).getName();
+
+        if dependencies is None:
+            dependencies = list();
+            if hasattr(warmer, 'getDependencies'):
+                dependencies = warmer.getDependencies();
+        assert isinstance(dependencies, list);
+
+        if parallel is None:
+            parallel = False;
+            if hasattr(warmer, 'isParallelSafe'):
+                parallel = warmer.isParallelSafe();
+
         self._warmers.append(warmer);
+        self.__options.append((str(name), list(dependencies), bool(parallel)));
+
+
+    def __run(self, jobs, cacheDir):
+        """Runs the warmers, each one once the warmers it waits for ended.
+
+        @param jobs: list The warmers to run as tuples of (index, warmer,
+                          name, waited indexes, parallel)
+        @param cacheDir: string The cache directory
+
+        """
+
+        condition = threading.Condition();
+        remaining = list(jobs);
+        running = set();
+        ended = set();
+        failures = list();
+
+        def work(index, warmer, name):
+            elapsed = None;
+            failure = None;
+            try:
+                try:
+                    elapsed = self.__warmUpWarmer(warmer, cacheDir);
+                except Exception as e:
+                    failure = e;
+            finally:
+                condition.acquire();
+                try:
+                    if failure is not None:
+                        failures.append(failure);
+                    elif elapsed is not None:
+                        self.__addTiming(name, elapsed);
+                    running.remove(index);
+                    ended.add(index);
+                    condition.notify_all();
+                finally:
+                    condition.release();
+
+        condition.acquire();
+        try:
+            while remaining and not failures:
+                serial = None;
+                for job in list(remaining):
+                    index, warmer, name, waited, parallel = job;
+                    if not waited.issubset(ended):
+                        continue;
+
+                    if parallel:
+                        if len(running) < self.__maxWorkers:
+                            remaining.remove(job);
+                            running.add(index);
+                            threading.Thread(
+                                target=work, args=(index, warmer, name)
+                            ).start();
+                    elif serial is None:
+                        serial = job;
+
+                if serial is not None:
+                    index, warmer, name, waited, parallel = serial;
+                    remaining.remove(serial);
+
+                    # the shared state is only updated with the lock, as
+                    # the running warmers update it when they end
+                    elapsed = None;
+                    failure = None;
+                    condition.release();
+                    try:
+                        try:
+                            elapsed = self.__warmUpWarmer(warmer, cacheDir);
+                        except Exception as e:
+                            failure = e;
+                    finally:
+                        condition.acquire();
+
+                    if failure is not None:
+                        failures.append(failure);
+                    elif elapsed is not None:
+                        self.__addTiming(name, elapsed);
+                    ended.add(index);
+                    continue;
+
+                if not running:
+                    raise LogicException(
+                        'The cache warmers "{0}" have circular dependencies.'
+                        ''.format('", "'.join([job[2] for job in remaining]))
+                    );
+
+                condition.wait();
+
+            # the running warmers may still write into the cache directory
+            while running:
+                condition.wait();
+        finally:
+            condition.release();
+
+        if failures:
+            raise failures[0];
+
+
+    def __warmUpWarmer(self, warmer, cacheDir):
+        """Warms up the cache with a warmer.
+
+        @return: float The seconds the warmer took
+
+        """
+
+        start = time.time();
+        warmer.warmUp(cacheDir);
+
+        return time.time() - start;
+
+
+    def __addTiming(self, name, elapsed):
+
+        self.__timings[name] = self.__timings.get(name, 0) + elapsed;
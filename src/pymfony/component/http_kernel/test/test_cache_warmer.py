@@ -12,11 +12,14 @@ import unittest;
 import tempfile;
 import os;
 import shutil;
+import threading;
 
 from pymfony.component.http_kernel.cache_warmer import CacheWarmer;
 from pymfony.component.http_kernel.cache_warmer import CacheWarmerInterface;
 from pymfony.component.http_kernel.cache_warmer import CacheWarmerAggregate;
 from pymfony.component.system.exception import RuntimeException
+from pymfony.component.system.exception import LogicException;
+from pymfony.component.system.reflection import ReflectionObject;
 
 """
 """
@@ -143,6 +146,94 @@ class CacheWarmerAggregateTest(unittest.TestCase):
         aggregate.warmUp(self._cacheDir);
 
 
+    def testParallelWarmersRunAtTheSameTime(self):
+
+        started = threading.Event();
+        first = ParallelCacheWarmer(lambda: started.wait(5));
+        second = ParallelCacheWarmer(started.set);
+
+        aggregate = CacheWarmerAggregate();
+        aggregate.add(first, 'first');
+        aggregate.add(second, 'second');
+        aggregate.warmUp(self._cacheDir);
+
+        self.assertTrue(first.result, 'the first warmer waits for the second one');
+        self.assertEqual(['first', 'second'], sorted(aggregate.getTimings().keys()));
+
+
+    def testWarmersWaitForTheirDependencies(self):
+
+        calls = list();
+        first = ParallelCacheWarmer(lambda: calls.append('first'));
+        second = ParallelCacheWarmer(lambda: calls.append('second'));
+        serial = CacheWarmerInterfaceMock1();
+
+        aggregate = CacheWarmerAggregate();
+        aggregate.add(second, 'second', ['first']);
+        aggregate.add(first, 'first');
+        aggregate.add(serial, 'serial', ['second'], False);
+        aggregate.warmUp(self._cacheDir);
+
+        self.assertEqual(['first', 'second'], calls);
+        self.assertEqual(['first', 'second', 'serial'], list(aggregate.getTimings().keys()));
+
+
+    def testCircularDependencies(self):
+
+        aggregate = CacheWarmerAggregate();
+        aggregate.add(CacheWarmerInterfaceMock1(), 'foo', ['bar']);
+        aggregate.add(CacheWarmerInterfaceMock1(), 'bar', ['foo']);
+
+        self.assertRaises(LogicException, aggregate.warmUp, self._cacheDir);
+
+
+    def testUnknownDependency(self):
+
+        aggregate = CacheWarmerAggregate();
+        aggregate.add(CacheWarmerInterfaceMock1(), 'foo', ['bar']);
+
+        try:
+            aggregate.warmUp(self._cacheDir);
+            self.fail('->warmUp() throws a LogicException when a warmer depends on an unknown one');
+        except LogicException as e:
+            self.assertTrue('"bar"' in str(e));
+
+
+    def testWarmupRaisesTheFailureOnceTheWarmersEnded(self):
+
+        release = threading.Event();
+        def fail():
+            release.set();
+            raise RuntimeException('failure');
+
+        slow = ParallelCacheWarmer(lambda: release.wait(5));
+        failing = ParallelCacheWarmer(fail);
+        dependent = ParallelCacheWarmer(lambda: True);
+
+        aggregate = CacheWarmerAggregate([slow, failing]);
+        aggregate.add(dependent, 'dependent', [ReflectionObject(failing).getName()]);
+
+        self.assertRaises(RuntimeException, aggregate.warmUp, self._cacheDir);
+        self.assertTrue(slow.result);
+        self.assertTrue(dependent.result is None);
+
+
+class ParallelCacheWarmer(CacheWarmerInterface):
+    def __init__(self, callback):
+        self.callback = callback;
+        self.result = None;
+
+    def isOptional(self):
+        return False;
+
+    def isParallelSafe(self):
+        return True;
+
+    def warmUp(self, cacheDir):
+        self.result = self.callback();
+
+
+
 class CacheWarmerInterfaceMock1(CacheWarmerInterface):
     def isOptional(self):
         pass;
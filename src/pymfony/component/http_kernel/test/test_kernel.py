@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# This file is part of the pymfony package.
+#
+# (c) Alexandre Quercia <alquerci@email.com>
+#
+# For the full copyright and license information, please view the LICENSE
+# file that was distributed with this source code.
+
+from __future__ import absolute_import;
+
+import unittest;
+import sys;
+import os;
+import shutil;
+import tempfile;
+
+from pymfony.component.system.exception import StandardException;
+
+from pymfony.component.dependency.profiler import ServiceProfiler;
+
+from pymfony.component.http_kernel import Kernel;
+
+"""
+"""
+
+class KernelTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.__excepthook = sys.excepthook;
+
+
+    def tearDown(self):
+
+        sys.excepthook = self.__excepthook;
+        StandardException.setTraceEnabled(True);
+
+
+    def testShutdownRestoresTheTraces(self):
+
+        kernel = KernelForTest('prod', False);
+        self.assertFalse(StandardException.isTraceEnabled(), 'a kernel without debug disables the exception traces');
+
+        kernel.shutdown();
+        self.assertTrue(StandardException.isTraceEnabled(), '->shutdown() restores the exception traces');
+
+
+    def testTracesAreRestoredOnceAllTheKernelsAreShutDown(self):
+
+        first = KernelForTest('prod', False);
+        second = KernelForTest('prod', False);
+        debug = KernelForTest('dev', True);
+
+        first.shutdown();
+        first.shutdown();
+        self.assertFalse(StandardException.isTraceEnabled(), 'the traces stay disabled while a kernel without debug runs');
+
+        debug.shutdown();
+        self.assertFalse(StandardException.isTraceEnabled(), 'a debug kernel does not change the exception traces');
+
+        second.shutdown();
+        self.assertTrue(StandardException.isTraceEnabled(), 'the last ->shutdown() restores the exception traces');
+
+
+    def testDebugKernelKeepsTheTraces(self):
+
+        StandardException.setTraceEnabled(False);
+        KernelForTest('dev', True).shutdown();
+
+        self.assertFalse(StandardException.isTraceEnabled(), 'a debug kernel does not change the exception traces');
+
+
+    def testDumpServiceProfile(self):
+
+        kernel = KernelForTest('dev', True);
+        kernel._rootDir = tempfile.mkdtemp();
+        try:
+            kernel._dumpServiceProfile(ServiceProfiler());
+
+            prefix = kernel._getContainerClass()+'ServiceProfile';
+            self.assertEqual(
+                [prefix+'.folded', prefix+'.json'],
+                sorted(os.listdir(kernel.getLogDir())),
+                '->_dumpServiceProfile() writes the profile in the logs directory'
+            );
+        finally:
+            shutil.rmtree(kernel._rootDir);
+
+
+
+class KernelForTest(Kernel):
+
+    def registerBundles(self):
+
+        return [];
+
+
+    def registerContainerConfiguration(self, loader):
+
+        pass;
+
+
+    def getVersion(self):
+
+        return self.VERSION;
+
+
+if __name__ == '__main__':
+    unittest.main();
@@ -435,10 +435,12 @@ class SourceFileLoader(Object):
     __modules = {};
 
     @classmethod
-    def load(cls, path):
+    def load(cls, path, reload=False):
         """Load a Python source file and return a representative module.
 
         @param path: string  The path to the file
+        @param reload: Boolean Whether to import the file again even if it
+                               has already been loaded
 
         @return: module
 
@@ -454,6 +456,10 @@ class SourceFileLoader(Object):
 
         normalizePath = cls.__normalizePath(path);
 
+        if reload:
+            cls.__modules.pop(normalizePath, None);
+            cls.__badModules.pop(normalizePath, None);
+
         if normalizePath in cls.__modules:
             return cls.__modules[normalizePath];
 
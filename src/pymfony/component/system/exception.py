@@ -19,6 +19,9 @@ from pymfony.component.system.oop import final;
 class StandardException(Exception, Object):
     STACK_PATTERN = 'File "{filename}", line {lineno}, in {name}';
 
+    __traceEnabled = True;
+    __constructorCodes = dict();
+
     def __init__(self, message="", code=None, previous=None):
         """Construct the exception
 
@@ -43,29 +46,92 @@ class StandardException(Exception, Object):
         self.__string = None;
         self.__traceAsString = None;
         self.__trace = None;
+        self.__frames = None;
 
-        self.__trace = self.__createTrace();
+        if StandardException.__traceEnabled:
+            self.__frames = self.__captureFrames();
         self._message = str(message);
         self._code = int(code);
         self._previous = previous;
 
 
-    def __createTrace(self):
-        trace = [];
-        try:
-            raise Exception;
-        except Exception:
-            tb = sys.exc_info()[2];
+    @classmethod
+    def setTraceEnabled(cls, enabled):
+        """Enables or disables the stack capture of all exceptions.
+
+        When disabled, exceptions are constructed without walking the
+        stack and getTrace() returns an empty list.
+
+        @param enabled: Boolean
+        """
+        StandardException.__traceEnabled = bool(enabled);
+
+
+    @classmethod
+    def isTraceEnabled(cls):
+        """Checks if the stack capture is enabled.
+
+        @return: Boolean
+        """
+        return StandardException.__traceEnabled;
+
+
+    def __captureFrames(self):
+        """Captures the calling frames and their current line numbers.
+
+        Line numbers must be read now as they move on with the execution,
+        everything else is read from the frames on the first getTrace().
+
+        @return: list of tuples like (frame, lineno)
+        """
+        codes = self.__getConstructorCodes(type(self));
 
-        f = tb.tb_frame.f_back.f_back;
+        f = sys._getframe(1);
+        while f is not None and f.f_code in codes:
+            f = f.f_back;
 
+        frames = list();
         while f is not None:
-            localVars = f.f_locals;
-            if 'self' in localVars and isinstance(localVars['self'], self.__class__):
-                f = f.f_back;
-                continue;
+            frames.append((f, f.f_lineno));
+            f = f.f_back;
+
+        return frames;
+
+
+    @classmethod
+    def __getConstructorCodes(cls, exceptionClass):
+        """Gets the code objects of every constructor of the given class,
+        their frames are not part of the trace.
+
+        @param exceptionClass: type
+
+        @return: frozenset
+        """
+        try:
+            return cls.__constructorCodes[exceptionClass];
+        except KeyError:
+            pass;
+
+        codes = list();
+        for klass in exceptionClass.__mro__:
+            constructor = klass.__dict__.get('__init__');
+            constructor = getattr(constructor, '__func__', constructor);
+            if hasattr(constructor, '__code__'):
+                codes.append(constructor.__code__);
+
+        codes = frozenset(codes);
+        cls.__constructorCodes[exceptionClass] = codes;
+
+        return codes;
+
+
+    def __createTrace(self):
+        trace = [];
+        if not self.__frames:
+            return trace;
+
+        for f, lineno in self.__frames:
             filename = f.f_code.co_filename;
-            lineno = f.f_lineno;
             name = f.f_code.co_name;
             argcount = f.f_code.co_argcount;
             allLines = linecache.getlines(filename, f.f_globals);
@@ -91,11 +157,12 @@ class StandardException(Exception, Object):
                 'name'      : name,
                 'line'      : line,
                 'lines'     : lines, # [(int, string), ...]
-                'locals'    : localVars,
+                'locals'    : f.f_locals,
                 'argcount'  : argcount,
             };
             trace.append(stack);
-            f = f.f_back;
+
+        self.__frames = None;
 
         return trace;
 
@@ -153,7 +220,8 @@ class StandardException(Exception, Object):
         """
         if self._file:
             return self._file;
-        self._file = self.getTrace()[0]['filename'];
+        trace = self.getTrace();
+        self._file = trace[0]['filename'] if trace else None;
         return self._file;
 
     @final
@@ -164,7 +232,8 @@ class StandardException(Exception, Object):
         """
         if self._lineno:
             return self._lineno;
-        self._lineno = self.getTrace()[0]['lineno'];
+        trace = self.getTrace();
+        self._lineno = trace[0]['lineno'] if trace else None;
         return self._lineno;
 
     @final
@@ -175,7 +244,8 @@ class StandardException(Exception, Object):
         """
         if self._line:
             return self._line;
-        self._line = self.getTrace()[0]['line'];
+        trace = self.getTrace();
+        self._line = trace[0]['line'] if trace else "";
         return self._line;
 
     @final
@@ -187,16 +257,22 @@ class StandardException(Exception, Object):
         """
         if self._lines:
             return self._lines;
-        self._lines = self.getTrace()[0]['lines'];
+        trace = self.getTrace();
+        self._lines = trace[0]['lines'] if trace else list();
         return self._lines;
 
     @final
     def getTrace(self):
         """Return the stack trace as list.
 
+        The trace is built on the first call, locals are the ones of each
+        frame at that time.
+
         @return: list of tuples like
                 (filename, lineno, name, line, lines, locals, argcount)
         """
+        if self.__trace is None:
+            self.__trace = self.__createTrace();
         return self.__trace;
 
     @final
@@ -42,7 +42,39 @@ class StandardExceptionTest(unittest.TestCase):
         self.assertEqual(e.getFile(), currentFile);
 
         self.assertEqual(e.getTrace()[0]['name'], "__raiseException");
-        self.assertEqual(str(e.getTrace()[0]['locals']['e']), 'Basic exception message');
+        self.assertEqual(e.getTrace()[0]['locals']['arg2'], dict());
+
+    def testTraceIsBuiltOnFirstAccess(self):
+        e = StandardException("message");
+
+        self.assertTrue(e.getTrace() is e.getTrace());
+        self.assertEqual(e.getTrace()[0]['name'], "testTraceIsBuiltOnFirstAccess");
+
+    def testLocalsAreReadOnFirstAccess(self):
+        value = "before";
+        e = StandardException("message");
+        value = "after";
+
+        self.assertEqual(e.getTrace()[0]['locals']['value'], value);
+
+    def testConstructorFramesAreNotPartOfTheTrace(self):
+        e = CustomException();
+
+        self.assertEqual(e.getTrace()[0]['name'], "testConstructorFramesAreNotPartOfTheTrace");
+
+    def testTraceDisabled(self):
+        StandardException.setTraceEnabled(False);
+        try:
+            e = self.__raiseException();
+        finally:
+            StandardException.setTraceEnabled(True);
+
+        self.assertEqual(e.getTrace(), []);
+        self.assertEqual(e.getTraceAsString(), "");
+        self.assertEqual(e.getLineno(), None);
+        self.assertEqual(e.getFile(), None);
+        self.assertEqual(e.getMessage(), "Standard exception message");
+        str(e);
 
 
     def testFormatStack(self):
@@ -63,5 +95,9 @@ class StandardExceptionTest(unittest.TestCase):
     def testToString(self):
         str(self.__e);
 
+class CustomException(StandardException):
+    def __init__(self):
+        StandardException.__init__(self, "custom exception message");
+
 if __name__ == "__main__":
     unittest.main();
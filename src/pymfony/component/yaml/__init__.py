@@ -29,6 +29,52 @@ from pymfony.component.yaml.exception import DumpException;
 """
 """
 
+# Patterns are compiled once here, the parser runs them on every line.
+_REGEX_QUOTED_STRING = '(?:"([^"\\\\]*(?:\\\\.[^"\\\\]*)*)"|\'([^\']*(?:\'\'[^\']*)*)\')';
+
+_SEQUENCE_ITEM = re.compile('^\-((?P<leadspaces>\s+)(?P<value>.+?))?\s*$', re.U);
+_MAPPING_ITEM = re.compile('^(?P<key>'+_REGEX_QUOTED_STRING+'|[^ \'"\[\{].*?) *\:(\s+(?P<value>.+?))?\s*$', re.U);
+_REFERENCE = re.compile('^&(?P<ref>[^ ]+) *(?P<value>.*)', re.U);
+_BLOCK_SCALAR_HEADER = re.compile('^(?P<separator>\||>)(?P<modifiers>\+|\-|\d+|\+\d+|\-\d+|\d+\+|\d+\-)?(?P<comments> +#.*)?$');
+_DIGITS = re.compile('\d+');
+_LEADING_SPACES = re.compile('^ +');
+_TRAILING_NEWLINES = re.compile('(\n*)$');
+_SINGLE_NEWLINE = re.compile('(?<!\n)\n(?!\n)');
+_END_NEWLINES = re.compile('\n+$', re.DOTALL);
+_YAML_HEADER = re.compile('^\%YAML[: ][\d\.]+.*\n', re.S | re.U);
+_LEADING_COMMENTS = re.compile('^(\#.*?\n)+', re.S);
+_DOCUMENT_START = re.compile('^\-\-\-.*?\n', re.S);
+_DOCUMENT_END = re.compile('\.\.\.\s*$', re.S);
+
+_TRAILING_COMMENT = re.compile('^\s+#.*$');
+_QUOTED_STRING = re.compile(_REGEX_QUOTED_STRING, re.U);
+_WHITESPACE = re.compile('\s');
+_NUMBER_WITH_COMMAS = re.compile('^(-|\+)?[0-9,]+(\.[0-9]+)?$');
+_INF = re.compile('INF', re.I);
+# @see http://www.yaml.org/spec/1.2/spec.html#id2761573
+_TIMESTAMP = re.compile("""
+        ^
+        (?P<year>[0-9][0-9][0-9][0-9])
+        -(?P<month>[0-9][0-9]?)
+        -(?P<day>[0-9][0-9]?)
+        (?:(?:[Tt]|[ t]+)
+        (?P<hour>[0-9][0-9]?)
+        :(?P<minute>[0-9][0-9])
+        :(?P<second>[0-9][0-9])
+        (?:\.(?P<fraction>[0-9]*))?
+        (?:[ t]*(?P<tz>Z|(?P<tz_sign>[-+])(?P<tz_hour>[0-9][0-9]?)
+        (?::(?P<tz_minute>[0-9][0-9]))?))?)?
+        $
+""", re.X);
+
+# plain scalars starting with one of these characters can only be a string,
+# a null or a boolean
+_STRING_FIRST_CHARACTERS = frozenset(
+    'abcdefghklmopqrstuvwxyzABCDEFGHKLMOPQRSTUVWXYZ"\'%@$/\\'
+);
+# patterns matching a plain scalar up to one of the delimiters, by delimiters
+_DELIMITED_SCALARS = dict();
+
 class Parser(Object):
     """Parser parses YAML strings to convert them to PHP arrays.
 
@@ -44,7 +90,11 @@ class Parser(Object):
         """
 
         self.__offset         = 0;
-        self.__lines          = list();
+        self.__source         = None;
+        self.__heads          = ();
+        self.__start          = 0;
+        self.__count          = 0;
+        self.__indent         = 0;
         self.__currentLineNb  = -1;
         self.__currentLine    = '';
         self.__refs           = dict();
@@ -82,7 +132,7 @@ class Parser(Object):
         """
         self.__currentLineNb = -1;
         self.__currentLine = '';
-        self.__lines = self.__cleanup(value).split("\n");
+        self.__setLines(_Lines(self.__cleanup(value).split("\n")));
 
         if not self.__mb_detect_encoding(value, ['UTF-8']) :
             raise ParseException('The YAML value does not appear to be valid UTF-8.');
@@ -92,7 +142,44 @@ class Parser(Object):
 #            mbEncoding = mb_internal_encoding();
 #            mb_internal_encoding('UTF-8');
 
+        return self.__doParse(exceptionOnInvalidType, objectSupport);
+
+
+    def __parseBlock(self, block, exceptionOnInvalidType, objectSupport):
+        """Parses an embed block of YAML.
 
+        The block is a view on the lines of the parent document, so it is
+        neither copied, nor joined, cleaned up and split again.
+
+        @param: tuple   block                  The block, see __getNextEmbedBlock()
+        @param Boolean exceptionOnInvalidType True if an exception must be thrown on invalid types (a PHP resource or object), False otherwise:
+        @param Boolean objectSupport          True if object support is enabled, False otherwise:
+
+        @return mixed  A PHP value
+
+        @raise ParseException If the YAML is not valid
+
+        """
+        self.__currentLineNb = -1;
+        self.__currentLine = '';
+        heads, source, start, count, indent = block;
+        self.__setLines(source, heads, start, count, indent);
+        self.__cleanupLines();
+
+        return self.__doParse(exceptionOnInvalidType, objectSupport);
+
+
+    def __doParse(self, exceptionOnInvalidType, objectSupport):
+        """Parses the lines of the parser.
+
+        @param Boolean exceptionOnInvalidType True if an exception must be thrown on invalid types (a PHP resource or object), False otherwise:
+        @param Boolean objectSupport          True if object support is enabled, False otherwise:
+
+        @return mixed  A PHP value
+
+        @raise ParseException If the YAML is not valid
+
+        """
         context = None;
         data = None;
         while (self.__moveToNextLine()):
@@ -106,7 +193,7 @@ class Parser(Object):
 
 
             isRef = isInPlace = isProcessed = False;
-            match = re.search('^\-((?P<leadspaces>\s+)(?P<value>.+?))?\s*$', self.__currentLine, flags=re.U);
+            match = _SEQUENCE_ITEM.search(self.__currentLine);
 
             if match :
                 values = {
@@ -123,7 +210,7 @@ class Parser(Object):
                     data = list();
 
                 if values['value']:
-                    matches = re.search('^&(?P<ref>[^ ]+) *(?P<value>.*)', values['value'], re.U);
+                    matches = _REFERENCE.search(values['value']);
                     if matches:
                         isRef = matches.group('ref');
                         values['value'] = matches.group('value');
@@ -134,32 +221,33 @@ class Parser(Object):
                     c = self.__getRealCurrentLineNb() + 1;
                     parser = Parser(c);
                     parser.__refs = self.__refs;
-                    data.append(parser.parse(self.__getNextEmbedBlock(), exceptionOnInvalidType, objectSupport));
+                    data.append(parser.__parseBlock(self.__getNextEmbedBlock(), exceptionOnInvalidType, objectSupport));
                 else :
                     if (values['leadspaces']
                         and ' ' == values['leadspaces']
-                        and re.search('^(?P<key>'+Inline.REGEX_QUOTED_STRING+'|[^ \'"\{\[].*?) *\:(\s+(?P<value>.+?))?\s*$', values['value'], re.U)
+                        and _MAPPING_ITEM.search(values['value'])
                     ):
                         # this is a compact notation element, add to next block and parse
                         c = self.__getRealCurrentLineNb();
                         parser = Parser(c);
                         parser.__refs = self.__refs;
 
-                        block = values['value'];
+                        block = ((values['value'],), self.__source.getCompact(), 0, 0, 0);
                         if ( not self.__isNextLineIndented()) :
-                            block += "\n"+self.__getNextEmbedBlock(self.__getCurrentLineIndentation() + 2);
+                            heads, lines, start, count, indent = self.__getNextEmbedBlock(self.__getCurrentLineIndentation() + 2);
+                            block = ((values['value'],) + heads, lines, start, count, indent);
 
 
-                        data.append(parser.parse(block, exceptionOnInvalidType, objectSupport));
+                        data.append(parser.__parseBlock(block, exceptionOnInvalidType, objectSupport));
                     else :
                         data.append(self.__parseValue(values['value'], exceptionOnInvalidType, objectSupport));
 
 
-            elif (re.search('^(?P<key>'+Inline.REGEX_QUOTED_STRING+'|[^ \'"\[\{].*?) *\:(\s+(?P<value>.+?))?\s*$', self.__currentLine, re.U)) :
+            elif (_MAPPING_ITEM.search(self.__currentLine)) :
                 if (context and 'sequence' == context) :
                     raise ParseException('You cannot define a mapping item when in a sequence');
 
-                values = re.search('^(?P<key>'+Inline.REGEX_QUOTED_STRING+'|[^ \'"\[\{].*?) *\:(\s+(?P<value>.+?))?\s*$', self.__currentLine, re.U);
+                values = _MAPPING_ITEM.search(self.__currentLine);
                 values = {
                     0: values.group(0),
                     'key': values.group('key'),
@@ -193,14 +281,14 @@ class Parser(Object):
 
                     else :
                         if values['value']:
-                            value = values['value'];
+                            value = ((values['value'],), self.__source.getCompact(), 0, 0, 0);
                         else :
                             value = self.__getNextEmbedBlock();
 
                         c = self.__getRealCurrentLineNb() + 1;
                         parser = Parser(c);
                         parser.__refs = self.__refs;
-                        parsed = parser.parse(value, exceptionOnInvalidType, objectSupport);
+                        parsed = parser.__parseBlock(value, exceptionOnInvalidType, objectSupport);
 
                         merged = OrderedDict();
                         if not isinstance(parsed, (dict, list)) :
@@ -231,7 +319,7 @@ class Parser(Object):
                         isProcessed = merged;
 
                 elif values['value'] :
-                    matches = re.search('^&(?P<ref>[^ ]+) *(?P<value>.*)', values['value'], re.U);
+                    matches = _REFERENCE.search(values['value']);
                     if matches:
                         isRef = matches.group('ref');
                         values['value'] = matches.group('value');
@@ -249,7 +337,7 @@ class Parser(Object):
                         c = self.__getRealCurrentLineNb() + 1;
                         parser = Parser(c);
                         parser.__refs = self.__refs;
-                        data[key] = parser.parse(self.__getNextEmbedBlock(), exceptionOnInvalidType, objectSupport);
+                        data[key] = parser.__parseBlock(self.__getNextEmbedBlock(), exceptionOnInvalidType, objectSupport);
 
                 else :
                     if (isInPlace) :
@@ -260,10 +348,10 @@ class Parser(Object):
 
             else :
                 # 1-liner optionally followed by newline
-                lineCount = len(self.__lines);
-                if 1 == lineCount or (2 == lineCount and not self.__lines[1]) :
+                lineCount = self.__count;
+                if 1 == lineCount or (2 == lineCount and not self.__getLine(1)) :
                     try:
-                        value = Inline.parse(self.__lines[0], exceptionOnInvalidType, objectSupport);
+                        value = Inline.parse(self.__getLine(0), exceptionOnInvalidType, objectSupport);
                     except ParseException as e:
                         e.setParsedLine(self.__getRealCurrentLineNb() + 1);
                         e.setSnippet(self.__currentLine);
@@ -322,9 +410,15 @@ class Parser(Object):
     def __getNextEmbedBlock(self, indentation = None):
         """Returns the next embed block of YAML.
 
+        The block is not copied: its first lines that are not lines of the
+        document are given apart, followed by a range of the lines of the
+        document without the comment ones and the indentation to remove
+        from them. The lines are scanned with the indentation computed once
+        per document, so each nesting level does not slice them again.
+
         @param: integer indentation The indent level at which the block is to be read, or None for default
 
-        @return string A YAML string
+        @return tuple The block as (heads, lines, start, count, indentation)
 
         @raise ParseException When indentation problem are detected
 
@@ -344,43 +438,90 @@ class Parser(Object):
             newIndent = indentation;
 
 
-        data = [self.__currentLine[newIndent:]];
-
-        isItUnindentedCollection = self.__isStringUnIndentedCollectionItem();
-
-        while (self.__moveToNextLine()):
-
-            if (isItUnindentedCollection and  not self.__isStringUnIndentedCollectionItem()) :
-                self.__moveToPreviousLine();
-                break;
+        source = self.__source;
+        compact = source.getCompact();
+        heads = list();
+        start = None;
+        count = 0;
 
+        first = self.__currentLineNb;
+        i = self.__getSourceIndex(first);
+        if None is i or source.isComment(i):
+            heads.append(self.__currentLine[newIndent:]);
+        else:
+            start = source.getCompactIndex(i);
+            count = 1;
 
-            if (self.__isCurrentLineEmpty()) :
-                if (self.__isCurrentLineBlank()) :
-                    data.append(self.__currentLine[newIndent:]);
+        isItUnindentedCollection = self.__isStringUnIndentedCollectionItem();
 
+        lines = source.lines;
+        indents = source.indents;
+        blanks = source.blanks;
+        comments = source.comments;
+        headCount = len(self.__heads);
+        shift = self.__start - headCount;
+        base = self.__indent;
+        target = base + newIndent;
+        last = self.__count - 1;
+        n = first;
+        while n < last:
+            n += 1;
+
+            i = n + shift;
+            if (n >= headCount and not isItUnindentedCollection
+                and indents[i] >= target and (None is comments or not comments[i])
+            ):
+                # the most common line, part of the block
+                if None is start:
+                    start = source.getCompactIndex(i);
+                count += 1;
 
                 continue;
 
+            if n >= headCount and (blanks[i] or indents[i] >= base):
+                blank = blanks[i];
+                empty = blank or (None is not comments and comments[i]);
+                indent = indents[i] - base;
+                unindented = lines[i].startswith('- ', base);
+            else:
+                # a line given apart or less indented than the block
+                self.__currentLineNb = n;
+                self.__currentLine = self.__getLine(n);
+                blank = self.__isCurrentLineBlank();
+                empty = self.__isCurrentLineEmpty();
+                indent = self.__getCurrentLineIndentation();
+                unindented = self.__isStringUnIndentedCollectionItem();
+
+            if (isItUnindentedCollection and  not unindented) :
+                n -= 1;
+                break;
 
-            indent = self.__getCurrentLineIndentation();
 
-            match = re.search('^(?P<text> *)$', self.__currentLine);
-            if match :
-                # empty line
-                data.append(match.group('text'));
+            if empty :
+                if not blank :
+                    continue;
             elif (indent >= newIndent) :
-                data.append(self.__currentLine[newIndent:]);
+                pass;
             elif (0 == indent) :
-                self.__moveToPreviousLine();
+                n -= 1;
 
                 break;
             else :
+                self.__currentLineNb = n;
+                self.__currentLine = self.__getLine(n);
                 raise ParseException('Indentation problem.', self.__getRealCurrentLineNb() + 1, self.__currentLine);
 
+            if n < headCount:
+                heads.append(self.__getLine(n)[newIndent:]);
+            else:
+                if None is start:
+                    start = source.getCompactIndex(i);
+                count += 1;
 
+        self.__currentLineNb = n;
+        self.__currentLine = self.__getLine(n);
 
-        return "\n".join(data);
+        return (tuple(heads), compact, start or 0, count, base + newIndent);
 
 
     def __moveToNextLine(self):
@@ -390,12 +531,18 @@ class Parser(Object):
 
         """
 
-        if (self.__currentLineNb >= len(self.__lines) - 1) :
+        if (self.__currentLineNb >= self.__count - 1) :
             return False;
 
         self.__currentLineNb += 1;
 
-        self.__currentLine = self.__lines[self.__currentLineNb];
+        n = self.__currentLineNb - len(self.__heads);
+        if n < 0:
+            self.__currentLine = self.__heads[n];
+        elif self.__indent:
+            self.__currentLine = self.__source.lines[n + self.__start][self.__indent:];
+        else:
+            self.__currentLine = self.__source.lines[n + self.__start];
 
         return True;
 
@@ -407,7 +554,62 @@ class Parser(Object):
 
         self.__currentLineNb -= 1;
 
-        self.__currentLine = self.__lines[self.__currentLineNb];
+        self.__currentLine = self.__getLine(self.__currentLineNb);
+
+
+    def __setLines(self, source, heads = (), start = 0, count = None, indent = 0):
+        """Sets the lines to parse.
+
+        @param: _Lines  source The lines of the document
+        @param tuple   heads  The first lines, given apart from the document
+        @param integer start  The index of the first line of the document
+        @param integer count  The number of lines of the document, all by default
+        @param integer indent The indentation to remove from the lines of the document
+
+        """
+
+        if None is count:
+            count = len(source.lines) - start;
+
+        self.__source = source;
+        self.__heads = heads;
+        self.__start = start;
+        self.__count = len(heads) + count;
+        self.__indent = indent;
+
+
+    def __getLine(self, n):
+        """Returns a line to parse.
+
+        @param: integer n The number of the line
+
+        @return string The line
+
+        """
+
+        if n < len(self.__heads):
+            return self.__heads[n];
+
+        line = self.__source.lines[n - len(self.__heads) + self.__start];
+        if self.__indent:
+            return line[self.__indent:];
+
+        return line;
+
+
+    def __getSourceIndex(self, n):
+        """Returns the index of a line in the lines of the document.
+
+        @param: integer n The number of the line
+
+        @return integer|None The index or None for a line given apart
+
+        """
+
+        if n < len(self.__heads):
+            return None;
+
+        return n - len(self.__heads) + self.__start;
 
 
     def __parseValue(self, value, exceptionOnInvalidType, objectSupport):
@@ -438,11 +640,11 @@ class Parser(Object):
 
             return self.__refs[value];
 
-        matches = re.search('^(?P<separator>\||>)(?P<modifiers>\+|\-|\d+|\+\d+|\-\d+|\d+\+|\d+\-)?(?P<comments> +#.*)?$', value);
+        matches = _BLOCK_SCALAR_HEADER.search(value);
         if (matches) :
             modifiers = matches.group('modifiers') if matches.group('modifiers') else '';
 
-            return self.__parseFoldedScalar(matches.group('separator'), re.sub('\d+', '', modifiers), abs(Convert.str2int(modifiers)));
+            return self.__parseFoldedScalar(matches.group('separator'), _DIGITS.sub('', modifiers), abs(Convert.str2int(modifiers)));
 
 
         try:
@@ -473,28 +675,23 @@ class Parser(Object):
 
         # determine indentation if not specified
         if 0 == indentation :
-            matches = re.search('^ +', self.__currentLine);
+            matches = _LEADING_SPACES.search(self.__currentLine);
             if matches:
                 indentation = len(matches.group(0));
 
         text = '';
         if indentation > 0:
-            pattern = '^ {%d}(.*)$' % (indentation);
+            prefix = ' ' * indentation;
 
             isCurrentLineBlank = self.__isCurrentLineBlank();
-            matches = re.search(pattern, self.__currentLine);
-            while notEOF and (isCurrentLineBlank or matches) :
-                if isCurrentLineBlank:
-                    text += self.__currentLine[indentation:];
-                else:
-                    text += matches.group(1);
+            while notEOF and (isCurrentLineBlank or self.__currentLine.startswith(prefix)) :
+                text += self.__currentLine[indentation:];
 
                 # newline only if not EOF
                 notEOF = self.__moveToNextLine();
                 if notEOF:
                     text += "\n";
                     isCurrentLineBlank = self.__isCurrentLineBlank();
-                    matches = re.search(pattern, self.__currentLine);
 
         elif notEOF:
             text += "\n";
@@ -504,15 +701,15 @@ class Parser(Object):
 
         # replace all non-trailing single newlines with spaces in folded blocks
         if '>' == separator:
-            matches = re.search('(\n*)$', text);
-            text = re.sub('(?<!\n)\n(?!\n)', ' ', text.rstrip("\n"));
+            matches = _TRAILING_NEWLINES.search(text);
+            text = _SINGLE_NEWLINE.sub(' ', text.rstrip("\n"));
             text += matches.group(1);
 
         # deal with trailing newlines as indicated
         if '' == indicator:
-            text = re.compile('\n+$', re.DOTALL).sub("\n", text);
+            text = _END_NEWLINES.sub("\n", text);
         elif '-' == indicator:
-            text = re.compile('\n+$', re.DOTALL).sub("", text);
+            text = _END_NEWLINES.sub("", text);
 
         return text;
 
@@ -595,14 +792,12 @@ class Parser(Object):
         def callback(match):
             count.add(1);
             return '';
-        pattern = re.compile('^\%YAML[: ][\d\.]+.*\n', re.S | re.U);
-        value = pattern.sub(callback, value);
+        value = _YAML_HEADER.sub(callback, value);
         self.__offset += count.get();
 
         # remove leading comments
         count.set(0);
-        pattern = re.compile('^(\#.*?\n)+', re.S);
-        stripmedValue = pattern.sub(callback, value);
+        stripmedValue = _LEADING_COMMENTS.sub(callback, value);
         if (count.get() == 1) :
             # items have been removed, update the offset
             self.__offset += value.count("\n") - stripmedValue.count("\n");
@@ -611,21 +806,56 @@ class Parser(Object):
 
         # remove start of the document marker (---)
         count.set(0);
-        pattern = re.compile('^\-\-\-.*?\n', re.S);
-        stripmedValue = pattern.sub(callback, value);
+        stripmedValue = _DOCUMENT_START.sub(callback, value);
         if (count.get() == 1) :
             # items have been removed, update the offset
             self.__offset += value.count("\n") - stripmedValue.count("\n");
             value = stripmedValue;
 
             # remove end of the document marker (...)
-            pattern = re.compile('\.\.\.\s*$', re.S);
-            value = pattern.sub('', value);
+            value = _DOCUMENT_END.sub('', value);
 
 
         return value;
 
 
+    def __cleanupLines(self):
+        """Cleanups the lines of an embed block to be parsed, as __cleanup()
+        would do with the block joined.
+
+        """
+
+        if not self.__count:
+            return;
+
+        # leading comments, except the last line that has no newline
+        line = self.__getLine(0);
+        start = 0;
+        while start < self.__count - 1 and line.startswith('#'):
+            start += 1;
+            line = self.__getLine(start);
+
+        # a YAML header or a start of document marker are rare enough
+        # to fall back to the string cleanup
+        if line.startswith('---') or self.__getLine(0).startswith('%YAML'):
+            lines = [self.__getLine(n) for n in range(self.__count)];
+            self.__setLines(_Lines(self.__cleanup("\n".join(lines)).split("\n")));
+
+            return;
+
+        if start:
+            self.__offset += start;
+            heads = self.__heads[start:];
+            skipped = max(start - len(self.__heads), 0);
+            self.__setLines(
+                self.__source,
+                heads,
+                self.__start + skipped,
+                self.__count - len(self.__heads) - skipped,
+                self.__indent
+            );
+
+
     def __isNextLineUnIndentedCollection(self):
         """Returns True if the next line starts unindented collection:
 
@@ -672,7 +902,7 @@ class Inline(Object):
 
     """
 
-    REGEX_QUOTED_STRING = '(?:"([^"\\\\]*(?:\\\\.[^"\\\\]*)*)"|\'([^\']*(?:\'\'[^\']*)*)\')';
+    REGEX_QUOTED_STRING = _REGEX_QUOTED_STRING;
 
     __exceptionOnInvalidType = False;
     __objectSupport = False;
@@ -703,20 +933,19 @@ class Inline(Object):
             return '';
 
 
-        i = _Ref(0);
         if value[0] == '[':
-            result = cls.__parseSequence(value, i);
-            i.add(1);
+            result, i = cls.__parseSequence(value, 0);
+            i += 1;
         elif value[0] == '{':
-            result = cls.__parseMapping(value, i);
-            i.add(1);
+            result, i = cls.__parseMapping(value, 0);
+            i += 1;
         else:
-            result = cls.parseScalar(value, None, ['"', "'"], i);
+            result, i = cls.__scanScalar(value, None, ['"', "'"], 0, True);
 
         # some comments are allowed at the end
-        if re.sub('^\s+#.*$', '', value[i.get():]) :
+        if _TRAILING_COMMENT.sub('', value[i:]) :
             raise ParseException('Unexpected characters near "{0}".'.format(
-                value[i.get():]
+                value[i:]
             ));
 
         return result;
@@ -746,7 +975,7 @@ class Inline(Object):
         if str(value).isdigit():
             return "'"+value+"'" if isinstance(value, String) else str(int(value));
         if cls.__is_numeric(value):
-            return "'"+value+"'" if isinstance(value, String) else re.compile('INF', re.I).sub('.Inf', str(value)) if math.isinf(value) else str(value);
+            return "'"+value+"'" if isinstance(value, String) else _INF.sub('.Inf', str(value)) if math.isinf(value) else str(value);
         if not isinstance(value, String):
             if (objectSupport) :
                 return '!!python/object:'+serialize(value);
@@ -761,7 +990,7 @@ class Inline(Object):
             return Escaper.escapeWithSingleQuotes(value);
         if '' == value:
             return "''";
-        if (cls.__getTimestampRegex().search(value)
+        if (_TIMESTAMP.search(value)
             or value.lower() in ['null', '~', 'true', 'false']):
             return "'"+value+"'";
         if isinstance(value, String):
@@ -819,118 +1048,159 @@ class Inline(Object):
             i = _Ref(0);
         assert isinstance(i, _Ref);
 
-        if scalar[i.get()] in stringDelimiters :
+        output, position = cls.__scanScalar(scalar, delimiters, stringDelimiters, i.get(), evaluate);
+        i.set(position);
+
+        return output;
+
+    @classmethod
+    def __scanScalar(cls, scalar, delimiters, stringDelimiters, i, evaluate):
+        """Scans the scalar starting at a position of a string.
+
+        The string is never sliced before matching, so flow collections are
+        scanned in place.
+
+        @param: string  scalar
+        @param list    delimiters
+        @param list    stringDelimiters
+        @param integer i                The position of the scalar
+        @param Boolean evaluate
+
+        @return tuple The scalar and the position right after it
+
+        @raise ParseException When malformed inline YAML string is parsed
+
+        """
+
+        if scalar[i] in stringDelimiters :
             # quoted scalar
-            output = cls.__parseQuotedScalar(scalar, i);
+            output, i = cls.__parseQuotedScalar(scalar, i);
 
             if (None is not delimiters) :
-                tmp = scalar[i.get():].lstrip(' ');
-                if tmp[0] not in delimiters :
+                length = len(scalar);
+                j = i;
+                while j < length and ' ' == scalar[j]:
+                    j += 1;
+                if j == length or scalar[j] not in delimiters :
                     raise ParseException('Unexpected characters ({0}).'.format(
-                        scalar[i.get():]
+                        scalar[i:]
                     ));
 
 
         else :
             # "normal" string
             if not delimiters :
-                output = scalar[i.get():];
-                i.add(len(output));
+                output = scalar[i:];
+                i += len(output);
 
                 # remove comments
                 strpos = output.find(' #');
                 if strpos != -1 :
                     output = output[0:strpos].rstrip();
 
-            elif (re.search('^(.+?)('+'|'.join(delimiters)+')', scalar[i.get():])) :
-                match = re.search('^(.+?)('+'|'.join(delimiters)+')', scalar[i.get():])
-                output = match.group(1);
-                i.add(len(output));
             else :
-                raise ParseException(
-                    'Malformed inline YAML string ({0}).'.format(scalar)
-                );
+                match = cls.__getDelimitedScalarPattern(delimiters).match(scalar, i);
+                if not match :
+                    raise ParseException(
+                        'Malformed inline YAML string ({0}).'.format(scalar)
+                    );
+
+                output = match.group(1);
+                i += len(output);
 
 
             output = cls.__evaluateScalar(output) if evaluate else output;
 
 
-        return output;
+        return output, i;
+
+    @classmethod
+    def __getDelimitedScalarPattern(cls, delimiters):
+        """Gets the pattern matching a plain scalar up to one of the delimiters.
+
+        @param: list delimiters
+
+        @return: SRE_Pattern
+
+        """
+
+        key = tuple(delimiters);
+        if key not in _DELIMITED_SCALARS:
+            _DELIMITED_SCALARS[key] = re.compile('(.+?)('+'|'.join(delimiters)+')');
+
+        return _DELIMITED_SCALARS[key];
 
     @classmethod
     def __parseQuotedScalar(cls, scalar, i):
         """Parses a quoted scalar to YAML.
 
         @param: string scalar
-        @param integer &i
+        @param integer i
 
-        @return string A YAML string
+        @return tuple The unquoted string and the position right after it
 
         @raise ParseException When malformed inline YAML string is parsed
 
         """
-        assert isinstance(i, _Ref);
 
-        match = re.search('^'+cls.REGEX_QUOTED_STRING, scalar[i.get():], flags=re.U);
+        match = _QUOTED_STRING.match(scalar, i);
         if not match :
             raise ParseException(
                 'Malformed inline YAML string ({0}).'.format(
-                scalar[i.get():]
+                scalar[i:]
             ));
 
 
-        output = match.group(0)[1: 1 + len(match.group(0)) - 2];
+        output = match.group(0)[1:-1];
 
         unescaper = Unescaper();
-        if ('"' == scalar[i.get()]) :
+        if ('"' == scalar[i]) :
             output = unescaper.unescapeDoubleQuotedString(output);
         else :
             output = unescaper.unescapeSingleQuotedString(output);
 
 
-        i.add(len(match.group(0)));
-
-        return output;
+        return output, match.end();
 
     @classmethod
-    def __parseSequence(cls, sequence, i = None):
+    def __parseSequence(cls, sequence, i):
         """Parses a sequence to a YAML string.
 
         @param: string sequence
-        @param integer i
+        @param integer i        The position of the opening bracket
 
-        @return string A YAML string
+        @return tuple The sequence and the position of its closing bracket
 
         @raise ParseException When malformed inline YAML string is parsed
 
         """
-        if i is None:
-            i = _Ref(0);
-        assert isinstance(i, _Ref);
 
         output = list();
         lenght = len(sequence);
-        i.add(1);
+        i += 1;
 
         # [foo, bar, ...]
-        while (i.get() < lenght):
-            if sequence[i.get()] == '[':
-                output.append(cls.__parseSequence(sequence, i));
-            elif sequence[i.get()] == '{':
+        while (i < lenght):
+            char = sequence[i];
+            if char == '[':
+                value, i = cls.__parseSequence(sequence, i);
+                output.append(value);
+            elif char == '{':
                 # nested mapping
-                output.append(cls.__parseMapping(sequence, i));
-            elif sequence[i.get()] == ']':
-                return output;
-            elif sequence[i.get()] in [',', ' ']:
+                value, i = cls.__parseMapping(sequence, i);
+                output.append(value);
+            elif char == ']':
+                return output, i;
+            elif char == ',' or char == ' ':
                 pass;
             else:
-                isQuoted = sequence[i.get()] in ['"', "'"];
-                value = cls.parseScalar(sequence, [',', ']'], ['"', "'"], i);
+                isQuoted = char == '"' or char == "'";
+                value, i = cls.__scanScalar(sequence, [',', ']'], ['"', "'"], i, True);
 
                 if not isQuoted and isinstance(value, String) and ': ' in value :
                     # embedded mapping?
                     try:
-                        value = cls.__parseMapping('{'+value+'}');
+                        value = cls.__parseMapping('{'+value+'}', 0)[0];
                     except InvalidArgumentException as e:
                         # no, it's not
                         pass;
@@ -939,10 +1209,10 @@ class Inline(Object):
 
                 output.append(value);
 
-                i.sub(1);
+                i -= 1;
 
 
-            i.add(1);
+            i += 1;
 
 
         raise ParseException('Malformed inline YAML string {0}'.format(
@@ -950,58 +1220,51 @@ class Inline(Object):
         ));
 
     @classmethod
-    def __parseMapping(cls, mapping, i = None):
+    def __parseMapping(cls, mapping, i):
         """Parses a mapping to a YAML string.
 
         @param: string mapping
-        @param integer i
+        @param integer i       The position of the opening brace
 
-        @return string A YAML string
+        @return tuple The mapping and the position of its closing brace
 
         @raise ParseException When malformed inline YAML string is parsed
 
         """
-        if i is None:
-            i = _Ref(0);
-        assert isinstance(i, _Ref);
 
         output = OrderedDict();
         lenght = len(mapping);
-        i.add(1);
+        i += 1;
 
         # foo: bar, bar:foo, ...
-        while (i.get() < lenght):
-            if mapping[i.get()] in [' ', ',']:
-                i.add(1);
+        while (i < lenght):
+            char = mapping[i];
+            if char == ' ' or char == ',':
+                i += 1;
                 continue;
-            elif mapping[i.get()] == '}':
-                return output;
+            elif char == '}':
+                return output, i;
 
             # key
-            key = cls.parseScalar(mapping, [':', ' '], ['"', "'"], i, False);
+            key, i = cls.__scanScalar(mapping, [':', ' '], ['"', "'"], i, False);
 
             # value
-            done = False;
-            while (i.get() < lenght):
-                if mapping[i.get()] == '[':
+            while (i < lenght):
+                char = mapping[i];
+                if char == '[':
                     # nested sequence
-                    output[key] = cls.__parseSequence(mapping, i);
-                    done = True;
-                elif mapping[i.get()] == '{':
+                    output[key], i = cls.__parseSequence(mapping, i);
+                    i += 1;
+                    break;
+                elif char == '{':
                     # nested mapping
-                    output[key] = cls.__parseMapping(mapping, i);
-                    done = True;
-                elif mapping[i.get()] in [':', ' ']:
-                    pass;
+                    output[key], i = cls.__parseMapping(mapping, i);
+                    i += 1;
+                    break;
+                elif char == ':' or char == ' ':
+                    i += 1;
                 else:
-                    output[key] = cls.parseScalar(mapping, [',', '}'], ['"', "'"], i);
-                    done = True;
-                    i.sub(1);
-
-
-                i.add(1);
-
-                if (done) :
+                    output[key], i = cls.__scanScalar(mapping, [',', '}'], ['"', "'"], i, True);
                     break;
 
 
@@ -1016,6 +1279,9 @@ class Inline(Object):
     def __evaluateScalar(cls, scalar):
         """Evaluates scalars and replaces magic values.
 
+        The first character settles most scalars, the numeric checks only
+        run for the ones that may be a number.
+
         @param: string scalar
 
         @return string A YAML string
@@ -1024,50 +1290,59 @@ class Inline(Object):
 
         scalar = scalar.strip();
 
-        if ('null' == scalar.lower() or
-            '' == scalar or
-            '~' == scalar):
+        if not scalar:
             return None;
-        if scalar.startswith('!str'):
-            return scalar[5:];
-        if scalar.startswith('! '):
-            return Convert.str2int(cls.parseScalar(scalar[2:]));
-        if scalar.startswith('!!python/object:'):
-            if (cls.__objectSupport) :
-                return unserialize(scalar[16:]);
-
 
-            if cls.__exceptionOnInvalidType :
-                raise ParseException(
-                    'Object support when parsing a YAML file has been '
-                    'disabled.'
-                );
-
-            return None;
-        if scalar.isdigit():
-            raw = scalar;
+        first = scalar[0];
+        if first in _STRING_FIRST_CHARACTERS:
+            if first in 'tTfF':
+                lower = scalar.lower();
+                if 'true' == lower:
+                    return True;
+                if 'false' == lower:
+                    return False;
+
+            return str(scalar);
+
+        if '!' == first:
+            if scalar.startswith('!str'):
+                return scalar[5:];
+            if scalar.startswith('! '):
+                return Convert.str2int(cls.parseScalar(scalar[2:]));
+            if scalar.startswith('!!python/object:'):
+                if (cls.__objectSupport) :
+                    return unserialize(scalar[16:]);
+
+
+                if cls.__exceptionOnInvalidType :
+                    raise ParseException(
+                        'Object support when parsing a YAML file has been '
+                        'disabled.'
+                    );
+
+                return None;
+        elif '-' == first:
+            if scalar[1:].isdigit():
+                cast = int(scalar);
+
+                return int(scalar, 8) if '0' == scalar[1] else cast if scalar == str(cast) else scalar;
+        elif scalar.isdigit():
             cast = int(scalar);
 
-            return int(scalar, 8) if scalar.startswith('0') else cast if str(raw) == str(cast) else raw;
-        if scalar.startswith('-') and scalar[1:].isdigit():
-            raw = scalar;
-            cast = int(scalar);
+            return int(scalar, 8) if '0' == first else cast if scalar == str(cast) else scalar;
 
-            return int(scalar, 8) if '0' == scalar[1] else cast if str(raw) == str(cast) else raw;
-        if 'true' == scalar.lower():
-            return True;
-        if 'false' == scalar.lower():
-            return False;
+        lower = scalar.lower();
+        if 'null' == lower or '~' == scalar:
+            return None;
         if cls.__is_numeric(scalar):
             return int(scalar, 16) if '0x' == scalar[0]+scalar[1] else float(scalar);
-        if ( scalar.lower() == '.inf'
-            or scalar.lower() == '.nan'):
+        if '.inf' == lower or '.nan' == lower:
             return 1e10000;
-        if scalar.lower() == '-.inf':
+        if '-.inf' == lower:
             return -1e10000;
-        if re.search('^(-|\+)?[0-9,]+(\.[0-9]+)?$', scalar):
+        if _NUMBER_WITH_COMMAS.search(scalar):
             return float(scalar.replace(',', ''));
-        if cls.__getTimestampRegex().search(scalar):
+        if _TIMESTAMP.search(scalar):
             try:
                 return time.mktime(time.strptime(scalar, '%Y-%m-%d'));
             except Exception:
@@ -1099,7 +1374,7 @@ class Inline(Object):
         if isinstance(var, String):
             isString = True;
 
-        if isString and re.search("\s", var):
+        if isString and _WHITESPACE.search(var):
             return False;
 
 
@@ -1166,33 +1441,6 @@ class Inline(Object):
                 else:
                     return True;
 
-
-
-    @classmethod
-    def __getTimestampRegex(self):
-        """Gets a regex that matches a YAML date.
-
-        @return: string The regular expression
-
-        @see http://www.yaml.org/spec/1.2/spec.html#id2761573
-
-        """
-
-        return re.compile("""
-        ^
-        (?P<year>[0-9][0-9][0-9][0-9])
-        -(?P<month>[0-9][0-9]?)
-        -(?P<day>[0-9][0-9]?)
-        (?:(?:[Tt]|[ t]+)
-        (?P<hour>[0-9][0-9]?)
-        :(?P<minute>[0-9][0-9])
-        :(?P<second>[0-9][0-9])
-        (?:\.(?P<fraction>[0-9]*))?
-        (?:[ t]*(?P<tz>Z|(?P<tz_sign>[-+])(?P<tz_hour>[0-9][0-9]?)
-        (?::(?P<tz_minute>[0-9][0-9]))?))?)?
-        $
-""", re.X);
-
 class Unescaper(Object):
     """Unescaper encapsulates unescaping rules for single and double-quoted
     YAML strings.
@@ -1208,6 +1456,7 @@ class Unescaper(Object):
     # Regex fragment that matches an escaped character in a double quoted
     # string.
     REGEX_ESCAPED_CHARACTER = "\\\\([0abt\tnvfre \\\"\\/\\\\N_LP]|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8})";
+    __escapedCharacter = re.compile(REGEX_ESCAPED_CHARACTER, re.U);
 
     def unescapeSingleQuotedString(self, value):
         """Unescapes a single quoted string.
@@ -1234,8 +1483,7 @@ class Unescaper(Object):
         """
 
         # evaluate the string
-        pattern = re.compile(self.REGEX_ESCAPED_CHARACTER, re.U);
-        return pattern.sub(self.__callback, value);
+        return self.__escapedCharacter.sub(self.__callback, value);
 
 
     def unescapeCharacter(self, value):
@@ -1331,6 +1579,8 @@ class Escaper(Object):
 
     # Characters that would cause a dumped string to require double quoting.
     REGEX_CHARACTER_TO_ESCAPE = "[\\x00-\\x1f]|\xc2\x85|\xc2\xa0|\xe2\x80\xa8|\xe2\x80\xa9";
+    __characterToEscape = re.compile(REGEX_CHARACTER_TO_ESCAPE, re.U);
+    __requiresSingleQuoting = re.compile('[ \s \' " \: \{ \} \[ \] , & \* \# \?] | \A[ - ? | < > = ! % @ ` ]', re.X);
 
     # Mapping arrays for escaping a double quoted string. The backslash is
     # first to ensure proper escaping because str_replace operates iteratively
@@ -1359,7 +1609,7 @@ class Escaper(Object):
 
         """
 
-        return re.search(cls.REGEX_CHARACTER_TO_ESCAPE, value, re.U);
+        return cls.__characterToEscape.search(value);
 
     @classmethod
     def escapeWithDoubleQuotes(cls, value):
@@ -1392,7 +1642,7 @@ class Escaper(Object):
 
         """
 
-        return re.search('[ \s \' " \: \{ \} \[ \] , & \* \# \?] | \A[ - ? | < > = ! % @ ` ]', value, re.X);
+        return cls.__requiresSingleQuoting.search(value);
 
 
     @classmethod
@@ -1569,6 +1819,93 @@ class Yaml(Object):
 
 
 
+class _Lines(Object):
+    """The lines of a YAML document with their indentation, computed once
+    for all the embed blocks.
+
+    """
+
+    def __init__(self, lines, indents = None, blanks = None):
+        """Constructor.
+
+        @param: list lines   The lines
+        @param list indents The indentation of the lines of a document
+                            without comment lines, computed when omitted
+        @param list blanks  Whether the lines are blank
+
+        """
+
+        self.lines = lines;
+        self.indents = indents;
+        self.blanks = blanks;
+        # None when there are no comment lines
+        self.comments = None;
+        self.__compact = None;
+        self.__positions = None;
+
+        if None is indents:
+            self.indents = list();
+            self.blanks = list();
+            self.comments = list();
+            for line in lines:
+                stripped = line.lstrip(' ');
+                self.indents.append(len(line) - len(stripped));
+                self.blanks.append('' == stripped);
+                self.comments.append(stripped.startswith('#'));
+        else:
+            self.__compact = self;
+
+    def isComment(self, i):
+        """Returns whether a line is a comment line.
+
+        @param: integer i The index of the line
+
+        @return: Boolean
+
+        """
+
+        return None is not self.comments and self.comments[i];
+
+    def getCompact(self):
+        """Returns the lines without the comment ones, which are those of
+        the embed blocks.
+
+        @return: _Lines
+
+        """
+
+        if None is self.__compact:
+            lines = list();
+            indents = list();
+            blanks = list();
+            self.__positions = list();
+            for i in range(len(self.lines)):
+                self.__positions.append(len(lines));
+                if not self.comments[i]:
+                    lines.append(self.lines[i]);
+                    indents.append(self.indents[i]);
+                    blanks.append(self.blanks[i]);
+            self.__compact = _Lines(lines, indents, blanks);
+
+        return self.__compact;
+
+    def getCompactIndex(self, i):
+        """Returns the index of a line that is not a comment in the lines
+        returned by getCompact().
+
+        @param: integer i The index of the line
+
+        @return: integer
+
+        """
+
+        if None is self.__positions:
+            return i;
+
+        return self.__positions[i];
+
+
+
 class _Ref(Object):
     def __init__(self, i = 0):
         self.__i = i;
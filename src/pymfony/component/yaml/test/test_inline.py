@@ -132,6 +132,21 @@ class InlineTest(unittest.TestCase):
 
 
 
+    def testParseUnterminatedFlowCollectionShouldThrowException(self):
+        """@expectedException: Symfony\Component\Yaml\Exception\ParseException
+
+        """
+
+        for value in ["{a: 'foo'", '["foo"', '[foo, {a: [1, 2]}']:
+            try:
+                Inline.parse(value);
+
+                self.fail()
+            except Exception as e:
+                self.assertTrue(isinstance(e, ParseException), value);
+
+
+
     def testParseScalarWithCorrectlyQuotedStringShouldReturnString(self):
 
         value = "'don''t do somthin'' like that'";
@@ -140,6 +155,17 @@ class InlineTest(unittest.TestCase):
         self.assertEqual(expect, Inline.parseScalar(value));
 
 
+    def testParseLongFlowSequence(self):
+
+        items = list();
+        expected = list();
+        for i in range(2000):
+            items.extend(['foo{0}'.format(i), "'{0}'".format(i), str(i), '{{ a: {0} }}'.format(i)]);
+            expected.extend(['foo{0}'.format(i), str(i), i, {'a': i}]);
+
+        self.assertEqual(expected, Inline.parse('['+', '.join(items)+']'));
+
+
     def _getTestsForParse(self):
 
         return {
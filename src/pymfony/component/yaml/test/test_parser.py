@@ -529,6 +529,63 @@ yaml:
             self.assertTrue(isinstance(e, ParseException));
 
 
+    def testNestedBlocks(self):
+
+        yaml = """
+services:
+    # comment
+    acme.service_0:
+        class: Acme\\Service0
+        arguments:
+            - '@service_container'
+            # comment
+            - '%kernel.debug%'
+        calls:
+            - [setLogger, ['@logger']]
+        tags:
+            - { name: kernel.event_listener, event: kernel.request, priority: 0 }
+        options:
+            level1:
+                level2:
+                    # comment
+                    level3:
+                        enabled: true
+
+                        name: service0
+    acme.service_1:
+        - name: foo
+          # comment
+          value: bar
+"""
+
+        services = Parser().parse(yaml)['services'];
+        self.assertEqual(['acme.service_0', 'acme.service_1'], list(services.keys()));
+        self.assertEqual({
+            'class': 'Acme\\Service0',
+            'arguments': ['@service_container', '%kernel.debug%'],
+            'calls': [['setLogger', ['@logger']]],
+            'tags': [{'name': 'kernel.event_listener', 'event': 'kernel.request', 'priority': 0}],
+            'options': {'level1': {'level2': {'level3': {'enabled': True, 'name': 'service0'}}}},
+        }, dict(services['acme.service_0']));
+        self.assertEqual([{'name': 'foo', 'value': 'bar'}], [dict(service) for service in services['acme.service_1']]);
+
+
+    def testParseExceptionLineInNestedBlocks(self):
+
+        yaml = """
+foo:
+    bar:
+        baz: 1
+      qux: 2
+"""
+
+        try:
+            Parser().parse(yaml);
+            self.fail();
+        except ParseException as e:
+            self.assertEqual(5, e.getParsedLine());
+
+
 
 class B(Object):
 